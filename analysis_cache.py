@@ -0,0 +1,115 @@
+"""
+LLM Analysis Cache
+Reuses generated analyses when the same query meets a byte-identical article set, with paced replay for streaming
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+import threading
+from typing import Any, AsyncIterator, Iterator, List, Optional
+from dotenv import load_dotenv
+from search_cache import SearchCache, CacheKey
+
+# Load environment variables
+load_dotenv()
+
+# Cache configuration (overridable via environment)
+ANALYSIS_CACHE_ENABLED = os.getenv('ANALYSIS_CACHE_ENABLED', 'true').lower() == 'true'
+ANALYSIS_CACHE_TTL = float(os.getenv('ANALYSIS_CACHE_TTL', 600))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', 500))
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv('ANALYSIS_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+
+# Replay pace for cached analyses in streaming mode (characters per second, 0 = instant)
+ANALYSIS_REPLAY_CPS = float(os.getenv('ANALYSIS_REPLAY_CPS', 600))
+ANALYSIS_REPLAY_CHUNK_WORDS = int(os.getenv('ANALYSIS_REPLAY_CHUNK_WORDS', 3))
+
+
+def fingerprint_articles(articles: List[Any]) -> str:
+    """Stable digest of an article set: order, URLs, titles and snippets
+
+    Args:
+        articles: Articles (or legacy result dicts) fed to the prompt
+
+    Returns:
+        Hex digest that changes whenever any article in the prompt would change
+    """
+    digest = hashlib.sha256()
+    for article in articles:
+        for value in (article.get("url", ""), article.get("title", ""), article.get("snippet", "")):
+            digest.update((value or "").encode("utf-8"))
+            digest.update(b"\x1f")
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+def make_analysis_key(model: str, prompt_version: str, query: str, articles: List[Any]) -> CacheKey:
+    """Build the cache key for an analysis
+
+    The key follows the search cache layout: ("analysis", normalized query,
+    article count, "<model>|<prompt version>|<fingerprint>").
+
+    Args:
+        model: Model the analysis is generated with
+        prompt_version: Identifier of the prompt template; bump it when the prompt changes
+        query: User query
+        articles: Articles included in the prompt
+    """
+    normalized_query = " ".join(query.lower().split())
+    discriminator = f"{model}|{prompt_version}|{fingerprint_articles(articles)}"
+    return ("analysis", normalized_query, len(articles), discriminator)
+
+
+def _replay_chunks(text: str, chunk_words: int) -> Iterator[str]:
+    """Split text into chunks of a few words, keeping all whitespace"""
+    words = text.split(" ")
+    for start in range(0, len(words), chunk_words):
+        chunk = " ".join(words[start:start + chunk_words])
+        yield chunk if start + chunk_words >= len(words) else chunk + " "
+
+
+def replay_stream(text: str, chars_per_second: float = ANALYSIS_REPLAY_CPS,
+                  chunk_words: int = ANALYSIS_REPLAY_CHUNK_WORDS) -> Iterator[str]:
+    """Yield a cached analysis in small chunks at a steady pace so the UI still streams
+
+    Args:
+        text: Cached analysis
+        chars_per_second: Replay speed; 0 yields the whole text at once
+        chunk_words: Words per yielded chunk
+    """
+    if chars_per_second <= 0:
+        yield text
+        return
+    for chunk in _replay_chunks(text, chunk_words):
+        yield chunk
+        time.sleep(len(chunk) / chars_per_second)
+
+
+async def areplay_stream(text: str, chars_per_second: float = ANALYSIS_REPLAY_CPS,
+                         chunk_words: int = ANALYSIS_REPLAY_CHUNK_WORDS) -> AsyncIterator[str]:
+    """Async counterpart of `replay_stream`"""
+    if chars_per_second <= 0:
+        yield text
+        return
+    for chunk in _replay_chunks(text, chunk_words):
+        yield chunk
+        await asyncio.sleep(len(chunk) / chars_per_second)
+
+
+_shared_cache: Optional[SearchCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> Optional[SearchCache]:
+    """Get the process-wide analysis cache, or None when analysis caching is disabled"""
+    global _shared_cache
+    if not ANALYSIS_CACHE_ENABLED:
+        return None
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = SearchCache(ttls={"analysis": ANALYSIS_CACHE_TTL}, stale_seconds=0,
+                                            max_entries=ANALYSIS_CACHE_MAX_ENTRIES,
+                                            max_bytes=ANALYSIS_CACHE_MAX_BYTES)
+    return _shared_cache
@@ -9,7 +9,20 @@ from dotenv import load_dotenv
 import requests
 from datetime import datetime
 from news_agent_clarifai import NewsAgent
+from circuit_breaker import get_all_breaker_status
+from health_check import get_health_checker, UNKNOWN
+from context_builder import count_tokens, DEFAULT_TOKENIZER_MODEL
+from model_router import AUTO_MODEL
+from hedging import LLM_HEDGING_ENABLED
+from stream_renderer import StreamRenderer, process_assistant_content
+from chat_history import MessageRenderCache, display_llm_stats, history_start
+from conversation_store import (get_conversation_store, new_session_id, is_session_id, export_to_file,
+                                MESSAGES, LLM_STATS)
+from rolling_stats import get_stats_engine, GLOBAL, MODEL, SESSION, DURATION, TTFT, TOKENS, \
+    TOKENS_PER_SECOND, SEARCH_LATENCY
+from query_workers import get_query_pool, QueryPoolFull, QUERY_POLL_INTERVAL, QUEUED, FAILED, CANCELLED
 import json
+import time
 from datetime import datetime
 
 # Load environment variables
@@ -174,43 +187,57 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize session state
+# Initialize session state. The conversation id lives in the URL, so a reload
+# (or a restart) picks the same conversation back up from the store.
+if 'session_id' not in st.session_state:
+    session_id = st.query_params.get("session")
+    if not is_session_id(session_id):
+        session_id = new_session_id()
+        st.query_params["session"] = session_id
+    st.session_state.session_id = session_id
+conversation_store = get_conversation_store()
 if 'messages' not in st.session_state:
-    st.session_state.messages = []
+    st.session_state.messages = conversation_store.open(st.session_state.session_id, MESSAGES) \
+        if conversation_store else []
 if 'news_agent' not in st.session_state:
     st.session_state.news_agent = None
 if 'clarifai_connected' not in st.session_state:
     st.session_state.clarifai_connected = False
 if 'llm_stats' not in st.session_state:
-    st.session_state.llm_stats = []
+    st.session_state.llm_stats = conversation_store.open(st.session_state.session_id, LLM_STATS) \
+        if conversation_store else []
+if 'llm_stats_by_message' not in st.session_state:
+    # Index into llm_stats of each answer's statistics, keyed by the assistant message's id
+    st.session_state.llm_stats_by_message = {stats['message_id']: index
+                                              for index, stats in enumerate(st.session_state.llm_stats)
+                                              if stats.get('message_id')}
+# Rolling statistics are in memory; rebuild this session's aggregates from a restored conversation
+stats_engine = get_stats_engine()
+if st.session_state.llm_stats and not stats_engine.has_session(st.session_state.session_id):
+    for restored_stats in st.session_state.llm_stats:
+        stats_engine.record(st.session_state.session_id, restored_stats.get('model'), restored_stats,
+                            now=restored_stats.get('recorded_at', 0), session_only=True)
+if 'message_render_cache' not in st.session_state:
+    st.session_state.message_render_cache = MessageRenderCache()
+if 'history_pages' not in st.session_state:
+    st.session_state.history_pages = 1
+# Queries run on the shared worker pool; a job in flight survives reruns and page reloads
+query_pool = get_query_pool()
+active_job = query_pool.pending_job(st.session_state.session_id)
 
-def process_assistant_content(content):
-    """Process assistant content to improve formatting for Markdown"""
-    import re
-    
-    # Keep numbered lists as they are for proper Markdown rendering
-    # Markdown will handle the formatting automatically
-    
-    # Remove excessive line breaks (more than 2 consecutive newlines)
-    content = re.sub(r'\n{3,}', '\n\n', content)
-    
-    # Ensure proper spacing around headers
-    content = re.sub(r'\n(#+\s)', r'\n\n\1', content)
-    
-    # Ensure proper spacing around lists
-    content = re.sub(r'\n(\d+\.\s|\*\s|-\s)', r'\n\1', content)
-    
-    return content.strip()
-
-def calculate_tokens(text):
-    """Estimate token count (approximate)"""
-    # Simple approximation: ~4 characters per token for English text
-    return len(text) // 4
+def calculate_tokens(text, model_name=None):
+    """Count tokens with the selected model's tokenizer"""
+    return count_tokens(text, model_name or DEFAULT_TOKENIZER_MODEL)
 
-def format_llm_stats(prompt, response, duration, model_name):
-    """Format LLM statistics for display"""
-    prompt_tokens = calculate_tokens(prompt)
-    response_tokens = calculate_tokens(response)
+def format_llm_stats(prompt, response, duration, model_name, prompt_tokens=None):
+    """Format LLM statistics for display
+    
+    `prompt_tokens` is the exact size of the prompt sent to the model, when known;
+    otherwise the user's message is counted.
+    """
+    if prompt_tokens is None:
+        prompt_tokens = calculate_tokens(prompt, model_name)
+    response_tokens = calculate_tokens(response, model_name)
     total_tokens = prompt_tokens + response_tokens
     tokens_per_second = response_tokens / duration if duration > 0 else 0
     
@@ -223,39 +250,31 @@ def format_llm_stats(prompt, response, duration, model_name):
         "tokens_per_second": tokens_per_second
     }
 
-def display_llm_stats(stats, dark_theme=True):
-    """Display LLM statistics as HTML"""
-    theme_class = "llm-stats-dark" if dark_theme else ""
+def record_llm_stats(stats, info, message_id):
+    """Store a response's statistics with the conversation and add them to the rolling aggregates
     
-    stats_html = f"""
-    <div class="llm-stats {theme_class}">
-        <div class="stat-item">
-            <span class="stat-label">Model:</span> {stats['model']}
-        </div>
-        <div class="stat-item">
-            <span class="stat-label">Prompt Tokens:</span> {stats['prompt_tokens']:,}
-        </div>
-        <div class="stat-item">
-            <span class="stat-label">Response Tokens:</span> {stats['response_tokens']:,}
-        </div>
-        <div class="stat-item">
-            <span class="stat-label">Total Tokens:</span> {stats['total_tokens']:,}
-        </div>
-        <div class="stat-item">
-            <span class="stat-label">Duration:</span> {stats['duration']:.2f}s
-        </div>
-        <div class="stat-item">
-            <span class="stat-label">Tokens/sec:</span> {stats['tokens_per_second']:.1f}
-        </div>
-    </div>
+    `message_id` is the id of the assistant message the statistics belong to.
     """
-    return stats_html
+    stats["ttft"] = info.get('ttft')
+    stats["search_latency"] = info.get('search_latency')
+    stats["recorded_at"] = time.time()
+    stats["message_id"] = message_id
+    st.session_state.llm_stats_by_message[message_id] = len(st.session_state.llm_stats)
+    st.session_state.llm_stats.append(stats)
+    get_stats_engine().record(st.session_state.session_id, stats['model'], stats)
+
+def format_percentiles(summary, unit="s"):
+    """'p50 … • p95 …' for a metric summary, or n/a before the first sample"""
+    if not summary or not summary['count']:
+        return "n/a"
+    return f"p50 {summary['p50']:.2f}{unit} • p95 {summary['p95']:.2f}{unit} • p99 {summary['p99']:.2f}{unit}"
 
 class StreamingContainer:
     """A container class to handle streaming responses with proper UI integration"""
     
     def __init__(self):
         self.container = None
+        self.renderer = None
         self.content = ""
         self.timestamp = ""
         
@@ -270,92 +289,129 @@ class StreamingContainer:
         
         # Create the content container
         self.container = st.empty()
-        
-    def update(self, content):
-        """Update the container with new content"""
-        self.content = content
-        if self.container:
-            processed_content = process_assistant_content(content)
-            self.container.markdown(processed_content)
+        self.renderer = StreamRenderer(self.container)
     
+    def append(self, chunk):
+        """Add a streamed chunk; the container is re-rendered at most once per frame"""
+        if self.renderer:
+            self.renderer.feed(chunk)
+    
+    def finish(self):
+        """Render the last frame and return the full streamed content"""
+        if self.renderer:
+            self.content = self.renderer.finish()
+        return self.content
+        
     def finalize(self, stats_html=None):
         """Finalize the container with optional statistics"""
         if stats_html:
             st.markdown(stats_html, unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
-def handle_streaming_response_with_container(agent, query, current_model):
-    """Handle streaming response with integrated container management"""
-    import time
-    start_time = time.time()
+def agent_query_work(agent, query, streaming, pipelining):
+    """Background work for one query: stream (or compute) the agent's answer into the job"""
+    def work(job):
+        result = None
+        if streaming:
+            # Pipelined: sources first, search overlapped with generation
+            chunks = agent.search_and_analyze_pipelined(query) if pipelining \
+                else agent.search_and_analyze_stream(query)
+            try:
+                for chunk in chunks:
+                    job.emit(chunk)
+            finally:
+                chunks.close()
+        else:
+            result = agent.search_and_analyze(query)
+        # Captured on the worker, before the agent can start another query
+        job.info.update(model=agent.last_model, prompt_tokens=agent.last_prompt_tokens,
+                        ttft=agent.last_ttft, search_latency=agent.last_search_latency)
+        return result
+    return work
+
+def submit_query(query, streaming):
+    """Add the user's message and hand the query to the background workers"""
+    st.session_state.messages.append({
+        "role": "user", 
+        "content": query,
+        "timestamp": datetime.now().strftime("%H:%M:%S")
+    })
+    agent = st.session_state.news_agent
+    if agent is None:
+        error_msg = "❌ News agent is not initialized. Please check your configuration."
+    else:
+        work = agent_query_work(agent, query, streaming, st.session_state.get('use_pipelining', True))
+        try:
+            query_pool.submit(work, query, st.session_state.session_id)
+            return
+        except QueryPoolFull as e:
+            error_msg = f"❌ The server is busy ({str(e)}). Please try again in a moment."
+    st.session_state.messages.append({
+        "role": "assistant", 
+        "content": error_msg,
+        "timestamp": datetime.now().strftime("%H:%M:%S")
+    })
+
+def collect_query(job):
+    """Move a finished job's answer and statistics into the conversation (once per job)"""
+    if not job.claim():
+        return
+    if job.status == FAILED:
+        content = f"❌ Error generating response: {job.error}"
+    elif job.status == CANCELLED:
+        content = f"{job.result}\n\n⏹️ *Stopped.*" if job.result else "⏹️ *Stopped.*"
+    else:
+        content = job.result
+    st.session_state.messages.append({
+        "id": job.id,
+        "role": "assistant", 
+        "content": content,
+        "timestamp": datetime.fromtimestamp(job.finished_at).strftime("%H:%M:%S")
+    })
+    if job.status not in (FAILED, CANCELLED):
+        current_model = job.info.get('model') or st.session_state.get('current_model', 'Unknown')
+        stats = format_llm_stats(job.query, content, job.duration, current_model, job.info.get('prompt_tokens'))
+        record_llm_stats(stats, job.info, job.id)
+
+def follow_query(job):
+    """Show a background job's progress until it finishes, then collect it and rerun
     
-    # Create and initialize streaming container
+    A rerun in the meantime (any widget interaction) only stops this view; the
+    job keeps running and the next run re-attaches from the start of its output.
+    """
     streaming_container = StreamingContainer()
-    response_timestamp = datetime.now().strftime("%H:%M:%S")
-    streaming_container.initialize(response_timestamp)
-    
-    streamed_content = ""
-    
-    try:
-        # Stream the response
-        for chunk in agent.search_and_analyze_stream(query):
-            streamed_content += chunk
-            streaming_container.update(streamed_content)
-        
-        # Calculate final statistics
-        end_time = time.time()
-        duration = end_time - start_time
-        
-        # Calculate and display statistics
-        stats = format_llm_stats(query, streamed_content, duration, current_model)
-        stats_html = display_llm_stats(stats, dark_theme=True)
-        
-        # Finalize the container
-        streaming_container.finalize(stats_html)
-        
-        return streamed_content, duration, response_timestamp, stats
-        
-    except Exception as e:
-        error_msg = f"❌ Error during streaming: {str(e)}"
-        streaming_container.update(error_msg)
-        streaming_container.finalize()
-        return error_msg, time.time() - start_time, response_timestamp, None
-
-def handle_streaming_response(agent, query, current_model, message_container=None):
-    """Handle streaming response from the agent"""
-    import time
-    start_time = time.time()
-    
-    streamed_content = ""
-    
-    try:
-        # Stream the response
-        for chunk in agent.search_and_analyze_stream(query):
-            streamed_content += chunk
-            
-            # If a message container is provided, update it with accumulated content
-            if message_container:
-                processed_content = process_assistant_content(streamed_content)
-                message_container.markdown(processed_content)
-        
-        # Calculate final statistics
-        end_time = time.time()
-        duration = end_time - start_time
-        
-        return streamed_content, duration
-        
-    except Exception as e:
-        error_msg = f"❌ Error during streaming: {str(e)}"
-        if message_container:
-            message_container.markdown(error_msg)
-        return error_msg, time.time() - start_time
+    streaming_container.initialize(datetime.fromtimestamp(job.submitted_at).strftime("%H:%M:%S"))
+    status = st.empty()
+    if st.button("⏹️ Stop", key=f"stop_{job.id}"):
+        job.cancel()
+    offset = 0
+    finished = job.finished
+    while True:
+        chunk, offset = job.read(offset)
+        if chunk:
+            streaming_container.append(chunk)
+        # Every pass touches the page, which is where Streamlit notices a pending rerun
+        if offset:
+            status.empty()
+        elif job.status == QUEUED:
+            status.markdown(f"<span style='color:#aaa;'>⏳ Waiting for a free worker "
+                            f"({query_pool.queue_position(job)} ahead)...</span>", unsafe_allow_html=True)
+        else:
+            status.markdown("<span style='color:#aaa;'>🔍 Searching for relevant news and analyzing...</span>",
+                            unsafe_allow_html=True)
+        if finished:
+            break
+        finished = job.wait(QUERY_POLL_INTERVAL)
+    streaming_container.finish()
+    collect_query(job)
+    st.rerun()
 
 def initialize_agent(model_name):
     """Initialize the news agent with selected model"""
     try:
         agent = NewsAgent(model_name=model_name)
         st.session_state.news_agent = agent
-        st.session_state.clarifai_connected = agent.test_connection()
+        st.session_state.clarifai_connected = agent.is_llm_available()
         return True
     except Exception as e:
         st.error(f"Failed to initialize agent: {str(e)}")
@@ -368,9 +424,9 @@ def test_clarifai_connection():
         if not clarifai_pat or clarifai_pat == 'your_clarifai_personal_access_token_here':
             return False
         
-        # Simple test to verify connection
+        # Cached background health check - never a billed call on page render
         if st.session_state.news_agent:
-            return st.session_state.news_agent.test_connection()
+            return st.session_state.news_agent.is_llm_available()
         
         # If no agent yet, just check if PAT is set
         return len(clarifai_pat.strip()) > 20  # Basic validation
@@ -387,6 +443,7 @@ with st.sidebar:
     # Model selection
     st.subheader("🤖 Model Selection")
     model_options = [
+        AUTO_MODEL,
         "gpt-4o",
         "gpt-4o-mini", 
         "claude-3-5-sonnet-20241022",
@@ -396,8 +453,10 @@ with st.sidebar:
     selected_model = st.selectbox(
         "Choose AI Model:",
         model_options,
-        index=0,
-        help="Select the AI model for news analysis and responses"
+        index=1,
+        format_func=lambda model: "🧭 Auto (latency-aware routing)" if model == AUTO_MODEL else model,
+        help="Select the AI model for news analysis and responses. Auto picks the cheapest model that "
+             "meets the latency target and escalates to larger models for complex queries or on failure"
     )
     
     # Streaming toggle
@@ -407,6 +466,20 @@ with st.sidebar:
         value=True,
         help="Stream AI responses in real-time for better user experience"
     )
+    st.toggle(
+        "🚀 Pipelined Search",
+        value=True,
+        key="use_pipelining",
+        disabled=not use_streaming,
+        help="Show sources as soon as they are found and start the AI analysis while extra searches finish"
+    )
+    use_hedging = st.toggle(
+        "🎯 Hedged Requests",
+        value=LLM_HEDGING_ENABLED,
+        disabled=not use_streaming,
+        help="If the first token is later than usual, send a backup request and keep whichever starts "
+             "first. Cuts tail latency at the cost of occasional extra requests"
+    )
     
     # Initialize agent when model changes
     if st.session_state.news_agent is None or st.session_state.get('current_model') != selected_model:
@@ -416,12 +489,18 @@ with st.sidebar:
                 st.success(f"✅ Agent initialized with {selected_model}")
             else:
                 st.error("❌ Failed to initialize agent")
+    if st.session_state.news_agent:
+        st.session_state.news_agent.hedging = use_hedging
     
     # Connection status
     st.subheader("📡 Connection Status")
     connection_status = test_clarifai_connection()
     
-    if connection_status:
+    clarifai_health = get_health_checker().get_status("Clarifai")
+    if connection_status and clarifai_health['status'] == UNKNOWN:
+        st.markdown('<div class="status-indicator status-partial">🟡 Clarifai Checking...</div>', 
+                   unsafe_allow_html=True)
+    elif connection_status:
         st.markdown('<div class="status-indicator status-connected">🟢 Clarifai Connected</div>', 
                    unsafe_allow_html=True)
     else:
@@ -437,28 +516,93 @@ with st.sidebar:
         st.markdown('<div class="status-indicator status-disconnected">🔴 Agent Not Ready</div>', 
                    unsafe_allow_html=True)
     
+    # Search provider and model circuit breakers
+    for provider, breaker_status in get_all_breaker_status().items():
+        if breaker_status['state'] == 'open':
+            st.markdown(f'<div class="status-indicator status-disconnected">🔴 {provider} Circuit Open '
+                        f'(retry in {breaker_status["retry_in"]:.0f}s)</div>', unsafe_allow_html=True)
+        elif breaker_status['state'] == 'half_open':
+            st.markdown(f'<div class="status-indicator status-partial">🟡 {provider} Probing</div>', 
+                       unsafe_allow_html=True)
+        else:
+            st.markdown(f'<div class="status-indicator status-connected">🟢 {provider} Healthy</div>', 
+                       unsafe_allow_html=True)
+    
     st.divider()
     
     # Clear chat button
     if st.button("🗑️ Clear Chat", use_container_width=True):
-        st.session_state.messages = []
-        st.session_state.llm_stats = []
+        if active_job is not None:
+            active_job.discard()
+        st.session_state.messages.clear()
+        st.session_state.llm_stats.clear()
+        st.session_state.llm_stats_by_message.clear()
+        st.session_state.message_render_cache.clear()
+        st.session_state.history_pages = 1
         st.rerun()
     
+    # Export the whole conversation (built only when clicked, streamed from the store)
+    if st.session_state.messages:
+        messages_to_export = st.session_state.messages
+        st.download_button("💾 Export Chat", data=lambda: export_to_file(messages_to_export),
+                           file_name=f"conversation-{st.session_state.session_id[:8]}.jsonl",
+                           mime="application/x-ndjson", use_container_width=True)
+    
     # Refresh connection button
     if st.button("🔄 Refresh Connection", use_container_width=True):
+        get_health_checker().refresh()
         st.session_state.clarifai_connected = test_clarifai_connection()
         st.rerun()
     
+    # Model routing statistics (rolling, shared across sessions)
+    if st.session_state.news_agent and st.session_state.news_agent.auto_routing:
+        with st.expander("🧭 Model Routing"):
+            for model, model_stats in st.session_state.news_agent.get_router_stats()["models"].items():
+                ttft = f"{model_stats['ttft']:.2f}s" if model_stats['ttft'] is not None else "n/a"
+                speed = f"{model_stats['tokens_per_second']:.1f} tok/sec" \
+                    if model_stats['tokens_per_second'] is not None else "n/a"
+                st.markdown(f"**{model}**: TTFT {ttft} • {speed} • "
+                            f"errors {model_stats['error_rate']:.0%} ({model_stats['samples']} calls)")
+    
+    # Hedging statistics (shared across sessions)
+    if st.session_state.news_agent and use_hedging:
+        with st.expander("🎯 Hedging"):
+            hedge_stats = st.session_state.news_agent.get_hedge_stats()
+            p50, p99 = hedge_stats['first_token_p50'], hedge_stats['first_token_p99']
+            st.markdown(f"**Hedge rate:** {hedge_stats['hedge_rate']:.0%} of {hedge_stats['requests']} streams  \n"
+                        f"**Hedge wins:** {hedge_stats['hedge_win_rate']:.0%} of hedged  \n"
+                        f"**First token:** p50 {p50 or 0:.2f}s • p99 {p99 or 0:.2f}s")
+
+    # Shared LLM connection pool (all sessions)
+    if st.session_state.news_agent:
+        pool_stats = st.session_state.news_agent.get_llm_pool_stats()
+        if pool_stats.get('requests'):
+            with st.expander("🔌 LLM Connections"):
+                st.markdown(f"**Requests:** {pool_stats['requests']} ({pool_stats['http2_requests']} over HTTP/2)  \n"
+                            f"**Connections opened:** {pool_stats['connections_opened']}  \n"
+                            f"**Reuse:** {pool_stats['reuse_ratio']:.0%} of requests on a warm connection")
+
+    # Background query workers (all sessions)
+    worker_stats = query_pool.get_stats()
+    if worker_stats['submitted']:
+        with st.expander("🧵 Query Workers"):
+            st.markdown(f"**Running:** {worker_stats['running']} of {worker_stats['workers']} workers  \n"
+                        f"**Waiting:** {worker_stats['queued']} (queue of {worker_stats['queue_size']})  \n"
+                        f"**Completed:** {worker_stats['completed']} • **Failed:** {worker_stats['failed']} • "
+                        f"**Stopped:** {worker_stats['cancelled']} • **Turned away:** {worker_stats['rejected']}")
+
     # LLM Statistics section
     st.subheader("📊 LLM Statistics")
     if st.session_state.llm_stats:
         latest_stats = st.session_state.llm_stats[-1]
         
-        # Show total stats
-        total_tokens = sum(stat['total_tokens'] for stat in st.session_state.llm_stats)
-        total_responses = len(st.session_state.llm_stats)
-        avg_speed = sum(stat['tokens_per_second'] for stat in st.session_state.llm_stats) / total_responses
+        # Session totals come from the rolling aggregates, not a scan of every response
+        session_summary = stats_engine.summary(SESSION, st.session_state.session_id)
+        tokens_summary = session_summary.get(TOKENS, {})
+        speed_summary = session_summary.get(TOKENS_PER_SECOND, {})
+        total_tokens = int(tokens_summary.get('sum', 0))
+        total_responses = tokens_summary.get('count', 0)
+        avg_speed = speed_summary.get('mean') or 0
         
         # Create a styled container for the statistics
         stats_content = f"""
@@ -475,7 +619,9 @@ with st.sidebar:
                 <strong>Session Totals:</strong><br>
                 • <strong>Total Tokens:</strong> {total_tokens:,}<br>
                 • <strong>Responses:</strong> {total_responses}<br>
-                • <strong>Avg Speed:</strong> {avg_speed:.1f} tok/sec
+                • <strong>Avg Speed:</strong> {avg_speed:.1f} tok/sec<br>
+                • <strong>Duration:</strong> {format_percentiles(session_summary.get(DURATION))}<br>
+                • <strong>First Token:</strong> {format_percentiles(session_summary.get(TTFT))}
             </div>
         </div>
         """
@@ -483,10 +629,28 @@ with st.sidebar:
         st.markdown(stats_content, unsafe_allow_html=True)
         
         if st.button("🗑️ Clear Stats", use_container_width=True):
-            st.session_state.llm_stats = []
+            st.session_state.llm_stats.clear()
+            st.session_state.llm_stats_by_message.clear()
+            stats_engine.reset_session(st.session_state.session_id)
             st.rerun()
     else:
         st.info("No statistics available yet. Send a message to see LLM performance metrics.")
+    
+    # Process-wide aggregates over the last hour, overall and per model
+    recent_summary = stats_engine.summary(GLOBAL, window=3600)
+    if recent_summary.get(DURATION, {}).get('count'):
+        with st.expander("📈 All Sessions (last hour)"):
+            st.markdown(f"**Responses:** {recent_summary[DURATION]['count']} • "
+                        f"**Tokens:** {int(recent_summary.get(TOKENS, {}).get('sum', 0)):,}  \n"
+                        f"**Duration:** {format_percentiles(recent_summary.get(DURATION))}  \n"
+                        f"**First Token:** {format_percentiles(recent_summary.get(TTFT))}  \n"
+                        f"**Search:** {format_percentiles(recent_summary.get(SEARCH_LATENCY))}")
+            for model in stats_engine.models():
+                model_summary = stats_engine.summary(MODEL, model, window=3600)
+                speed = model_summary.get(TOKENS_PER_SECOND, {})
+                if speed.get('count'):
+                    st.markdown(f"**{model}**: {speed['count']} responses • {speed['mean']:.1f} tok/sec avg  \n"
+                                f"Duration {format_percentiles(model_summary.get(DURATION))}")
 
 # Main header
 st.markdown("""
@@ -536,118 +700,11 @@ for i, sample in enumerate(sample_queries):
         if st.button(
             f"**{sample['title']}**\n\n{sample['description']}", 
             key=f"sample_{i}",
-            use_container_width=True
+            use_container_width=True,
+            disabled=active_job is not None
         ):
-            # Add sample query to chat
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            st.session_state.messages.append({
-                "role": "user", 
-                "content": sample['query'],
-                "timestamp": timestamp
-            })
-            
-            # Process the query immediately
-            if use_streaming:
-                # Streaming response - Add user message to session state first
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                st.session_state.messages.append({
-                    "role": "user", 
-                    "content": sample['query'],
-                    "timestamp": timestamp
-                })
-                
-                try:
-                    if st.session_state.news_agent:
-                        st.write("🔍 Processing your query...")
-                        
-                        # Handle streaming response with integrated container
-                        response, duration, response_timestamp, stats = handle_streaming_response_with_container(
-                            st.session_state.news_agent, 
-                            sample['query'], 
-                            st.session_state.get('current_model', 'Unknown')
-                        )
-                        
-                        # Add assistant response to session state
-                        st.session_state.messages.append({
-                            "role": "assistant", 
-                            "content": response,
-                            "timestamp": response_timestamp
-                        })
-                        
-                        # Store LLM statistics if available
-                        if stats:
-                            st.session_state.llm_stats.append(stats)
-                        
-                        st.write("✅ Response generated!")
-                        
-                    else:
-                        error_msg = "❌ News agent is not initialized. Please check your configuration."
-                        st.session_state.messages.append({
-                            "role": "assistant", 
-                            "content": error_msg,
-                            "timestamp": datetime.now().strftime("%H:%M:%S")
-                        })
-                        st.error("Agent not ready")
-                        
-                except Exception as e:
-                    error_msg = f"❌ Error generating response: {str(e)}"
-                    st.session_state.messages.append({
-                        "role": "assistant", 
-                        "content": error_msg,
-                        "timestamp": datetime.now().strftime("%H:%M:%S")
-                    })
-                    st.error(f"Error: {str(e)}")
-                
-            else:
-                # Non-streaming response (original behavior)
-                with st.spinner("🤖 News AI is thinking..."):
-                    try:
-                        if st.session_state.news_agent:
-                            st.write("🔍 Processing your query...")  # Debug output
-                            
-                            # Track timing for statistics
-                            import time
-                            start_time = time.time()
-                            
-                            response = st.session_state.news_agent.search_and_analyze(sample['query'])
-                            
-                            # Calculate duration and statistics
-                            end_time = time.time()
-                            duration = end_time - start_time
-                            
-                            # Add assistant response
-                            response_timestamp = datetime.now().strftime("%H:%M:%S")
-                            st.session_state.messages.append({
-                                "role": "assistant", 
-                                "content": response,
-                                "timestamp": response_timestamp
-                            })
-                            
-                            # Calculate and store LLM statistics
-                            current_model = st.session_state.get('current_model', 'Unknown')
-                            stats = format_llm_stats(sample['query'], response, duration, current_model)
-                            st.session_state.llm_stats.append(stats)
-                            
-                            st.write("✅ Response generated!")  # Debug output
-                            
-                        else:
-                            error_msg = "❌ News agent is not initialized. Please check your configuration."
-                            st.session_state.messages.append({
-                                "role": "assistant", 
-                                "content": error_msg,
-                                "timestamp": datetime.now().strftime("%H:%M:%S")
-                            })
-                            st.error("Agent not ready")
-                            
-                    except Exception as e:
-                        error_msg = f"❌ Error generating response: {str(e)}"
-                        st.session_state.messages.append({
-                            "role": "assistant", 
-                            "content": error_msg,
-                            "timestamp": datetime.now().strftime("%H:%M:%S")
-                        })
-                        st.error(f"Error: {str(e)}")  # Debug output
-            
+            # Run the sample query in the background; the chat follows its progress
+            submit_query(sample['query'], use_streaming)
             st.rerun()
 
 st.divider()
@@ -655,162 +712,46 @@ st.divider()
 # Chat interface
 st.subheader("💬 Chat with News AI")
 
-# Display chat messages (excluding the last one if it's currently streaming)
-streaming_placeholder = None
-for i, message in enumerate(st.session_state.messages):
-    timestamp = message.get('timestamp', '')
-    
-    # Skip the last message if it was just added during streaming in this session
-    if (use_streaming and i == len(st.session_state.messages) - 1 and 
-        message["role"] == "assistant" and 
-        hasattr(st.session_state, '_just_streamed')):
-        # Instead, create a placeholder for streaming output in the chat
-        streaming_placeholder = st.empty()
-        continue
-    
-    # Skip the last user message if it was just added in the current interaction
-    if (i == len(st.session_state.messages) - 1 and 
-        message["role"] == "user" and 
-        hasattr(st.session_state, '_just_added_user_message')):
-        continue
+# Display chat messages. Only the newest windows are rendered, from markup cached per message.
+messages = st.session_state.messages
+render_cache = st.session_state.message_render_cache
+first_shown = history_start(len(messages), st.session_state.history_pages)
+if first_shown:
+    if st.button(f"⬆️ Load older messages ({first_shown} hidden)", use_container_width=True):
+        st.session_state.history_pages += 1
+        st.rerun()
+
+for i in range(first_shown, len(messages)):
+    message = messages[i]
     
     if message["role"] == "user":
         # Only display user message if the next message is not an assistant response to it
-        is_last = (i == len(st.session_state.messages) - 1)
-        next_is_assistant = (not is_last and st.session_state.messages[i+1]["role"] == "assistant")
+        is_last = (i == len(messages) - 1)
+        next_is_assistant = (not is_last and messages[i+1]["role"] == "assistant")
         if not next_is_assistant:
-            import html
-            escaped_content = html.escape(message["content"])
-            st.markdown(f"""
-            <div class="chat-message user-message">
-                <strong>👤 You</strong> <small>{timestamp}</small><br>
-                <div style="white-space: pre-wrap;">{escaped_content}</div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(render_cache.get(message).header, unsafe_allow_html=True)
     else:
-        # Process content and render as Markdown
-        processed_content = process_assistant_content(message["content"])
-        st.markdown(f"""
-        <div class="chat-message assistant-message">
-            <strong>🤖 News AI</strong> <small>{timestamp}</small><br>
-        """, unsafe_allow_html=True)
+        # Corresponding LLM statistics, if any (failed and stopped answers have none)
+        stats_index = st.session_state.llm_stats_by_message.get(message.get("id"))
+        stats = st.session_state.llm_stats[stats_index] if stats_index is not None else None
+        rendered = render_cache.get(message, stats)
+        st.markdown(rendered.header, unsafe_allow_html=True)
         with st.container():
-            st.markdown(processed_content)
-        # Find and display corresponding LLM statistics
-        if i < len(st.session_state.llm_stats):
-            stats = st.session_state.llm_stats[i]
-            stats_html = display_llm_stats(stats, dark_theme=True)
-            st.markdown(stats_html, unsafe_allow_html=True)
+            st.markdown(rendered.body)
+        if rendered.stats_html:
+            st.markdown(rendered.stats_html, unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
-# Clear the streaming flag if it exists
-if hasattr(st.session_state, '_just_streamed'):
-    delattr(st.session_state, '_just_streamed')
-
-# Clear the user message flag if it exists
-if hasattr(st.session_state, '_just_added_user_message'):
-    delattr(st.session_state, '_just_added_user_message')
-
-# Chat input
-if prompt := st.chat_input("Ask me about news, current events, or any topic..."):
-    # Add user message to session state
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    st.session_state.messages.append({
-        "role": "user", 
-        "content": prompt,
-        "timestamp": timestamp
-    })
-    # Mark that we just added a user message
-    st.session_state._just_added_user_message = True
-    # Instead of showing a separate spinner, add a placeholder to the main chat container
-    if streaming_placeholder is None:
-        streaming_placeholder = st.empty()
-    streaming_placeholder.markdown(f"""
-    <div class='chat-message assistant-message'>
-        <strong>🤖 News AI</strong> <small>{datetime.now().strftime('%H:%M:%S')}</small><br>
-        <span style='color:#aaa;'>🔍 Searching for relevant news and analyzing...</span>
-    </div>
-    """, unsafe_allow_html=True)
-    # Generate response
-    if use_streaming:
-        # Streaming response with integrated container
-        try:
-            if st.session_state.news_agent:
-                with streaming_placeholder:
-                    st.markdown(f"""
-                    <div class='chat-message assistant-message'>
-                        <strong>🤖 News AI</strong> <small>{datetime.now().strftime('%H:%M:%S')}</small><br>
-                        <div id='streaming-content'></div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    streaming_content = st.empty()
-                    import time
-                    streamed_content = ""
-                    for chunk in st.session_state.news_agent.search_and_analyze_stream(prompt):
-                        streamed_content += chunk
-                        streaming_content.markdown(process_assistant_content(streamed_content))
-                    streaming_placeholder.empty()
-                    response_timestamp = datetime.now().strftime("%H:%M:%S")
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": streamed_content,
-                        "timestamp": response_timestamp
-                    })
-                    duration = 0
-                    current_model = st.session_state.get('current_model', 'Unknown')
-                    stats = format_llm_stats(prompt, streamed_content, duration, current_model)
-                    st.session_state.llm_stats.append(stats)
-                    st.session_state._just_streamed = True
-            else:
-                error_msg = "❌ News agent is not initialized. Please check your configuration."
-                response_timestamp = datetime.now().strftime("%H:%M:%S")
-                st.session_state.messages.append({
-                    "role": "assistant", 
-                    "content": error_msg,
-                    "timestamp": response_timestamp
-                })
-        except Exception as e:
-            error_msg = f"❌ Error generating response: {str(e)}"
-            response_timestamp = datetime.now().strftime("%H:%M:%S")
-            st.session_state.messages.append({
-                "role": "assistant", 
-                "content": error_msg,
-                "timestamp": response_timestamp
-            })
-    else:
-        # Non-streaming response (original behavior)
-        try:
-            if st.session_state.news_agent:
-                import time
-                start_time = time.time()
-                response = st.session_state.news_agent.search_and_analyze(prompt)
-                end_time = time.time()
-                duration = end_time - start_time
-                response_timestamp = datetime.now().strftime("%H:%M:%S")
-                st.session_state.messages.append({
-                    "role": "assistant", 
-                    "content": response,
-                    "timestamp": response_timestamp
-                })
-                current_model = st.session_state.get('current_model', 'Unknown')
-                stats = format_llm_stats(prompt, response, duration, current_model)
-                st.session_state.llm_stats.append(stats)
-            else:
-                error_msg = "❌ News agent is not initialized. Please check your configuration."
-                st.session_state.messages.append({
-                    "role": "assistant", 
-                    "content": error_msg,
-                    "timestamp": datetime.now().strftime("%H:%M:%S")
-                })
-        except Exception as e:
-            error_msg = f"❌ Error generating response: {str(e)}"
-            st.session_state.messages.append({
-                "role": "assistant", 
-                "content": error_msg,
-                "timestamp": datetime.now().strftime("%H:%M:%S")
-            })
+# Chat input (one query in flight per session; it runs on the background workers)
+if prompt := st.chat_input("Ask me about news, current events, or any topic...",
+                           disabled=active_job is not None):
+    submit_query(prompt, use_streaming)
     st.rerun()
 
+# Follow the query in flight, if any, until its answer joins the conversation
+if active_job is not None:
+    follow_query(active_job)
+
 # Footer
 st.markdown("---")
 st.markdown("""
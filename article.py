@@ -0,0 +1,318 @@
+"""
+Article Records
+Compact slotted article type and a columnar batch container for bulk operations
+"""
+
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Iterator, Optional, Sequence
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+PUBLISHED_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Query parameters that only track the referral and never change the page
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "ocid", "cmpid")
+
+_RELATIVE_DATE = re.compile(r"^\s*(\d+)\s+(second|minute|min|hour|day|week|month|year)s?\s+ago\s*$", re.IGNORECASE)
+_RELATIVE_UNITS = {
+    "second": timedelta(seconds=1),
+    "minute": timedelta(minutes=1),
+    "min": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=30),
+    "year": timedelta(days=365),
+}
+_ABSOLUTE_FORMATS = ("%b %d, %Y", "%B %d, %Y", "%d %b %Y", "%Y-%m-%d", PUBLISHED_FORMAT)
+
+
+def parse_article_date(raw: Optional[str], reference: Optional[float] = None) -> Optional[datetime]:
+    """Parse a Serper date ("3 hours ago", "Mar 4, 2024", ...) into a datetime
+
+    Args:
+        raw: Date string as returned by the search provider
+        reference: Timestamp relative dates are measured from (default: now)
+
+    Returns:
+        Parsed datetime, or None if the string isn't recognised
+    """
+    if not raw:
+        return None
+    match = _RELATIVE_DATE.match(raw)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2).lower()
+        return datetime.fromtimestamp(reference or time.time()) - amount * _RELATIVE_UNITS[unit]
+    for fmt in _ABSOLUTE_FORMATS:
+        try:
+            return datetime.strptime(raw.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so syndicated or tracked copies of the same page compare equal
+
+    Lowercases scheme and host, drops "www.", tracking parameters, fragments
+    and trailing slashes.
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not k.lower().startswith(_TRACKING_PARAMS)])
+    path = parts.path.rstrip("/") or ""
+    return urlunsplit((parts.scheme.lower() or "https", host, path, query, ""))
+
+
+class Article:
+    """A single search result
+
+    Slotted to keep per-article memory small; the publication datetime and
+    canonical URL are computed on first access. `alternates` holds
+    syndicated copies of the same story collapsed into this one. Supports read-only mapping
+    access (`article["title"]`, `article.get("source")`) so code written
+    against the old per-result dicts keeps working.
+    """
+
+    __slots__ = ("title", "url", "snippet", "source", "date", "search_engine",
+                 "fetched_at", "alternates", "_published", "_published_at", "_canonical_url")
+
+    _FIELDS = ("title", "url", "snippet", "source", "date", "published", "search_engine")
+
+    def __init__(self, title: str, url: str = "", snippet: str = "", source: str = "Unknown source",
+                 date: Optional[str] = None, published: Optional[str] = None,
+                 search_engine: Optional[str] = None, fetched_at: Optional[float] = None):
+        """Create an article
+
+        Args:
+            title: Headline
+            url: Link to the article
+            snippet: Short description
+            source: Publisher name
+            date: Raw date string from the provider (optional)
+            published: Display publication time, kept as the provider's raw date string
+                (e.g. "3 hours ago"); defaults to the fetch time formatted as PUBLISHED_FORMAT
+            search_engine: Provider that returned the article (optional)
+            fetched_at: Timestamp of the search; share one value per batch
+        """
+        self.title = title
+        self.url = url
+        self.snippet = snippet
+        self.source = source
+        self.date = date
+        self.search_engine = search_engine
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self.alternates: Sequence["Article"] = ()
+        self._published = published
+        self._published_at = None
+        self._canonical_url = None
+
+    @classmethod
+    def from_serper_news(cls, item: Dict[str, Any], fetched_at: Optional[float] = None) -> "Article":
+        """Build an article from one entry of a Serper news response"""
+        return cls(
+            title=item.get("title", "No title"),
+            url=item.get("link", ""),
+            snippet=item.get("snippet", "No description available"),
+            source=item.get("source", "Unknown source"),
+            date=item.get("date", "No date"),
+            published=item.get("date"),
+            search_engine="Serper API",
+            fetched_at=fetched_at
+        )
+
+    @classmethod
+    def from_serper_organic(cls, item: Dict[str, Any], fetched_at: Optional[float] = None) -> "Article":
+        """Build an article from one organic entry of a Serper web search response"""
+        return cls(
+            title=item.get("title", "No title"),
+            url=item.get("link", ""),
+            snippet=item.get("snippet", "No description available"),
+            source="Web search",
+            date="Recent",
+            search_engine="Serper API",
+            fetched_at=fetched_at
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], fetched_at: Optional[float] = None) -> "Article":
+        """Build an article from a legacy result dict (MCP tool input, cached payloads)"""
+        return cls(
+            title=data.get("title", "No title"),
+            url=data.get("url", data.get("link", "")),
+            snippet=data.get("snippet", data.get("content", "No description available")),
+            source=data.get("source", "Unknown source"),
+            date=data.get("date"),
+            published=data.get("published"),
+            search_engine=data.get("search_engine"),
+            fetched_at=fetched_at
+        )
+
+    @property
+    def published(self) -> str:
+        """Display publication time: the provider's raw date string (not parsed or
+        normalized; see `published_at`), or the fetch time when the provider gave none"""
+        if self._published is None:
+            self._published = datetime.fromtimestamp(self.fetched_at).strftime(PUBLISHED_FORMAT)
+        return self._published
+
+    @property
+    def published_at(self) -> Optional[datetime]:
+        """Publication time parsed from the provider's date string (lazy)"""
+        if self._published_at is None and self.date:
+            self._published_at = parse_article_date(self.date, self.fetched_at)
+        return self._published_at
+
+    @property
+    def canonical_url(self) -> str:
+        """Normalized URL for deduplication (lazy)"""
+        if self._canonical_url is None:
+            self._canonical_url = canonicalize_url(self.url)
+        return self._canonical_url
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the legacy result dict shape"""
+        result = {}
+        for field in self._FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                result[field] = value
+        return result
+
+    # Read-only mapping shim for existing dict consumers
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._FIELDS:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._FIELDS and getattr(self, key) is not None
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Article):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __hash__(self) -> int:
+        # Same fields as __eq__; don't change an article while it is in a set or used as a key
+        return hash(tuple(getattr(self, field) for field in self._FIELDS))
+
+    def __repr__(self) -> str:
+        return f"Article(title={self.title!r}, source={self.source!r}, url={self.url!r})"
+
+
+def coerce_article(value: Any) -> Article:
+    """Accept either an Article or a legacy result dict"""
+    return value if isinstance(value, Article) else Article.from_dict(value)
+
+
+class ArticleBatch:
+    """Columnar container of many articles for bulk operations
+
+    Each field is stored as one list, so batch jobs over tens of thousands of
+    results avoid per-article objects until an individual row is requested.
+    """
+
+    __slots__ = ("titles", "urls", "snippets", "sources", "dates", "search_engines", "fetched_at")
+
+    def __init__(self, fetched_at: Optional[float] = None):
+        """Create an empty batch
+
+        Args:
+            fetched_at: Timestamp shared by every row (default: now)
+        """
+        self.titles: List[str] = []
+        self.urls: List[str] = []
+        self.snippets: List[str] = []
+        self.sources: List[str] = []
+        self.dates: List[Optional[str]] = []
+        self.search_engines: List[Optional[str]] = []
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+    @classmethod
+    def from_serper_responses(cls, responses: Sequence[Dict[str, Any]],
+                              fetched_at: Optional[float] = None) -> "ArticleBatch":
+        """Build a batch straight from Serper news responses (e.g. `search_news_batch` output)"""
+        batch = cls(fetched_at)
+        for response in responses:
+            for item in response.get("news", ()):
+                batch.append_fields(item.get("title", "No title"), item.get("link", ""),
+                                    item.get("snippet", "No description available"),
+                                    item.get("source", "Unknown source"), item.get("date"), "Serper API")
+        return batch
+
+    @classmethod
+    def from_articles(cls, articles: Sequence[Any]) -> "ArticleBatch":
+        """Build a batch from Articles or legacy result dicts"""
+        batch = cls()
+        for article in map(coerce_article, articles):
+            batch.append_fields(article.title, article.url, article.snippet, article.source,
+                                article.date, article.search_engine)
+        return batch
+
+    def append_fields(self, title: str, url: str, snippet: str, source: str,
+                      date: Optional[str] = None, search_engine: Optional[str] = None):
+        """Append one row"""
+        self.titles.append(title)
+        self.urls.append(url)
+        self.snippets.append(snippet)
+        self.sources.append(source)
+        self.dates.append(date)
+        self.search_engines.append(search_engine)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def __getitem__(self, index: int) -> Article:
+        return Article(self.titles[index], self.urls[index], self.snippets[index], self.sources[index],
+                       date=self.dates[index], published=self.dates[index],
+                       search_engine=self.search_engines[index], fetched_at=self.fetched_at)
+
+    def __iter__(self) -> Iterator[Article]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def take(self, indices: Sequence[int]) -> "ArticleBatch":
+        """Select rows by index into a new batch"""
+        batch = ArticleBatch(self.fetched_at)
+        for column in ("titles", "urls", "snippets", "sources", "dates", "search_engines"):
+            values = getattr(self, column)
+            setattr(batch, column, [values[i] for i in indices])
+        return batch
+
+    def canonical_urls(self) -> List[str]:
+        """Canonical URL of every row"""
+        return [canonicalize_url(url) for url in self.urls]
+
+    def unique_by_url(self) -> "ArticleBatch":
+        """Drop rows whose canonical URL already appeared earlier in the batch"""
+        seen = set()
+        keep = []
+        for index, url in enumerate(self.canonical_urls()):
+            if url not in seen:
+                seen.add(url)
+                keep.append(index)
+        return self.take(keep)
+
+    def to_articles(self) -> List[Article]:
+        """Materialize every row as an Article"""
+        return list(self)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Convert every row to the legacy result dict shape"""
+        return [article.to_dict() for article in self]
@@ -0,0 +1,272 @@
+"""
+Asyncio Serper API Search Tool
+Non-blocking counterpart of SerperSearchTool with concurrent multi-query fan-out
+"""
+
+import os
+import json
+import asyncio
+import logging
+from typing import Dict, List, Any, Optional
+from dotenv import load_dotenv
+from http_pool import HTTPX_AVAILABLE, get_shared_async_client
+from search_cache import SearchCache, CacheKey, make_cache_key, get_search_cache
+from single_flight import get_single_flight
+from rate_limiter import RetryPolicy, SERPER_MAX_QUEUE_WAIT, get_serper_rate_limiter, get_serper_quota
+from serper_search_tool import (
+    SerperSearchTool, SerperRateLimited, SerperQuotaExceeded, SERPER_ENDPOINTS, _USE_SHARED_CACHE
+)
+
+if HTTPX_AVAILABLE:
+    import httpx
+
+    # Transport errors raised before the request reached Serper: safe to retry and not billed
+    _CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Default number of searches a single gather_searches call keeps in flight
+SERPER_MAX_CONCURRENCY = int(os.getenv('SERPER_MAX_CONCURRENCY', 8))
+
+
+class AsyncSerperSearchTool:
+    """Google Search tool using Serper API on asyncio
+
+    Shares the result cache with SerperSearchTool, and a pooled
+    `httpx.AsyncClient` per event loop, so thousands of in-flight searches
+    can be multiplexed on one loop.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, client: Optional["httpx.AsyncClient"] = None,
+                 cache: Optional[SearchCache] = _USE_SHARED_CACHE):
+        """Initialize the async Serper search tool
+
+        Args:
+            api_key: Serper API key. If None, will try to get from environment
+            client: Async HTTP client. If None, the loop's shared "serper" client is used
+            cache: Result cache. Defaults to the process-wide cache; pass None to disable caching
+        """
+        if not HTTPX_AVAILABLE:
+            raise ImportError("httpx is required for AsyncSerperSearchTool. Install with: pip install httpx")
+
+        self.api_key = api_key or os.getenv('SERPER_API_KEY')
+        if not self.api_key:
+            raise ValueError("Serper API key is required. Set SERPER_API_KEY environment variable.")
+
+        self._client = client
+        self.cache = get_search_cache() if cache is _USE_SHARED_CACHE else cache
+        self.single_flight = get_single_flight()
+        self.rate_limiter = get_serper_rate_limiter()
+        self.quota = get_serper_quota()
+        self.retry_policy = RetryPolicy()
+        self.headers = {
+            'X-API-KEY': self.api_key,
+            'Content-Type': 'application/json'
+        }
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        """The async HTTP client for the running event loop"""
+        return self._client or get_shared_async_client("serper")
+
+    async def search(self, query: str, num_results: int = 10, location: str = None) -> Dict[str, Any]:
+        """Perform a Google search using Serper API
+
+        Args:
+            query: Search query string
+            num_results: Number of results to return (default: 10)
+            location: Geographic location for search (optional)
+
+        Returns:
+            Dictionary containing search results
+        """
+        payload = {
+            "q": query,
+            "num": num_results
+        }
+
+        if location:
+            payload["gl"] = location
+
+        key = make_cache_key("search", query, num_results, location)
+        return await self._cached_fetch(key, "search", payload)
+
+    async def search_news(self, query: str, num_results: int = 10) -> Dict[str, Any]:
+        """Search for news articles specifically
+
+        Args:
+            query: News search query
+            num_results: Number of news results to return
+
+        Returns:
+            Dictionary containing news search results
+        """
+        payload = {
+            "q": query,
+            "num": num_results,
+            "type": "news"
+        }
+
+        key = make_cache_key("news", query, num_results)
+        return await self._cached_fetch(key, "news", payload)
+
+    async def gather_searches(self, queries: List[str], num_results: int = 10, news: bool = True,
+                              max_concurrency: int = SERPER_MAX_CONCURRENCY) -> List[Dict[str, Any]]:
+        """Run several searches concurrently with a cap on in-flight requests
+
+        Args:
+            queries: Search query strings
+            num_results: Number of results per query
+            news: Use the news endpoint (True) or general web search (False)
+            max_concurrency: Maximum number of searches in flight at once
+
+        Returns:
+            One result dict per query, in the same order as `queries`
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run(query: str) -> Dict[str, Any]:
+            async with semaphore:
+                if news:
+                    return await self.search_news(query, num_results)
+                return await self.search(query, num_results)
+
+        return await asyncio.gather(*(run(query) for query in queries))
+
+    async def _cached_fetch(self, key: CacheKey, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Serve a request from the result cache, fetching from Serper on a miss
+
+        Concurrent misses for the same key are coalesced into one upstream call.
+        """
+        async def fetch():
+            return await self.single_flight.ado(key, lambda: self._fetch(endpoint, payload))
+
+        if self.cache is None:
+            return await fetch()
+        return await self.cache.aget_or_fetch(key, fetch)
+
+    async def _post_with_retry(self, url: str, body: Any, credits: int = 1) -> "httpx.Response":
+        """POST through the shared rate limiter and quota tracker, retrying throttled or failed attempts
+
+        Mirrors SerperSearchTool._post_with_retry (read timeouts are not retried
+        or refunded), sleeping on the event loop instead of blocking a thread.
+        """
+        if not self.quota.try_consume(credits):
+            raise SerperQuotaExceeded(f"Serper quota exhausted ({self.quota.used}/{self.quota.limit} credits used)")
+
+        data = json.dumps(body)
+        attempt = 0
+        while True:
+            wait = self.rate_limiter.reserve(max_wait=SERPER_MAX_QUEUE_WAIT)
+            if wait is None:
+                self.quota.refund(credits)
+                raise SerperRateLimited(f"Rate limit queue wait exceeded {SERPER_MAX_QUEUE_WAIT:.0f}s")
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            try:
+                response = await self.client.post(url, headers=self.headers, content=data)
+            except _CONNECT_ERRORS:
+                if not self.retry_policy.should_retry(None, attempt):
+                    self.quota.refund(credits)
+                    raise
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code == 429:
+                self.rate_limiter.on_throttle()
+            elif response.is_success:
+                self.rate_limiter.on_success()
+
+            if not self.retry_policy.should_retry(response.status_code, attempt):
+                return response
+
+            delay = self.retry_policy.delay(attempt, response.headers.get("Retry-After"))
+            logger.warning(f"⚠️ Serper returned {response.status_code}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _fetch(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a query payload to a Serper endpoint
+
+        Args:
+            endpoint: Endpoint name ("search" or "news")
+            payload: JSON request body
+
+        Returns:
+            Parsed response, or an error dict if the request failed ("refused": True
+            when the rate limiter or quota refused it without reaching Serper)
+        """
+        url, request_error, parse_error = SERPER_ENDPOINTS[endpoint]
+        try:
+            response = await self._post_with_retry(url, payload)
+
+            response.raise_for_status()
+            return response.json()
+
+        except (SerperRateLimited, SerperQuotaExceeded) as e:
+            return {
+                "error": f"{request_error}: {str(e)}",
+                "success": False,
+                "refused": True
+            }
+        except httpx.HTTPError as e:
+            return {
+                "error": f"{request_error}: {str(e)}",
+                "success": False
+            }
+        except json.JSONDecodeError as e:
+            return {
+                "error": f"{parse_error}: {str(e)}",
+                "success": False
+            }
+
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """Get statistics on how many identical in-flight searches were collapsed"""
+        return self.single_flight.get_stats()
+
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """Get rate limiter and quota usage statistics (shared with SerperSearchTool)"""
+        return {
+            "rate_limiter": self.rate_limiter.get_stats(),
+            "quota": self.quota.get_stats()
+        }
+
+    # Formatting is pure, so the synchronous implementation is reused as-is
+    format_search_results = SerperSearchTool.format_search_results
+
+    async def test_connection(self) -> bool:
+        """Test if the Serper API connection is working
+
+        Returns:
+            True if connection is successful, False otherwise
+        """
+        try:
+            test_result = await self._fetch("search", {"q": "test query", "num": 1})
+            return "error" not in test_result
+        except Exception:
+            return False
+
+
+if __name__ == "__main__":
+    async def main():
+        tool = AsyncSerperSearchTool()
+
+        print("🔍 Testing async Serper search fan-out...")
+        print("=" * 50)
+
+        queries = ["artificial intelligence", "climate technology", "space exploration"]
+        results = await tool.gather_searches(queries, num_results=3)
+        for query, result in zip(queries, results):
+            count = len(result.get("news", []))
+            status = "❌ " + result["error"] if "error" in result else f"✅ {count} articles"
+            print(f"• {query}: {status}")
+
+    try:
+        asyncio.run(main())
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
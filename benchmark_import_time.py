@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the agent modules
+
+Imports each module in a fresh interpreter with `python -X importtime`, reports
+its cumulative import cost and the heaviest dependencies it pulls in, and exits
+non-zero if any module exceeds the startup budget.
+
+Usage:
+    python benchmark_import_time.py [--budget-ms 800] [--repeat 3] [module ...]
+"""
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Modules on the cold-start path of the Streamlit app, the MCP server and the CLI probes
+DEFAULT_MODULES = [
+    "config",
+    "news_agent_clarifai",
+    "serper_search_tool",
+    "async_serper_search_tool",
+    "mcp_server",
+]
+
+# Per-module budget in milliseconds (overridable via environment or --budget-ms)
+IMPORT_TIME_BUDGET_MS = float(os.getenv('IMPORT_TIME_BUDGET_MS', 800))
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def measure_import(module: str) -> Tuple[float, Dict[str, float]]:
+    """Import a module in a fresh interpreter and collect -X importtime output
+
+    Args:
+        module: Module name to import
+
+    Returns:
+        Tuple of (cumulative import time of the module in ms,
+        self time in ms per top-level package it imported)
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [here, os.getenv('PYTHONPATH')])))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=here, env=env
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+
+    # importtime prints children before their parent, so everything after the
+    # interpreter's own startup imports and up to the module's line belongs to it
+    lines = [m for m in map(_IMPORTTIME_LINE.match, proc.stderr.splitlines()) if m]
+    total_ms = 0.0
+    packages: Dict[str, float] = defaultdict(float)
+    start = 0
+    for index, match in enumerate(lines):
+        self_us, cumulative_us, indent, name = match.groups()
+        if name == module and len(indent) == 1:
+            total_ms = int(cumulative_us) / 1000
+            for child in lines[start:index + 1]:
+                packages[child.group(4).split(".")[0]] += int(child.group(1)) / 1000
+            break
+        if name == "site" and len(indent) == 1:
+            start = index + 1
+    return total_ms, dict(packages)
+
+
+def run_benchmark(modules: List[str], budget_ms: float, repeat: int) -> bool:
+    """Measure every module and print a report
+
+    Returns:
+        True if every module imported within budget
+    """
+    print("⏱️ Import Time Benchmark")
+    print("=" * 50)
+    ok = True
+    for module in modules:
+        try:
+            # Keep the fastest run to filter out disk cache and scheduler noise
+            runs = [measure_import(module) for _ in range(repeat)]
+        except RuntimeError as e:
+            print(f"❌ {module}: {e}")
+            ok = False
+            continue
+        total_ms, packages = min(runs, key=lambda run: run[0])
+        within = total_ms <= budget_ms
+        ok = ok and within
+        print(f"{'✅' if within else '❌'} {module}: {total_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+        heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:5]
+        for package, ms in heaviest:
+            print(f"     {package:<28} {ms:8.1f} ms")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cold import time of the agent modules")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Modules to measure")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_TIME_BUDGET_MS,
+                        help="Maximum cumulative import time per module")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module (fastest is kept)")
+    args = parser.parse_args()
+
+    passed = run_benchmark(args.modules, args.budget_ms, args.repeat)
+    print(f"\n📊 {'Within budget' if passed else 'Startup budget exceeded'}")
+    sys.exit(0 if passed else 1)
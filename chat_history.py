@@ -0,0 +1,127 @@
+"""
+Chat History View
+Caches the rendered markup of each chat message and pages the history, so reruns
+only touch the visible window however long the conversation gets
+"""
+
+import os
+import html
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+from stream_renderer import process_assistant_content
+
+# Load environment variables
+load_dotenv()
+
+# History view configuration (overridable via environment)
+CHAT_HISTORY_WINDOW = int(os.getenv('CHAT_HISTORY_WINDOW', 20))             # messages shown per page
+CHAT_HISTORY_CACHE_SIZE = int(os.getenv('CHAT_HISTORY_CACHE_SIZE', 500))    # rendered messages kept per session
+
+
+def display_llm_stats(stats, dark_theme=True):
+    """Display LLM statistics as HTML"""
+    theme_class = "llm-stats-dark" if dark_theme else ""
+
+    stats_html = f"""
+    <div class="llm-stats {theme_class}">
+        <div class="stat-item">
+            <span class="stat-label">Model:</span> {stats['model']}
+        </div>
+        <div class="stat-item">
+            <span class="stat-label">Prompt Tokens:</span> {stats['prompt_tokens']:,}
+        </div>
+        <div class="stat-item">
+            <span class="stat-label">Response Tokens:</span> {stats['response_tokens']:,}
+        </div>
+        <div class="stat-item">
+            <span class="stat-label">Total Tokens:</span> {stats['total_tokens']:,}
+        </div>
+        <div class="stat-item">
+            <span class="stat-label">Duration:</span> {stats['duration']:.2f}s
+        </div>
+        <div class="stat-item">
+            <span class="stat-label">Tokens/sec:</span> {stats['tokens_per_second']:.1f}
+        </div>
+    </div>
+    """
+    return stats_html
+
+
+class RenderedMessage:
+    """Pre-rendered markup for one chat message"""
+
+    __slots__ = ("role", "header", "body", "stats_html")
+
+    def __init__(self, role: str, header: str, body: str, stats_html: Optional[str]):
+        self.role = role
+        self.header = header            # HTML (the full block for user messages)
+        self.body = body                # Markdown for assistant messages, empty for user messages
+        self.stats_html = stats_html
+
+
+def _render(message: Dict[str, Any], stats: Optional[Dict[str, Any]]) -> RenderedMessage:
+    timestamp = message.get('timestamp', '')
+    if message["role"] == "user":
+        escaped_content = html.escape(message["content"])
+        header = f"""
+            <div class="chat-message user-message">
+                <strong>👤 You</strong> <small>{timestamp}</small><br>
+                <div style="white-space: pre-wrap;">{escaped_content}</div>
+            </div>
+            """
+        return RenderedMessage("user", header, "", None)
+    header = f"""
+        <div class="chat-message assistant-message">
+            <strong>🤖 News AI</strong> <small>{timestamp}</small><br>
+        """
+    return RenderedMessage("assistant", header, process_assistant_content(message["content"]),
+                           display_llm_stats(stats, dark_theme=True) if stats else None)
+
+
+class MessageRenderCache:
+    """LRU cache of rendered messages, keyed by what the markup depends on
+
+    A message is re-rendered only when its role, timestamp, content or
+    statistics change. Python caches string hashes, so looking up an unchanged
+    message costs O(1) however long its content is.
+    """
+
+    def __init__(self, max_entries: int = CHAT_HISTORY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, RenderedMessage]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, message: Dict[str, Any], stats: Optional[Dict[str, Any]] = None) -> RenderedMessage:
+        """Rendered markup for `message` (with its statistics block, if any)"""
+        key = (message["role"], message.get('timestamp', ''), message["content"],
+               tuple(sorted(stats.items())) if stats else None)
+        rendered = self._entries.get(key)
+        if rendered is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return rendered
+        self.misses += 1
+        rendered = _render(message, stats)
+        self._entries[key] = rendered
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return rendered
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def history_start(total: int, pages: int = 1, window: int = CHAT_HISTORY_WINDOW) -> int:
+    """Index of the first message to render: only the newest `pages` windows are shown
+
+    The returned index is also the number of older messages left hidden.
+    """
+    if window <= 0:
+        return 0
+    return max(0, total - max(1, pages) * window)
+
@@ -0,0 +1,168 @@
+"""
+Circuit Breaker for Search Providers
+Skips a failing backend for a cool-down window instead of stalling every request on it
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Breaker configuration (overridable via environment)
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5))
+CIRCUIT_ERROR_RATE = float(os.getenv('CIRCUIT_ERROR_RATE', 0.5))
+CIRCUIT_WINDOW = int(os.getenv('CIRCUIT_WINDOW', 20))
+CIRCUIT_MIN_CALLS = int(os.getenv('CIRCUIT_MIN_CALLS', 10))
+CIRCUIT_COOLDOWN = float(os.getenv('CIRCUIT_COOLDOWN', 30))
+CIRCUIT_HALF_OPEN_PROBES = int(os.getenv('CIRCUIT_HALF_OPEN_PROBES', 1))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Closed / open / half-open circuit breaker
+
+    The circuit opens after `failure_threshold` consecutive failures, or when
+    the error rate over the last `window` calls reaches `error_rate` (once at
+    least `min_calls` have been seen). While open, `allow_request` returns
+    False so callers fail over immediately. After `cooldown` seconds a limited
+    number of probe requests are let through; a successful probe closes the
+    circuit and a failed one re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 error_rate: float = CIRCUIT_ERROR_RATE, window: int = CIRCUIT_WINDOW,
+                 min_calls: int = CIRCUIT_MIN_CALLS, cooldown: float = CIRCUIT_COOLDOWN,
+                 half_open_probes: int = CIRCUIT_HALF_OPEN_PROBES):
+        """Initialize the breaker
+
+        Args:
+            name: Backend name used in logs and status reports
+            failure_threshold: Consecutive failures that open the circuit
+            error_rate: Failure fraction over the window that opens the circuit
+            window: Number of recent calls considered for the error rate
+            min_calls: Calls required in the window before the error rate applies
+            cooldown: Seconds the circuit stays open before probing
+            half_open_probes: Concurrent probe requests allowed while half-open
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.half_open_probes = half_open_probes
+
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+        self._stats = {"successes": 0, "failures": 0, "short_circuited": 0, "opened": 0}
+
+    def allow_request(self) -> bool:
+        """Whether a call to the backend should be attempted now"""
+        with self._lock:
+            if self.state == OPEN and time.time() - self._opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probes_in_flight = 0
+                logger.info(f"🟡 {self.name} circuit half-open - probing")
+
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+
+            self._stats["short_circuited"] += 1
+            return False
+
+    def record_success(self):
+        """Report a successful call"""
+        with self._lock:
+            self._stats["successes"] += 1
+            self._consecutive_failures = 0
+            self._outcomes.append(True)
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self._outcomes.clear()
+                logger.info(f"🟢 {self.name} circuit closed - backend recovered")
+
+    def record_failure(self):
+        """Report a failed call"""
+        with self._lock:
+            self._stats["failures"] += 1
+            self._consecutive_failures += 1
+            self._outcomes.append(False)
+
+            if self.state == HALF_OPEN:
+                self._open()
+            elif self.state == CLOSED and self._should_open():
+                self._open()
+
+    def release(self):
+        """Return a half-open probe slot for a call that was cancelled without an outcome"""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes_in_flight > 0:
+                self._probes_in_flight -= 1
+
+    def _should_open(self) -> bool:
+        if self._consecutive_failures >= self.failure_threshold:
+            return True
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return False
+        failures = calls - sum(self._outcomes)
+        return failures / calls >= self.error_rate
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.time()
+        self._probes_in_flight = 0
+        self._stats["opened"] += 1
+        logger.warning(f"🔴 {self.name} circuit open - skipping for {self.cooldown:.0f}s")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get the breaker state and counters for status displays"""
+        with self._lock:
+            calls = len(self._outcomes)
+            status = dict(self._stats)
+            status.update({
+                "name": self.name,
+                "state": self.state,
+                "consecutive_failures": self._consecutive_failures,
+                "error_rate": (calls - sum(self._outcomes)) / calls if calls else 0.0,
+                "retry_in": max(0.0, self._opened_at + self.cooldown - time.time()) if self.state == OPEN else 0.0,
+            })
+        return status
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Get the process-wide breaker for a backend, so an outage seen by one session protects all"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name)
+            _breakers[name] = breaker
+        return breaker
+
+
+def get_all_breaker_status() -> Dict[str, Dict[str, Any]]:
+    """Get the status of every registered breaker"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.get_status() for breaker in breakers}
@@ -4,6 +4,7 @@ Configuration helper for News Chatbot
 
 import os
 from typing import Dict, List, Optional
+from lazy_imports import is_installed
 
 def get_config() -> Dict:
     """Get current configuration"""
@@ -65,42 +66,16 @@ def get_model_info(model_name: str) -> Dict:
     })
 
 def validate_setup() -> Dict[str, bool]:
-    """Validate the current setup"""
-    try:
-        import streamlit
-        streamlit_ok = True
-    except ImportError:
-        streamlit_ok = False
-    
-    try:
-        import requests
-        requests_ok = True
-    except ImportError:
-        requests_ok = False
-    
-    try:
-        from dotenv import load_dotenv
-        dotenv_ok = True
-    except ImportError:
-        dotenv_ok = False
-    
-    try:
-        import litellm
-        litellm_ok = True
-    except ImportError:
-        litellm_ok = False
-    
-    try:
-        from google import genai
-        google_adk_ok = True
-    except ImportError:
-        google_adk_ok = False
+    """Validate the current setup
     
+    Uses package metadata rather than importing each dependency, so the check
+    stays fast even when heavy packages like LiteLLM are installed.
+    """
     return {
-        "streamlit": streamlit_ok,
-        "requests": requests_ok,
-        "python_dotenv": dotenv_ok,
-        "litellm": litellm_ok,
-        "google_adk": google_adk_ok,
+        "streamlit": is_installed("streamlit"),
+        "requests": is_installed("requests"),
+        "python_dotenv": is_installed("python-dotenv", "dotenv"),
+        "litellm": is_installed("litellm"),
+        "google_adk": is_installed("google-genai", "google.genai"),
         "clarifai_configured": is_clarifai_configured()
     }
@@ -0,0 +1,304 @@
+"""
+Token-budgeted Context Builder
+Fits search results into an analysis prompt using the model's real tokenizer
+"""
+
+import os
+import re
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from lazy_imports import LazyModule, is_installed
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+LITELLM_AVAILABLE = is_installed("litellm")
+
+# Budget configuration (overridable via environment)
+CONTEXT_MAX_PROMPT_TOKENS = int(os.getenv('CONTEXT_MAX_PROMPT_TOKENS', 2500))
+CONTEXT_WINDOW_TOKENS = int(os.getenv('CONTEXT_WINDOW_TOKENS', 8192))
+CONTEXT_COMPLETION_TOKENS = int(os.getenv('CONTEXT_COMPLETION_TOKENS', 800))
+CONTEXT_MIN_SNIPPET_TOKENS = int(os.getenv('CONTEXT_MIN_SNIPPET_TOKENS', 24))
+
+# Tokenizer configuration: Hugging Face tokenizers (Llama, Cohere) are downloaded on first
+# use, so they are off by default; a tokenizer that doesn't load in time isn't waited for
+CONTEXT_HF_TOKENIZERS = os.getenv('CONTEXT_HF_TOKENIZERS', 'false').lower() == 'true'
+CONTEXT_TOKENIZER_TIMEOUT = float(os.getenv('CONTEXT_TOKENIZER_TIMEOUT', 5))
+
+# Tokenizer used when the selected model's own tokenizer isn't available
+DEFAULT_TOKENIZER_MODEL = "gpt-4o"
+
+
+def _configure_tokenizers(module):
+    """Apply CONTEXT_HF_TOKENIZERS unless the application already set LiteLLM's download switch"""
+    if module.disable_hf_tokenizer_download is None:
+        module.disable_hf_tokenizer_download = not CONTEXT_HF_TOKENIZERS
+
+
+litellm = LazyModule("litellm", on_load=_configure_tokenizers)
+
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+_BOILERPLATE = re.compile(r"^(?:\w{3} \d{1,2}, \d{4}|\d+ \w+ ago)\s*(?:\.{3}|…|-|—)\s*", re.IGNORECASE)
+
+
+class TokenCounter:
+    """Counts and truncates text with a model's tokenizer via LiteLLM
+
+    The tokenizer is resolved on first use, so creating a counter doesn't
+    import LiteLLM. Models whose own tokenizer isn't available (a Hugging Face
+    download that is disabled, slow or offline) are counted with the default
+    OpenAI tokenizer and `exact` is False; without LiteLLM a 4-chars-per-token
+    estimate is used.
+    """
+
+    def __init__(self, model: str):
+        """Initialize the counter
+
+        Args:
+            model: Model name as known to LiteLLM (e.g. "gpt-4o")
+        """
+        self.model = model
+        self._resolved: Optional[Tuple[Optional[str], bool]] = None
+
+    def _resolve(self) -> Tuple[Optional[str], bool]:
+        if self._resolved is None:
+            self._resolved = _resolve_tokenizer_model(self.model)
+        return self._resolved
+
+    @property
+    def tokenizer_model(self) -> Optional[str]:
+        """Model whose tokenizer LiteLLM counts with (None when estimating)"""
+        return self._resolve()[0]
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from the model's own tokenizer"""
+        return self._resolve()[1]
+
+    def count(self, text: str) -> int:
+        """Number of tokens in `text`"""
+        if not text:
+            return 0
+        if self.tokenizer_model is None:
+            return max(1, len(text) // 4)
+        return litellm.token_counter(model=self.tokenizer_model, text=text)
+
+    def count_messages(self, messages: List[Dict[str, Any]]) -> int:
+        """Number of prompt tokens for a chat request, including message framing"""
+        if self.tokenizer_model is None:
+            return sum(self.count(message.get("content", "")) + 4 for message in messages) + 3
+        return litellm.token_counter(model=self.tokenizer_model, messages=messages)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut `text` to at most `max_tokens` tokens, preferring a sentence or word boundary"""
+        if max_tokens <= 0:
+            return ""
+        if self.count(text) <= max_tokens:
+            return text
+        # Leave one token for the ellipsis
+        if self.tokenizer_model is not None:
+            tokens = litellm.encode(model=self.tokenizer_model, text=text)
+            cut = litellm.decode(model=self.tokenizer_model, tokens=list(tokens[:max_tokens - 1]))
+        else:
+            cut = text[:(max_tokens - 1) * 4]
+
+        sentences = _SENTENCE_END.split(cut)
+        if len(sentences) > 1 and len(cut) - len(sentences[-1]) > len(cut) // 2:
+            return cut[:len(cut) - len(sentences[-1])].rstrip()
+        space = cut.rfind(" ")
+        if space > len(cut) // 2:
+            cut = cut[:space]
+        return cut.rstrip(" ,;:-") + "…"
+
+
+def _load_tokenizer(model: str) -> bool:
+    """Load the tokenizer LiteLLM picks for `model`; True if it is a Hugging Face (model-specific) one"""
+    litellm.decode(model=model, tokens=litellm.encode(model=model, text="probe"))
+    return litellm.utils._select_tokenizer(model)["type"] == "huggingface_tokenizer"
+
+
+def _probe_tokenizer(model: str, timeout: float) -> Optional[bool]:
+    """`_load_tokenizer` on a helper thread; None if it failed or took longer than `timeout`"""
+    outcome: Dict[str, bool] = {}
+
+    def probe():
+        try:
+            outcome["huggingface"] = _load_tokenizer(model)
+        except Exception as e:
+            logger.debug(f"Tokenizer for {model!r} unavailable: {e}")
+
+    thread = threading.Thread(target=probe, name="tokenizer-probe", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        logger.warning(f"⚠️ Tokenizer for {model!r} took over {timeout:.0f}s to load - "
+                       f"counting with the {DEFAULT_TOKENIZER_MODEL} tokenizer")
+    return outcome.get("huggingface")
+
+
+def _is_openai_model(model: str) -> bool:
+    return litellm.model_cost.get(model, {}).get("litellm_provider") == "openai"
+
+
+@lru_cache(maxsize=None)
+def _resolve_tokenizer_model(model: str) -> Tuple[Optional[str], bool]:
+    """Pick the tokenizer for `model` once, including when it fails to load
+
+    Returns:
+        (model to pass to LiteLLM's tokenizer, or None to estimate; whether it is the model's own)
+    """
+    if not LITELLM_AVAILABLE:
+        return None, False
+    # Import up front, so the timeout bounds only the tokenizer load
+    litellm.load()
+    # LiteLLM silently counts unknown models (and Hugging Face models whose download is
+    # disabled) with tiktoken, which is only the model's own tokenizer for OpenAI models
+    huggingface = _probe_tokenizer(model, CONTEXT_TOKENIZER_TIMEOUT)
+    if huggingface or (huggingface is not None and _is_openai_model(model)):
+        return model, True
+    # Count everything else with the default tokenizer directly, so later counts never retry a download
+    if model == DEFAULT_TOKENIZER_MODEL or _probe_tokenizer(DEFAULT_TOKENIZER_MODEL, CONTEXT_TOKENIZER_TIMEOUT) is None:
+        return None, False
+    return DEFAULT_TOKENIZER_MODEL, False
+
+
+@lru_cache(maxsize=16)
+def get_token_counter(model: str) -> TokenCounter:
+    """Get a shared token counter for a model"""
+    return TokenCounter(model)
+
+
+def count_tokens(text: str, model: str = DEFAULT_TOKENIZER_MODEL) -> int:
+    """Count tokens in `text` with the model's tokenizer"""
+    return get_token_counter(model).count(text)
+
+
+def compress_snippet(snippet: str) -> str:
+    """Normalize whitespace and drop leading date boilerplate from a search snippet"""
+    snippet = _WHITESPACE.sub(" ", snippet or "").strip()
+    return _BOILERPLATE.sub("", snippet)
+
+
+class BuiltContext:
+    """Result of building a prompt within a token budget"""
+
+    __slots__ = ("prompt", "prompt_tokens", "budget", "articles", "trimmed", "dropped", "exact")
+
+    def __init__(self, prompt: str, prompt_tokens: int, budget: int, articles: List[Any],
+                 trimmed: int, dropped: int, exact: bool):
+        self.prompt = prompt
+        self.prompt_tokens = prompt_tokens
+        self.budget = budget
+        self.articles = articles
+        self.trimmed = trimmed
+        self.dropped = dropped
+        self.exact = exact
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Summary of the build for logs and statistics displays"""
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "budget": self.budget,
+            "articles": len(self.articles),
+            "trimmed": self.trimmed,
+            "dropped": self.dropped,
+            "exact": self.exact,
+        }
+
+
+class ContextBuilder:
+    """Builds analysis prompts that fit a token budget
+
+    The budget is the smaller of `max_prompt_tokens` and the context window
+    minus the tokens reserved for the completion. Article headers (title,
+    source, date, URL) are kept whole; the remaining budget is shared between
+    snippets so short snippets keep their full text and long ones are trimmed
+    to an equal share. If even the minimum snippet allowance doesn't fit, the
+    lowest-ranked articles are dropped.
+    """
+
+    def __init__(self, model: str, max_prompt_tokens: int = CONTEXT_MAX_PROMPT_TOKENS,
+                 context_window: int = CONTEXT_WINDOW_TOKENS,
+                 completion_tokens: int = CONTEXT_COMPLETION_TOKENS,
+                 min_snippet_tokens: int = CONTEXT_MIN_SNIPPET_TOKENS):
+        """Initialize the builder
+
+        Args:
+            model: Model name used to pick the tokenizer
+            max_prompt_tokens: Upper bound on prompt tokens
+            context_window: Model context window
+            completion_tokens: Tokens reserved for the completion
+            min_snippet_tokens: Smallest snippet worth including for an article
+        """
+        self.counter = get_token_counter(model)
+        self.budget = max(0, min(max_prompt_tokens, context_window - completion_tokens))
+        self.min_snippet_tokens = min_snippet_tokens
+
+    def build(self, articles: List[Any], format_article: Callable[[int, Any, str], str],
+              wrap: Callable[[str], str]) -> BuiltContext:
+        """Build a prompt from ranked articles
+
+        Args:
+            articles: Articles in priority order
+            format_article: Renders (1-based index, article, snippet) as a context block
+            wrap: Renders the complete prompt around the joined context
+
+        Returns:
+            BuiltContext with the prompt and its exact prompt token count
+        """
+        counter = self.counter
+        overhead = counter.count_messages([{"role": "user", "content": wrap("")}])
+        available = self.budget - overhead
+
+        snippets = [compress_snippet(article.get("snippet", "")) for article in articles]
+        headers = [counter.count(format_article(i, article, "")) for i, article in enumerate(articles, 1)]
+        snippet_tokens = [counter.count(snippet) for snippet in snippets]
+
+        # Drop lowest-ranked articles until every kept one gets at least the minimum snippet allowance
+        kept = len(articles)
+        while kept and sum(headers[:kept]) + sum(min(n, self.min_snippet_tokens) for n in snippet_tokens[:kept]) > available:
+            kept -= 1
+
+        allowances = _water_fill(snippet_tokens[:kept], max(0, available - sum(headers[:kept])))
+        blocks = []
+        trimmed = 0
+        for i in range(kept):
+            snippet = snippets[i]
+            if snippet_tokens[i] > allowances[i]:
+                snippet = counter.truncate(snippet, allowances[i])
+                trimmed += 1
+            blocks.append(format_article(i + 1, articles[i], snippet))
+
+        prompt = wrap("".join(blocks))
+        prompt_tokens = counter.count_messages([{"role": "user", "content": prompt}])
+        context = BuiltContext(prompt, prompt_tokens, self.budget, list(articles[:kept]),
+                               trimmed, len(articles) - kept, counter.exact)
+        if trimmed or context.dropped:
+            logger.info(f"✂️ Prompt fitted to {prompt_tokens}/{self.budget} tokens "
+                        f"({trimmed} snippets trimmed, {context.dropped} articles dropped)")
+        return context
+
+
+def _water_fill(demands: List[int], capacity: int) -> List[int]:
+    """Split `capacity` so small demands are met in full and large ones share the rest equally"""
+    allowances = [0] * len(demands)
+    remaining = capacity
+    pending = sorted(range(len(demands)), key=lambda i: demands[i])
+    while pending:
+        share = remaining // len(pending)
+        index = pending[0]
+        if demands[index] <= share:
+            allowances[index] = demands[index]
+            remaining -= demands[index]
+            pending.pop(0)
+        else:
+            for index in pending:
+                allowances[index] = share
+            break
+    return allowances
@@ -0,0 +1,417 @@
+"""
+Conversation Store
+Durable chat history: each session keeps only its newest turns in memory and
+pages older ones from SQLite, under per-session and process-wide memory caps
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import sqlite3
+import tempfile
+import logging
+import threading
+import weakref
+from collections import OrderedDict, deque
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Store configuration (overridable via environment)
+CONVERSATION_PERSIST = os.getenv('CONVERSATION_PERSIST', 'true').lower() == 'true'
+# Next to the app by default, so the conversation file doesn't depend on the launch directory
+CONVERSATION_DB_PATH = os.getenv('CONVERSATION_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                      '.cache', 'conversations.sqlite3'))
+CONVERSATION_MEMORY_TURNS = int(os.getenv('CONVERSATION_MEMORY_TURNS', 50))          # newest records kept in memory
+CONVERSATION_SESSION_MAX_BYTES = int(os.getenv('CONVERSATION_SESSION_MAX_BYTES', 2 * 1024 * 1024))
+CONVERSATION_GLOBAL_MAX_BYTES = int(os.getenv('CONVERSATION_GLOBAL_MAX_BYTES', 64 * 1024 * 1024))
+CONVERSATION_PAGE_SIZE = int(os.getenv('CONVERSATION_PAGE_SIZE', 50))                # records per disk read
+
+# Exports larger than this spill from memory to a temporary file
+EXPORT_SPOOL_BYTES = 1024 * 1024
+
+# Streams stored per session
+MESSAGES = "messages"
+LLM_STATS = "llm_stats"
+
+_SESSION_ID = re.compile(r'^[0-9a-f]{32}$')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversation_records (
+    session_id TEXT    NOT NULL,
+    stream     TEXT    NOT NULL,
+    seq        INTEGER NOT NULL,
+    record     TEXT    NOT NULL,
+    size       INTEGER NOT NULL,
+    created_at REAL    NOT NULL,
+    PRIMARY KEY (session_id, stream, seq)
+);
+"""
+
+
+def new_session_id() -> str:
+    """Random, unguessable conversation id"""
+    return uuid.uuid4().hex
+
+
+def is_session_id(value: Any) -> bool:
+    """Whether `value` looks like an id from `new_session_id`"""
+    return isinstance(value, str) and bool(_SESSION_ID.match(value))
+
+
+def export_jsonl(records: Iterable[Any]) -> Iterator[str]:
+    """Stream records as JSON lines; with a `ConversationLog`, older pages are read as they are needed"""
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def export_to_file(records: Iterable[Any]) -> IO[bytes]:
+    """JSON Lines export in a spooled temporary file, rewound and ready to read"""
+    export = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES, mode="w+b")
+    for line in export_jsonl(records):
+        export.write(line.encode("utf-8"))
+    export.seek(0)
+    return export
+
+
+class ConversationLog:
+    """List-like, append-only record log of one session stream (messages or statistics)
+
+    Supports `append`, `len`, indexing (negative indices and slices too),
+    iteration and `clear`, so it can stand in for a plain list in
+    `st.session_state`. Only the newest records are held in memory; older
+    ones are read from disk a page at a time. A record whose write failed
+    stays pinned in memory, and is written again on the next append, so a
+    storage error never loses a turn.
+    """
+
+    def __init__(self, store: "ConversationStore", session_id: str, stream: str, length: int):
+        self._store = store
+        self.session_id = session_id
+        self.stream = stream
+        self._lock = threading.Lock()
+        self._length = length
+        self._window: deque = deque()          # (record, size) for the newest records
+        self._window_bytes = 0
+        self._window_loaded = length == 0
+        self._pages: "OrderedDict[int, List[Any]]" = OrderedDict()
+        self._unpersisted: Dict[int, Tuple[Any, int]] = {}      # seq -> (record, size) not yet on disk
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __bool__(self) -> bool:
+        return self._length > 0
+
+    def append(self, record: Any):
+        """Persist a record and keep it in the in-memory window"""
+        serialized = json.dumps(record, ensure_ascii=False)
+        size = len(serialized)
+        with self._lock:
+            self._ensure_window()
+            seq = self._length
+            # Earlier failed records go first, so the records on disk never have a gap
+            if not (self._write_unpersisted() and self._store._write(self.session_id, self.stream, seq, serialized)):
+                self._unpersisted[seq] = (record, size)
+            self._window.append((record, size))
+            self._window_bytes += size
+            self._length += 1
+            self._trim()
+            window_bytes = self._memory_bytes()
+        self._store._account(self, window_bytes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("conversation index out of range")
+        with self._lock:
+            self._ensure_window()
+            window_start = self._length - len(self._window)
+            if index >= window_start:
+                record = self._window[index - window_start][0]
+            elif index in self._unpersisted:
+                record = self._unpersisted[index][0]
+            else:
+                record = self._from_page(index)
+            window_bytes = self._memory_bytes()
+        # Marks the stream as recently used (and counts a reloaded window)
+        self._store._account(self, window_bytes)
+        return record
+
+    def __iter__(self) -> Iterator[Any]:
+        """Every record in order, older ones streamed from disk page by page"""
+        length = self._length
+        page_size = self._store.page_size
+        with self._lock:
+            window = [record for record, _ in self._window] if self._window_loaded else []
+        window_start = length - len(window)
+        for start in range(0, window_start, page_size):
+            yield from self._read(start, min(start + page_size, window_start))
+        yield from window
+
+    def clear(self):
+        """Delete every record of this stream, in memory and on disk"""
+        with self._lock:
+            self._store._delete(self.session_id, self.stream)
+            self._window.clear()
+            self._window_bytes = 0
+            self._window_loaded = True
+            self._pages.clear()
+            self._unpersisted.clear()
+            self._length = 0
+        self._store._account(self, 0)
+
+    def _ensure_window(self):
+        # Reload the newest records after the window was released under memory pressure
+        if self._window_loaded:
+            return
+        start = max(0, self._length - self._store.memory_turns)
+        for record in self._read(start, self._length):
+            size = len(json.dumps(record, ensure_ascii=False))
+            self._window.append((record, size))
+            self._window_bytes += size
+        self._window_loaded = True
+        self._trim()
+
+    def _trim(self):
+        while self._window and (len(self._window) > self._store.memory_turns or
+                                self._window_bytes > self._store.session_max_bytes):
+            _, size = self._window.popleft()
+            self._window_bytes -= size
+
+    def _from_page(self, index: int) -> Any:
+        page_size = self._store.page_size
+        number = index // page_size
+        page = self._pages.get(number)
+        if page is None:
+            start = number * page_size
+            page = self._read(start, start + page_size)
+            # A partial page may gain records later, so only full pages are kept
+            if len(page) == page_size:
+                self._pages[number] = page
+                while len(self._pages) > 2:
+                    self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(number)
+        offset = index - number * page_size
+        if offset >= len(page):
+            raise IndexError("conversation record missing from store")
+        return page[offset]
+
+    def _read(self, start: int, end: int) -> List[Any]:
+        # Records from disk, with the ones whose write failed filled in from memory
+        records = dict(self._store._read_rows(self.session_id, self.stream, start, end))
+        records.update((seq, record) for seq, (record, _) in self._unpersisted.items() if start <= seq < end)
+        return [records[seq] for seq in sorted(records)]
+
+    def _write_unpersisted(self) -> bool:
+        # Retry records whose write failed, oldest first; True once none are left
+        for seq in sorted(self._unpersisted):
+            record, _ = self._unpersisted[seq]
+            if not self._store._write(self.session_id, self.stream, seq, json.dumps(record, ensure_ascii=False)):
+                return False
+            del self._unpersisted[seq]
+        return True
+
+    def _memory_bytes(self) -> int:
+        return self._window_bytes + sum(size for _, size in self._unpersisted.values())
+
+    def _release(self) -> int:
+        """Drop the in-memory window (records stay on disk); returns the bytes freed"""
+        with self._lock:
+            freed = self._window_bytes
+            self._window.clear()
+            self._window_bytes = 0
+            self._window_loaded = self._length == 0
+            self._pages.clear()
+        return freed
+
+
+class ConversationStore:
+    """SQLite-backed store of every session's conversation
+
+    Uses WAL mode with per-thread connections, like the persistent search
+    cache, so several worker processes can share the file. Storage errors are
+    logged and counted; records that failed to write are kept in memory by
+    their log until a later write succeeds. In-memory windows are capped
+    per session and, across all sessions, by releasing the windows of the
+    least recently used conversations first.
+    """
+
+    def __init__(self, path: str = CONVERSATION_DB_PATH, memory_turns: int = CONVERSATION_MEMORY_TURNS,
+                 session_max_bytes: int = CONVERSATION_SESSION_MAX_BYTES,
+                 global_max_bytes: int = CONVERSATION_GLOBAL_MAX_BYTES, page_size: int = CONVERSATION_PAGE_SIZE):
+        """Open (and create if needed) the store
+
+        Args:
+            path: SQLite database file
+            memory_turns: Newest records of each stream kept in memory
+            session_max_bytes: In-memory budget of one stream (serialized size)
+            global_max_bytes: In-memory budget of all open streams together
+            page_size: Records read per disk page when older turns are accessed
+        """
+        self.path = path
+        self.memory_turns = max(1, memory_turns)
+        self.session_max_bytes = session_max_bytes
+        self.global_max_bytes = global_max_bytes
+        self.page_size = max(1, page_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._logs: "weakref.WeakValueDictionary[Tuple[str, str], ConversationLog]" = weakref.WeakValueDictionary()
+        # In-memory bytes per open stream, least recently used first
+        self._memory: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._memory_bytes = 0
+        self._stats = {"writes": 0, "page_reads": 0, "errors": 0, "released": 0}
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def open(self, session_id: str, stream: str = MESSAGES) -> ConversationLog:
+        """Get the log of one session stream, shared by every tab showing that session"""
+        key = (session_id, stream)
+        with self._lock:
+            log = self._logs.get(key)
+            if log is not None:
+                return log
+        try:
+            length = self._connection().execute(
+                "SELECT COALESCE(MAX(seq) + 1, 0) FROM conversation_records WHERE session_id = ? AND stream = ?",
+                key
+            ).fetchone()[0]
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.warning(f"⚠️ Conversation load failed: {str(e)}")
+            length = 0
+        with self._lock:
+            log = self._logs.get(key)
+            if log is None:
+                log = ConversationLog(self, session_id, stream, length)
+                self._logs[key] = log
+                weakref.finalize(log, self._forget, key)
+            return log
+
+    def _forget(self, key: Tuple[str, str]):
+        with self._lock:
+            self._memory_bytes -= self._memory.pop(key, 0)
+
+    def _account(self, log: ConversationLog, window_bytes: int):
+        """Record a stream's in-memory size and release other windows while over the global cap"""
+        key = (log.session_id, log.stream)
+        with self._lock:
+            self._memory_bytes += window_bytes - self._memory.pop(key, 0)
+            self._memory[key] = window_bytes
+            victims = []
+            excess = self._memory_bytes - self.global_max_bytes
+            for other in self._memory:
+                if excess <= 0 or other == key:
+                    break
+                victims.append(other)
+                excess -= self._memory[other]
+        for other in victims:
+            victim = self._logs.get(other)
+            freed = victim._release() if victim is not None else 0
+            with self._lock:
+                if other in self._memory:
+                    self._memory_bytes -= self._memory.pop(other)
+                self._stats["released"] += 1
+            logger.debug(f"🧹 Released {freed} bytes of conversation {other[0][:8]} from memory")
+
+    def _write(self, session_id: str, stream: str, seq: int, serialized: str) -> bool:
+        """Insert one record; False (logged and counted) if the write failed"""
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO conversation_records "
+                "(session_id, stream, seq, record, size, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (session_id, stream, seq, serialized, len(serialized), time.time())
+            )
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.warning(f"⚠️ Conversation write failed: {str(e)}")
+            return False
+        self._count("writes")
+        return True
+
+    def _read_rows(self, session_id: str, stream: str, start: int, end: int) -> List[Tuple[int, Any]]:
+        self._count("page_reads")
+        try:
+            rows = self._connection().execute(
+                "SELECT seq, record FROM conversation_records "
+                "WHERE session_id = ? AND stream = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (session_id, stream, start, end)
+            ).fetchall()
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.warning(f"⚠️ Conversation read failed: {str(e)}")
+            return []
+        return [(seq, json.loads(record)) for seq, record in rows]
+
+    def _delete(self, session_id: str, stream: str):
+        try:
+            self._connection().execute(
+                "DELETE FROM conversation_records WHERE session_id = ? AND stream = ?", (session_id, stream)
+            )
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.warning(f"⚠️ Conversation delete failed: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Store statistics: open streams, in-memory bytes, and on-disk rows and size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["open_streams"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_bytes
+        try:
+            rows, size = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM conversation_records"
+            ).fetchone()
+            stats["rows"] = rows
+            stats["bytes"] = size
+        except sqlite3.Error:
+            pass
+        stats["path"] = self.path
+        return stats
+
+
+_shared_store: Optional[ConversationStore] = None
+_shared_store_failed = False
+_shared_store_lock = threading.Lock()
+
+
+def get_conversation_store() -> Optional[ConversationStore]:
+    """Get the process-wide conversation store, or None when persistence is disabled or unavailable"""
+    global _shared_store, _shared_store_failed
+    if not CONVERSATION_PERSIST or _shared_store_failed:
+        return None
+    if _shared_store is None:
+        with _shared_store_lock:
+            if _shared_store is None and not _shared_store_failed:
+                try:
+                    _shared_store = ConversationStore()
+                    logger.info(f"✅ Conversation store at {CONVERSATION_DB_PATH}")
+                except (sqlite3.Error, OSError) as e:
+                    _shared_store_failed = True
+                    logger.warning(f"⚠️ Conversation store unavailable: {str(e)}")
+    return _shared_store
@@ -0,0 +1,220 @@
+"""
+Backend Health Checks
+Background, cached health probes so sessions never pay for a connection test on the request path
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, Any, Optional, Tuple
+from dotenv import load_dotenv
+from http_pool import get_shared_session
+from lazy_imports import is_installed
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Probe configuration (overridable via environment)
+HEALTH_CHECK_INTERVAL = float(os.getenv('HEALTH_CHECK_INTERVAL', 60))
+HEALTH_CHECK_TTL = float(os.getenv('HEALTH_CHECK_TTL', 180))
+HEALTH_CHECK_TIMEOUT = float(os.getenv('HEALTH_CHECK_TIMEOUT', 5))
+
+HEALTHY = "healthy"
+UNHEALTHY = "unhealthy"
+UNKNOWN = "unknown"
+
+CLARIFAI_MODELS_URL = "https://api.clarifai.com/v2/ext/openai/v1/models"
+SERPER_BASE_URL = "https://google.serper.dev"
+GOOGLE_MODELS_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+
+# A probe returns (healthy, detail); exceptions count as unhealthy
+Probe = Callable[[], Tuple[bool, str]]
+
+
+class HealthChecker:
+    """Runs registered probes on a background thread and caches their results
+
+    `get_status` never blocks: it returns the last cached result, or UNKNOWN if
+    the backend has not been probed yet or the result is older than `ttl`.
+    """
+
+    def __init__(self, interval: float = HEALTH_CHECK_INTERVAL, ttl: float = HEALTH_CHECK_TTL):
+        """Initialize the checker
+
+        Args:
+            interval: Seconds between probes of the same backend
+            ttl: Seconds a cached result stays valid
+        """
+        self.interval = interval
+        self.ttl = ttl
+        self._probes: Dict[str, Probe] = {}
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._next_due: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._stats = {"probes": 0, "probe_failures": 0}
+
+    def register(self, name: str, probe: Probe):
+        """Register a backend probe; it runs at the next background cycle"""
+        with self._lock:
+            self._probes[name] = probe
+            self._next_due[name] = 0.0
+        self._wakeup.set()
+
+    def start(self):
+        """Start the background probe thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="health-checker", daemon=True)
+            self._thread.start()
+
+    def refresh(self, name: Optional[str] = None):
+        """Ask the background thread to re-probe one or all backends now (does not wait)"""
+        with self._lock:
+            for probe_name in ([name] if name else list(self._next_due)):
+                if probe_name in self._next_due:
+                    self._next_due[probe_name] = 0.0
+        self._wakeup.set()
+
+    def check_now(self, name: str) -> Dict[str, Any]:
+        """Run one probe synchronously (for CLI diagnostics, not the request path)"""
+        with self._lock:
+            probe = self._probes[name]
+        return self._probe(name, probe)
+
+    def _run(self):
+        while True:
+            now = time.time()
+            with self._lock:
+                due = [(name, probe) for name, probe in self._probes.items() if self._next_due[name] <= now]
+                for name, _ in due:
+                    self._next_due[name] = now + self.interval
+            for name, probe in due:
+                self._probe(name, probe)
+
+            with self._lock:
+                next_due = min(self._next_due.values(), default=now + self.interval)
+            self._wakeup.wait(max(0.0, next_due - time.time()))
+            self._wakeup.clear()
+
+    def _probe(self, name: str, probe: Probe) -> Dict[str, Any]:
+        start = time.time()
+        try:
+            healthy, detail = probe()
+        except Exception as e:
+            healthy, detail = False, f"{type(e).__name__}: {e}"
+        result = {
+            "status": HEALTHY if healthy else UNHEALTHY,
+            "detail": detail,
+            "latency": time.time() - start,
+            "checked_at": time.time(),
+        }
+        with self._lock:
+            previous = self._results.get(name)
+            self._results[name] = result
+            self._stats["probes"] += 1
+            if not healthy:
+                self._stats["probe_failures"] += 1
+        # Log transitions only, so a missing key doesn't warn on every cycle
+        if previous is None or previous["status"] != result["status"]:
+            if healthy:
+                logger.info(f"✅ {name} health check passed ({detail})")
+            else:
+                logger.warning(f"⚠️ {name} health check failed: {detail}")
+        return result
+
+    def get_status(self, name: str) -> Dict[str, Any]:
+        """Get the cached status of a backend without blocking"""
+        with self._lock:
+            result = self._results.get(name)
+        if result is None or time.time() - result["checked_at"] > self.ttl:
+            return {"status": UNKNOWN, "detail": "not checked yet", "latency": None, "checked_at": None}
+        return dict(result)
+
+    def is_healthy(self, name: str) -> bool:
+        """True only if the backend's latest fresh probe succeeded"""
+        return self.get_status(name)["status"] == HEALTHY
+
+    def is_unhealthy(self, name: str) -> bool:
+        """True only if the backend's latest fresh probe failed (unknown is not unhealthy)"""
+        return self.get_status(name)["status"] == UNHEALTHY
+
+    def get_all_status(self) -> Dict[str, Dict[str, Any]]:
+        """Get the cached status of every registered backend"""
+        with self._lock:
+            names = list(self._probes)
+        return {name: self.get_status(name) for name in names}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get probe counters"""
+        with self._lock:
+            return dict(self._stats, backends=len(self._probes))
+
+
+def _valid_key(value: Optional[str]) -> bool:
+    return bool(value) and not value.startswith("your_")
+
+
+def probe_clarifai() -> Tuple[bool, str]:
+    """Validate the Clarifai PAT by listing models (free, unlike a completion)"""
+    pat = os.getenv('CLARIFAI_PAT')
+    if not _valid_key(pat):
+        return False, "CLARIFAI_PAT not set"
+    response = get_shared_session("health").get(
+        CLARIFAI_MODELS_URL, headers={"Authorization": f"Bearer {pat}"}, timeout=HEALTH_CHECK_TIMEOUT
+    )
+    if response.status_code in (401, 403):
+        return False, "invalid CLARIFAI_PAT"
+    return response.status_code < 500, f"HTTP {response.status_code}"
+
+
+def probe_serper() -> Tuple[bool, str]:
+    """Check Serper reachability without running a (billed) search
+
+    Key validity is observed from real traffic by the Serper circuit breaker.
+    The breaker's state is deliberately not reported here: it only moves from
+    open to half-open when a search asks it, so failing the probe on an open
+    circuit would keep Serper skipped (and the circuit open) for good.
+    """
+    if not _valid_key(os.getenv('SERPER_API_KEY')):
+        return False, "SERPER_API_KEY not set"
+    response = get_shared_session("health").request("HEAD", SERPER_BASE_URL, timeout=HEALTH_CHECK_TIMEOUT)
+    return response.status_code < 500, f"HTTP {response.status_code}"
+
+
+def probe_google_adk() -> Tuple[bool, str]:
+    """Validate the Google API key by listing Gemini models (free)"""
+    if not is_installed("google-genai", "google.genai"):
+        return False, "google-genai not installed"
+    api_key = os.getenv('GOOGLE_API_KEY') or os.getenv('GEMINI_API_KEY')
+    if not _valid_key(api_key):
+        return False, "GOOGLE_API_KEY not set"
+    response = get_shared_session("health").get(
+        GOOGLE_MODELS_URL, params={"key": api_key, "pageSize": 1}, timeout=HEALTH_CHECK_TIMEOUT
+    )
+    if response.status_code in (400, 401, 403):
+        return False, "invalid GOOGLE_API_KEY"
+    return response.status_code < 500, f"HTTP {response.status_code}"
+
+
+_shared_checker = None
+_shared_checker_lock = threading.Lock()
+
+
+def get_health_checker() -> HealthChecker:
+    """Get the process-wide health checker, with the default backends registered and running"""
+    global _shared_checker
+    with _shared_checker_lock:
+        if _shared_checker is None:
+            checker = HealthChecker()
+            checker.register("Clarifai", probe_clarifai)
+            checker.register("Serper API", probe_serper)
+            checker.register("Google ADK", probe_google_adk)
+            checker.start()
+            _shared_checker = checker
+        return _shared_checker
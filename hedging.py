@@ -0,0 +1,299 @@
+"""
+Hedged LLM Requests
+Races a backup request against a slow first token and keeps whichever stream starts first
+"""
+
+import os
+import math
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, Sequence
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Hedging configuration (overridable via environment)
+LLM_HEDGING_ENABLED = os.getenv('LLM_HEDGING_ENABLED', 'false').lower() == 'true'
+LLM_HEDGE_PERCENTILE = float(os.getenv('LLM_HEDGE_PERCENTILE', 90))
+LLM_HEDGE_MIN_DELAY = float(os.getenv('LLM_HEDGE_MIN_DELAY', 0.5))
+LLM_HEDGE_MAX_DELAY = float(os.getenv('LLM_HEDGE_MAX_DELAY', 5))
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv('LLM_HEDGE_DEFAULT_DELAY', 2))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv('LLM_HEDGE_MIN_SAMPLES', 10))
+# "alternate" hedges on the next model in the route, "same" re-sends to the same model
+LLM_HEDGE_MODEL = os.getenv('LLM_HEDGE_MODEL', 'alternate').lower()
+
+PRIMARY = 0
+HEDGE = 1
+
+
+class HedgeResult:
+    """Winner of a hedged race: which request won, its first chunk and the rest of its stream"""
+
+    __slots__ = ("index", "first", "chunks", "ttft", "hedged", "errors")
+
+    def __init__(self, index: int, first: Any, chunks: Any, ttft: float, hedged: bool,
+                 errors: Dict[int, BaseException]):
+        self.index = index
+        self.first = first
+        self.chunks = chunks
+        self.ttft = ttft
+        self.hedged = hedged
+        self.errors = errors
+
+
+class HedgeFailed(Exception):
+    """Raised when no request of a race produced a first chunk
+
+    `errors` maps PRIMARY / HEDGE to the exception each request raised;
+    `hedged` tells whether the backup request was sent at all.
+    """
+
+    def __init__(self, message: str, errors: Dict[int, BaseException], hedged: bool):
+        super().__init__(message)
+        self.errors = errors
+        self.hedged = hedged
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty sample"""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct * len(ordered) / 100) - 1))
+    return ordered[rank]
+
+
+def _close_quietly(chunks: Any):
+    close = getattr(chunks, "close", None)
+    if close is not None:
+        try:
+            close()
+        except Exception as e:
+            logger.debug(f"Closing hedged stream failed: {e}")
+
+
+async def _aclose_quietly(chunks: Any):
+    close = getattr(chunks, "aclose", None)
+    if close is not None:
+        try:
+            await close()
+        except Exception as e:
+            logger.debug(f"Closing hedged stream failed: {e}")
+
+
+class _Race:
+    """Shared state of one threaded race"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.winner: Optional[tuple] = None
+        self.errors: Dict[int, BaseException] = {}
+        self.launched = 0
+        self.closed = False
+
+
+class Hedger:
+    """Sends a backup request when the first token is later than usual
+
+    The hedge delay is a high percentile of the model's recent
+    time-to-first-token, so only the slow tail pays for a second request.
+    Whichever request yields its first chunk first is kept; the other one is
+    closed as soon as it returns.
+    """
+
+    def __init__(self, percentile: float = LLM_HEDGE_PERCENTILE, min_delay: float = LLM_HEDGE_MIN_DELAY,
+                 max_delay: float = LLM_HEDGE_MAX_DELAY, default_delay: float = LLM_HEDGE_DEFAULT_DELAY,
+                 min_samples: int = LLM_HEDGE_MIN_SAMPLES):
+        """Initialize the hedger
+
+        Args:
+            percentile: TTFT percentile after which the hedge is sent
+            min_delay: Lower bound of the hedge delay in seconds
+            max_delay: Upper bound of the hedge delay in seconds
+            default_delay: Delay used until `min_samples` TTFTs have been observed
+            min_samples: Observations needed before the percentile is trusted
+        """
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge")
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "primary_wins": 0, "failures": 0}
+        # First-token latency seen by callers, hedging included
+        self._first_token_latencies = deque(maxlen=500)
+
+    def delay(self, ttft_samples: Sequence[float]) -> float:
+        """Hedge delay for a model given its recent time-to-first-token samples"""
+        if len(ttft_samples) < self.min_samples:
+            return self.default_delay
+        return min(self.max_delay, max(self.min_delay, percentile(ttft_samples, self.percentile)))
+
+    def race(self, start_primary: Callable[[], Iterator], start_hedge: Callable[[], Iterator],
+             delay: float, timeout: float) -> HedgeResult:
+        """Start the primary stream, hedge it after `delay`, and return the first to yield a chunk
+
+        Args:
+            start_primary: Opens the primary stream (called on a worker thread)
+            start_hedge: Opens the backup stream (called on a worker thread)
+            delay: Seconds to wait for the primary's first chunk before hedging
+            timeout: Seconds to wait for any first chunk in total
+
+        Raises:
+            HedgeFailed: Every started request failed, or none produced a chunk in time
+        """
+        race = _Race()
+        started = time.time()
+        deadline = started + timeout
+
+        def settled():
+            return race.winner is not None or len(race.errors) == race.launched
+
+        with race.condition:
+            self._launch(race, PRIMARY, start_primary)
+            race.condition.wait_for(settled, timeout=max(0.0, min(delay, timeout)))
+            # A primary that fails fast is not hedged; the caller's fallback handles errors
+            hedged = race.winner is None and not race.errors and time.time() < deadline
+            if hedged:
+                logger.info(f"🎯 No first token after {time.time() - started:.2f}s - sending hedge request")
+                self._launch(race, HEDGE, start_hedge)
+                race.condition.wait_for(settled, timeout=max(0.0, deadline - time.time()))
+            race.closed = True
+            winner, errors = race.winner, dict(race.errors)
+
+        self._record(winner, hedged, time.time() - started)
+        if winner is None:
+            raise HedgeFailed(f"No first token within {timeout:.1f}s" if not errors else "All requests failed",
+                              errors, hedged)
+        index, first, chunks, ttft = winner
+        return HedgeResult(index, first, chunks, ttft, hedged, errors)
+
+    def _launch(self, race: _Race, index: int, start: Callable[[], Iterator]):
+        race.launched += 1
+        started = time.time()
+
+        def run():
+            try:
+                chunks = start()
+                try:
+                    first = next(chunks)
+                except StopIteration:
+                    raise ValueError("empty stream")
+            except Exception as e:
+                with race.condition:
+                    race.errors[index] = e
+                    race.condition.notify_all()
+                return
+            with race.condition:
+                if race.winner is None and not race.closed:
+                    race.winner = (index, first, chunks, time.time() - started)
+                    race.condition.notify_all()
+                    return
+            # Lost the race (or the caller gave up): release the connection
+            _close_quietly(chunks)
+
+        self._executor.submit(run)
+
+    async def arace(self, start_primary: Callable[[], Awaitable[AsyncIterator]],
+                    start_hedge: Callable[[], Awaitable[AsyncIterator]],
+                    delay: float, timeout: float) -> HedgeResult:
+        """Async counterpart of `race`; the losing request's task is cancelled"""
+        started = time.time()
+        deadline = started + timeout
+
+        async def first_chunk(start):
+            begun = time.time()
+            chunks = await start()
+            try:
+                first = await chunks.__anext__()
+            except StopAsyncIteration:
+                await _aclose_quietly(chunks)
+                raise ValueError("empty stream")
+            except BaseException:
+                await _aclose_quietly(chunks)
+                raise
+            return first, chunks, time.time() - begun
+
+        tasks = {asyncio.ensure_future(first_chunk(start_primary)): PRIMARY}
+        errors: Dict[int, BaseException] = {}
+        winner = None
+        hedged = False
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=max(0.0, min(delay, timeout)))
+            if not done and time.time() < deadline:
+                hedged = True
+                logger.info(f"🎯 No first token after {time.time() - started:.2f}s - sending hedge request")
+                tasks[asyncio.ensure_future(first_chunk(start_hedge))] = HEDGE
+
+            pending = set(tasks)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, deadline - time.time()),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in sorted(done, key=tasks.get):
+                    if task.exception() is not None:
+                        errors[tasks[task]] = task.exception()
+                    elif winner is None:
+                        first, chunks, ttft = task.result()
+                        winner = (tasks[task], first, chunks, ttft)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    # Cancelling closes the losing stream if it was already open
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                elif not task.cancelled() and task.exception() is None and \
+                        (winner is None or task.result()[1] is not winner[2]):
+                    await _aclose_quietly(task.result()[1])
+
+        self._record(winner, hedged, time.time() - started)
+        if winner is None:
+            raise HedgeFailed(f"No first token within {timeout:.1f}s" if not errors else "All requests failed",
+                              errors, hedged)
+        index, first, chunks, ttft = winner
+        return HedgeResult(index, first, chunks, ttft, hedged, errors)
+
+    def _record(self, winner: Optional[tuple], hedged: bool, elapsed: float):
+        with self._lock:
+            self._stats["requests"] += 1
+            if hedged:
+                self._stats["hedged"] += 1
+            if winner is None:
+                self._stats["failures"] += 1
+                return
+            self._first_token_latencies.append(elapsed)
+            if winner[0] == HEDGE:
+                self._stats["hedge_wins"] += 1
+            elif hedged:
+                self._stats["primary_wins"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hedge rate (extra requests sent), hedge win rate and the resulting first-token p50/p99"""
+        with self._lock:
+            stats = dict(self._stats)
+            latencies = list(self._first_token_latencies)
+        stats["hedge_rate"] = stats["hedged"] / stats["requests"] if stats["requests"] else 0.0
+        stats["hedge_win_rate"] = stats["hedge_wins"] / stats["hedged"] if stats["hedged"] else 0.0
+        stats["first_token_p50"] = percentile(latencies, 50) if latencies else None
+        stats["first_token_p99"] = percentile(latencies, 99) if latencies else None
+        return stats
+
+
+_shared_hedger: Optional[Hedger] = None
+_shared_hedger_lock = threading.Lock()
+
+
+def get_hedger() -> Hedger:
+    """Get the process-wide hedger, so hedge statistics cover every session"""
+    global _shared_hedger
+    with _shared_hedger_lock:
+        if _shared_hedger is None:
+            _shared_hedger = Hedger()
+        return _shared_hedger
@@ -0,0 +1,375 @@
+"""
+Shared HTTP Connection Pools
+Process-wide keep-alive sessions so repeated API calls reuse TCP/TLS connections
+"""
+
+import os
+import asyncio
+import threading
+import weakref
+from typing import Dict, Any, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+# httpx backs the asyncio clients; it ships as a litellm dependency
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# HTTP/2 in httpx needs the optional h2 package
+try:
+    import h2  # noqa: F401
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+# Load environment variables
+load_dotenv()
+
+# Pool configuration (overridable via environment)
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 10))   # distinct hosts kept pooled
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 32))           # keep-alive connections per host
+HTTP_POOL_BLOCK = os.getenv('HTTP_POOL_BLOCK', 'false').lower() == 'true'
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 30))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv('HTTP_KEEPALIVE_EXPIRY', 60))    # idle seconds before a connection is dropped
+
+# LLM endpoint pool: shared by every agent and session in the process
+LLM_POOL_NAME = "llm"
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv('LLM_POOL_MAX_CONNECTIONS', 20))  # concurrent connections to the LLM API
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv('LLM_POOL_MAX_KEEPALIVE', 10))
+LLM_POOL_TIMEOUT = float(os.getenv('LLM_POOL_TIMEOUT', 10))               # wait for a free connection
+LLM_HTTP2_ENABLED = os.getenv('LLM_HTTP2_ENABLED', 'true').lower() == 'true'
+
+
+class PooledSession:
+    """A keep-alive `requests.Session` with bounded per-host pools and reuse counters"""
+
+    def __init__(self, pool_connections: int = HTTP_POOL_CONNECTIONS,
+                 pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                 pool_block: bool = HTTP_POOL_BLOCK,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+                 read_timeout: float = HTTP_READ_TIMEOUT):
+        """Create the pooled session
+
+        Args:
+            pool_connections: Number of per-host connection pools to cache
+            pool_maxsize: Maximum keep-alive connections kept per host
+            pool_block: Block when a host pool is exhausted instead of opening extra connections
+            connect_timeout: Seconds allowed to establish a connection
+            read_timeout: Seconds allowed between bytes of the response
+        """
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+        self._lock = threading.Lock()
+        self._requests_sent = 0
+        self._request_errors = 0
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request through the shared pool, applying the default split timeout"""
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            with self._lock:
+                self._requests_sent += 1
+                self._request_errors += 1
+            raise
+        with self._lock:
+            self._requests_sent += 1
+        return response
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """POST through the shared pool"""
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET through the shared pool"""
+        return self.request("GET", url, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return connection reuse counters for this session
+
+        `connections_opened` counts TCP/TLS handshakes performed by the live host
+        pools; every other request was served on a reused keep-alive connection.
+        """
+        pools = self.adapter.poolmanager.pools
+        connections_opened = 0
+        pool_requests = 0
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections_opened += pool.num_connections
+            pool_requests += pool.num_requests
+
+        with self._lock:
+            requests_sent = self._requests_sent
+            request_errors = self._request_errors
+
+        connections_reused = max(pool_requests - connections_opened, 0)
+        return {
+            "requests": requests_sent,
+            "errors": request_errors,
+            "hosts": len(pools),
+            "connections_opened": connections_opened,
+            "connections_reused": connections_reused,
+            "reuse_ratio": connections_reused / pool_requests if pool_requests else 0.0
+        }
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+
+_shared_sessions: Dict[str, PooledSession] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_session(name: str = "default") -> PooledSession:
+    """Get the process-wide pooled session registered under `name`
+
+    All tool instances, agents and Streamlit sessions in the process share the
+    same session, so connections opened by one caller are reused by the next.
+    """
+    session = _shared_sessions.get(name)
+    if session is not None:
+        return session
+    with _shared_lock:
+        session = _shared_sessions.get(name)
+        if session is None:
+            session = PooledSession()
+            _shared_sessions[name] = session
+        return session
+
+
+def get_pool_stats(name: Optional[str] = None) -> Dict[str, Any]:
+    """Get connection reuse statistics for one shared session or all of them"""
+    if name is not None:
+        session = _shared_sessions.get(name)
+        return session.get_stats() if session else {}
+    return {session_name: session.get_stats() for session_name, session in list(_shared_sessions.items())}
+
+
+def close_shared_sessions():
+    """Close and forget every shared session and sync client (e.g. on shutdown or in tests)"""
+    with _shared_lock:
+        for session in _shared_sessions.values():
+            session.close()
+        _shared_sessions.clear()
+        for client in _http_clients.values():
+            client.close()
+        _http_clients.clear()
+
+
+class _ClientStats:
+    """Request and connection counters for one shared httpx client
+
+    Fed by httpcore trace events, so requests made by SDKs that wrap the
+    client (e.g. the OpenAI SDK used by LiteLLM) are counted too.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.http2_requests = 0
+        self.errors = 0
+        self.connections_opened = 0
+
+    def _on_trace(self, event_name: str, info: Dict[str, Any]):
+        with self._lock:
+            if event_name == "connection.connect_tcp.complete":
+                self.connections_opened += 1
+            elif event_name in ("connection.connect_tcp.failed", "connection.start_tls.failed"):
+                self.errors += 1
+            elif event_name.endswith(".send_request_headers.started"):
+                self.requests += 1
+                if event_name.startswith("http2."):
+                    self.http2_requests += 1
+            elif event_name.endswith(".receive_response_headers.failed"):
+                self.errors += 1
+
+    def hook(self, request: "httpx.Request"):
+        """Request hook for `httpx.Client` that attaches the trace callback"""
+        request.extensions.setdefault("trace", self._on_trace)
+
+    async def ahook(self, request: "httpx.Request"):
+        """Request hook for `httpx.AsyncClient` (httpcore awaits async trace callbacks)"""
+        async def trace(event_name: str, info: Dict[str, Any]):
+            self._on_trace(event_name, info)
+        request.extensions.setdefault("trace", trace)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            requests_sent = self.requests
+            connections_opened = self.connections_opened
+            stats = {
+                "requests": requests_sent,
+                "http2_requests": self.http2_requests,
+                "errors": self.errors,
+                "connections_opened": connections_opened,
+            }
+        # HTTP/2 multiplexes several requests over one connection, so reuse is per request
+        connections_reused = max(requests_sent - connections_opened, 0)
+        stats["connections_reused"] = connections_reused
+        stats["reuse_ratio"] = connections_reused / requests_sent if requests_sent else 0.0
+        return stats
+
+
+_http_clients: Dict[str, "httpx.Client"] = {}
+_client_stats: Dict[str, _ClientStats] = {}
+
+
+def _stats_for(name: str) -> _ClientStats:
+    with _shared_lock:
+        stats = _client_stats.get(name)
+        if stats is None:
+            stats = _client_stats[name] = _ClientStats()
+        return stats
+
+
+def _client_options(http2: bool, max_connections: Optional[int], max_keepalive: Optional[int],
+                    pool_timeout: Optional[float]) -> Dict[str, Any]:
+    """Keyword arguments shared by the sync and async httpx clients"""
+    return {
+        "http2": http2 and H2_AVAILABLE,
+        "limits": httpx.Limits(
+            max_connections=max_connections or HTTP_POOL_MAXSIZE * HTTP_POOL_CONNECTIONS,
+            max_keepalive_connections=max_keepalive or HTTP_POOL_MAXSIZE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        ),
+        "timeout": httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT,
+                                 pool=pool_timeout if pool_timeout is not None else HTTP_READ_TIMEOUT)
+    }
+
+
+def get_shared_http_client(name: str = "default", http2: bool = False, max_connections: Optional[int] = None,
+                           max_keepalive: Optional[int] = None,
+                           pool_timeout: Optional[float] = None) -> "httpx.Client":
+    """Get the process-wide pooled `httpx.Client` registered under `name`
+
+    The pool options only apply when the client is first created; later
+    callers get the same client whatever they pass.
+
+    Args:
+        name: Registry name of the client
+        http2: Negotiate HTTP/2 when the h2 package is installed
+        max_connections: Upper bound on concurrent connections (requests wait for a free one)
+        max_keepalive: Idle keep-alive connections kept open
+        pool_timeout: Seconds to wait for a free connection (defaults to the read timeout)
+    """
+    if not HTTPX_AVAILABLE:
+        raise ImportError("httpx is required for pooled HTTP clients. Install with: pip install httpx")
+
+    client = _http_clients.get(name)
+    if client is not None and not client.is_closed:
+        return client
+    stats = _stats_for(name)
+    with _shared_lock:
+        client = _http_clients.get(name)
+        if client is None or client.is_closed:
+            client = httpx.Client(event_hooks={"request": [stats.hook]},
+                                  **_client_options(http2, max_connections, max_keepalive, pool_timeout))
+            _http_clients[name] = client
+        return client
+
+
+def get_llm_http_client() -> "httpx.Client":
+    """Pooled client for the LLM API, shared by every agent and Streamlit session"""
+    return get_shared_http_client(LLM_POOL_NAME, http2=LLM_HTTP2_ENABLED, max_connections=LLM_POOL_MAX_CONNECTIONS,
+                                  max_keepalive=LLM_POOL_MAX_KEEPALIVE, pool_timeout=LLM_POOL_TIMEOUT)
+
+
+def get_http_client_stats(name: Optional[str] = None) -> Dict[str, Any]:
+    """Get request and connection reuse counters for one httpx client name or all of them
+
+    Sync and async clients registered under the same name share their counters.
+    """
+    if name is not None:
+        stats = _client_stats.get(name)
+        return stats.snapshot() if stats else {}
+    return {client_name: stats.snapshot() for client_name, stats in list(_client_stats.items())}
+
+
+# Async clients are bound to the event loop that created them, so they are
+# shared per (loop, name) rather than process-wide
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+_loop_finalizers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+
+def _close_on_loop_shutdown(loop: asyncio.AbstractEventLoop, clients: Dict[str, Any]):
+    """Close `clients` when `loop` finalizes its async generators
+
+    The loop tracks every started async generator and closes them in
+    `shutdown_asyncgens()`, which `asyncio.run` (and other runners) call
+    while the loop can still run the `aclose()` awaits.
+    """
+    async def close_clients():
+        try:
+            yield
+        finally:
+            for client in list(clients.values()):
+                await client.aclose()
+            clients.clear()
+
+    finalizer = close_clients()
+    try:
+        finalizer.asend(None).send(None)  # first iteration registers it with the running loop
+    except StopIteration:
+        pass
+    _loop_finalizers[loop] = finalizer
+
+
+def get_shared_async_client(name: str = "default", http2: bool = False, max_connections: Optional[int] = None,
+                            max_keepalive: Optional[int] = None,
+                            pool_timeout: Optional[float] = None) -> "httpx.AsyncClient":
+    """Get the pooled `httpx.AsyncClient` registered under `name` for the running event loop
+
+    Uses the same pool size and split timeouts as the synchronous sessions
+    unless overridden (see `get_shared_http_client` for the options).
+    Must be called from inside a running event loop.
+    """
+    if not HTTPX_AVAILABLE:
+        raise ImportError("httpx is required for async HTTP clients. Install with: pip install httpx")
+
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.get(loop)
+    if clients is None:
+        clients = _async_clients[loop] = {}
+        _close_on_loop_shutdown(loop, clients)
+    client = clients.get(name)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(event_hooks={"request": [_stats_for(name).ahook]},
+                                   **_client_options(http2, max_connections, max_keepalive, pool_timeout))
+        clients[name] = client
+    return client
+
+
+def get_llm_async_client() -> "httpx.AsyncClient":
+    """Pooled async client for the LLM API on the running event loop"""
+    return get_shared_async_client(LLM_POOL_NAME, http2=LLM_HTTP2_ENABLED, max_connections=LLM_POOL_MAX_CONNECTIONS,
+                                   max_keepalive=LLM_POOL_MAX_KEEPALIVE, pool_timeout=LLM_POOL_TIMEOUT)
+
+
+async def aclose_shared_async_clients():
+    """Close every async client created on the running event loop
+
+    Loops shut down by `asyncio.run` close their clients on exit anyway;
+    this is for long-lived loops that want their connections back early.
+    """
+    clients = _async_clients.get(asyncio.get_running_loop(), {})
+    for client in list(clients.values()):
+        await client.aclose()
+    clients.clear()
@@ -0,0 +1,76 @@
+"""
+Lazy Imports
+Deferred loading of heavy optional dependencies and import-free availability checks
+"""
+
+import importlib
+import importlib.metadata
+import importlib.util
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+
+@lru_cache(maxsize=None)
+def is_installed(distribution: str, module: Optional[str] = None) -> bool:
+    """Check whether a package is installed without importing it
+
+    Args:
+        distribution: Distribution name as published on PyPI (e.g. "google-genai")
+        module: Import name to locate if the distribution metadata is missing
+
+    Returns:
+        True if the package can be imported
+    """
+    try:
+        importlib.metadata.distribution(distribution)
+        return True
+    except importlib.metadata.PackageNotFoundError:
+        pass
+    if module is None:
+        return False
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access
+
+    Args:
+        name: Fully qualified module name
+        on_load: Optional hook run once with the module right after it is imported
+    """
+
+    def __init__(self, name: str, on_load: Optional[Callable[[Any], None]] = None):
+        self._name = name
+        self._on_load = on_load
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    module = importlib.import_module(self._name)
+                    if self._on_load is not None:
+                        self._on_load(module)
+                    self._module = module
+        return self._module
+
+    def load(self):
+        """Import the module now (e.g. before a section whose duration is bounded)"""
+        return self._load()
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the underlying module has been imported yet"""
+        return self._module is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
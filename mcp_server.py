@@ -6,6 +6,8 @@ Defines tools and capabilities for the Model Context Protocol
 import json
 from typing import Dict, List, Any, Optional
 from serper_search_tool import SERPER_TOOLS, google_search_tool, google_news_search_tool
+from article import ArticleBatch, coerce_article
+from near_duplicates import dedupe_batch
 
 class MCPNewsServer:
     """MCP Server for News Agent with integrated search tools"""
@@ -105,6 +107,8 @@ class MCPNewsServer:
         if not articles:
             return "❌ No articles provided for summarization"
         
+        articles = [coerce_article(article) for article in articles]
+        
         summary_parts = []
         summary_parts.append(f"📰 **News Summary** ({focus.title()} Focus)")
         summary_parts.append("=" * 50)
@@ -112,17 +116,14 @@ class MCPNewsServer:
         # Group by source if multiple articles
         sources = {}
         for article in articles:
-            source = article.get("source", "Unknown")
-            if source not in sources:
-                sources[source] = []
-            sources[source].append(article)
+            sources.setdefault(article.source, []).append(article)
         
         # Create summary
         for source, source_articles in sources.items():
             summary_parts.append(f"\n**{source}:**")
             for article in source_articles:
-                title = article.get("title", "No title")
-                content = article.get("content", article.get("snippet", "No content"))
+                title = article.title
+                content = article.snippet
                 summary_parts.append(f"• {title}")
                 if content and len(content) > 100:
                     summary_parts.append(f"  💡 {content[:200]}...")
@@ -141,8 +142,8 @@ class MCPNewsServer:
         """Analyze news trends for a topic"""
         # Use Serper API to search for recent articles
         try:
-            from serper_search_tool import SerperSearchTool
-            tool = SerperSearchTool()
+            from serper_search_tool import get_default_tool
+            tool = get_default_tool()
             
             # Search for recent news
             results = tool.search_news(f"{query} {timeframe}", num_results=10)
@@ -156,25 +157,25 @@ class MCPNewsServer:
             trend_analysis.append("=" * 50)
             
             if "news" in results and results["news"]:
-                articles = results["news"]
+                batch = ArticleBatch.from_serper_responses([results])
+                articles = batch.to_articles()
+                stories, _ = dedupe_batch(batch)
                 
                 # Analyze sources
                 sources = {}
-                for article in articles:
-                    source = article.get("source", "Unknown")
+                for source in batch.sources:
                     sources[source] = sources.get(source, 0) + 1
                 
                 trend_analysis.append(f"\n**📊 Coverage Statistics:**")
                 trend_analysis.append(f"• Total articles found: {len(articles)}")
+                trend_analysis.append(f"• Distinct stories: {len(stories)}")
                 trend_analysis.append(f"• Unique sources: {len(sources)}")
                 trend_analysis.append(f"• Top sources: {', '.join(list(sources.keys())[:3])}")
                 
                 # Recent headlines
                 trend_analysis.append(f"\n**📰 Recent Headlines:**")
-                for i, article in enumerate(articles[:5], 1):
-                    title = article.get("title", "No title")
-                    date = article.get("date", "No date")
-                    trend_analysis.append(f"{i}. {title} ({date})")
+                for i, article in enumerate(stories.to_articles()[:5], 1):
+                    trend_analysis.append(f"{i}. {article.title} ({article.date or 'No date'})")
                 
                 return "\n".join(trend_analysis)
             else:
@@ -0,0 +1,321 @@
+"""
+Latency-aware Model Router
+Picks the cheapest model that meets the latency SLO, escalating to larger models on failure or for complex queries
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+from circuit_breaker import CircuitBreaker, get_circuit_breaker
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Routing configuration (overridable via environment)
+MODEL_ROUTER_SLO = float(os.getenv('MODEL_ROUTER_SLO', 45))
+MODEL_ROUTER_TTFT_SLO = float(os.getenv('MODEL_ROUTER_TTFT_SLO', 10))
+MODEL_ROUTER_EWMA_ALPHA = float(os.getenv('MODEL_ROUTER_EWMA_ALPHA', 0.3))
+MODEL_ROUTER_COMPLEX_WORDS = int(os.getenv('MODEL_ROUTER_COMPLEX_WORDS', 14))
+MODEL_ROUTER_COMPLEX_PROMPT_TOKENS = int(os.getenv('MODEL_ROUTER_COMPLEX_PROMPT_TOKENS', 2000))
+MODEL_ROUTER_MAX_ERROR_RATE = float(os.getenv('MODEL_ROUTER_MAX_ERROR_RATE', 0.25))
+
+# Selecting this "model" lets the router choose per request
+AUTO_MODEL = "auto"
+
+SIMPLE = "simple"
+COMPLEX = "complex"
+
+# Words that ask for reasoning rather than a digest of headlines
+_COMPLEX_HINTS = frozenset("""
+why how compare comparison versus vs impact impacts implication implications analyze analyse analysis
+explain explanation forecast outlook predict prediction consequences effect effects relationship
+difference differences tradeoffs pros cons evaluate assess assessment cause causes
+""".split())
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class ModelProfile:
+    """Static routing facts about a model"""
+
+    __slots__ = ("name", "cost", "tier")
+
+    def __init__(self, name: str, cost: float, tier: int):
+        """Describe a model
+
+        Args:
+            name: Model name as shown in the UI (converted to the Clarifai path by the agent)
+            cost: Relative price per token (only the ordering matters)
+            tier: Capability tier; 0 handles digests, 1 handles reasoning-heavy queries
+        """
+        self.name = name
+        self.cost = cost
+        self.tier = tier
+
+    def __repr__(self) -> str:
+        return f"ModelProfile({self.name!r}, cost={self.cost}, tier={self.tier})"
+
+
+# The models NewsAgent can convert to Clarifai's OpenAI-compatible paths
+DEFAULT_MODEL_PROFILES = [
+    ModelProfile("gpt-4o-mini", cost=0.15, tier=0),
+    ModelProfile("meta-llama/Meta-Llama-3.1-8B-Instruct", cost=0.2, tier=0),
+    ModelProfile("gpt-4o", cost=2.5, tier=1),
+    ModelProfile("claude-3-5-sonnet-20241022", cost=3.0, tier=1),
+]
+
+
+class ModelStats:
+    """Rolling latency and throughput of one model (exponentially weighted averages)"""
+
+    __slots__ = ("ttft", "tokens_per_second", "latency", "samples", "recent_ttft")
+
+    def __init__(self):
+        self.ttft: Optional[float] = None
+        self.tokens_per_second: Optional[float] = None
+        self.latency: Optional[float] = None
+        self.samples = 0
+        # Raw recent TTFTs for percentile-based decisions such as hedging
+        self.recent_ttft = deque(maxlen=100)
+
+    def update(self, alpha: float, ttft: Optional[float], latency: float, tokens: int):
+        """Fold one successful call into the averages"""
+        generation_time = latency - (ttft or 0.0)
+        tokens_per_second = tokens / generation_time if tokens and generation_time > 0 else None
+        self.observe_ttft(alpha, ttft)
+        self.tokens_per_second = _ewma(self.tokens_per_second, tokens_per_second, alpha)
+        self.latency = _ewma(self.latency, latency, alpha)
+        self.samples += 1
+
+    def observe_ttft(self, alpha: float, ttft: Optional[float]):
+        """Fold one time-to-first-token observation into the average and the recent window"""
+        if ttft is not None:
+            self.ttft = _ewma(self.ttft, ttft, alpha)
+            self.recent_ttft.append(ttft)
+
+
+def _ewma(current: Optional[float], sample: Optional[float], alpha: float) -> Optional[float]:
+    if sample is None:
+        return current
+    if current is None:
+        return sample
+    return alpha * sample + (1 - alpha) * current
+
+
+def classify_query(query: str, prompt_tokens: Optional[int] = None) -> str:
+    """Classify a query as SIMPLE (headline digest) or COMPLEX (needs a larger model)
+
+    Args:
+        query: User query
+        prompt_tokens: Size of the analysis prompt, when already built
+    """
+    words = _WORD.findall(query.lower())
+    if len(words) > MODEL_ROUTER_COMPLEX_WORDS or _COMPLEX_HINTS.intersection(words):
+        return COMPLEX
+    if prompt_tokens is not None and prompt_tokens > MODEL_ROUTER_COMPLEX_PROMPT_TOKENS:
+        return COMPLEX
+    return SIMPLE
+
+
+class ModelRouter:
+    """Orders models per request by capability, cost and observed latency
+
+    Each model has a circuit breaker ("LLM <model>") whose rolling error rate
+    takes it out of rotation, plus rolling TTFT and tokens/sec averages. A
+    request's plan starts with the cheapest model of the tier it needs that is
+    meeting the SLOs without elevated errors, then escalates to larger models.
+    """
+
+    def __init__(self, profiles: Optional[List[ModelProfile]] = None, slo: float = MODEL_ROUTER_SLO,
+                 ttft_slo: float = MODEL_ROUTER_TTFT_SLO, alpha: float = MODEL_ROUTER_EWMA_ALPHA):
+        """Initialize the router
+
+        Args:
+            profiles: Routable models (default: DEFAULT_MODEL_PROFILES)
+            slo: Seconds a request may spend across all attempts
+            ttft_slo: Seconds an attempt may wait for its first token
+            alpha: Weight of the newest sample in the rolling averages
+        """
+        self.profiles = {profile.name: profile for profile in (profiles or DEFAULT_MODEL_PROFILES)}
+        self.slo = slo
+        self.ttft_slo = ttft_slo
+        self.alpha = alpha
+        self._stats = {name: ModelStats() for name in self.profiles}
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "escalations": 0, "slo_exhausted": 0}
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        """Circuit breaker tracking a model's error rate"""
+        return get_circuit_breaker(f"LLM {name}")
+
+    def plan(self, query: str, pinned: Optional[str] = None,
+             prompt_tokens: Optional[int] = None) -> "RoutePlan":
+        """Plan the model cascade for one request
+
+        Args:
+            query: User query (used to judge complexity)
+            pinned: Model chosen by the user; tried first, with the router's order as fallback
+            prompt_tokens: Size of the analysis prompt, when already built
+
+        Returns:
+            RoutePlan whose `attempts()` yields the models to try within the SLO
+        """
+        complexity = classify_query(query, prompt_tokens)
+        needed_tier = 1 if complexity == COMPLEX else 0
+        pinned_profile = None
+        if pinned and pinned != AUTO_MODEL:
+            pinned_profile = self.profiles.get(pinned) or ModelProfile(pinned, cost=0.0, tier=needed_tier)
+            # A pinned model falls back to models at least as capable before smaller ones
+            needed_tier = max(needed_tier, pinned_profile.tier)
+        error_rates = {name: self.breaker(name).get_status()["error_rate"] for name in self.profiles}
+        with self._lock:
+            self._counters["requests"] += 1
+            order = sorted(self.profiles.values(),
+                           key=lambda profile: self._rank(profile, needed_tier, error_rates[profile.name]))
+
+        if pinned_profile is not None:
+            order = [pinned_profile] + [profile for profile in order if profile.name != pinned]
+        return RoutePlan(self, order, complexity)
+
+    def _rank(self, profile: ModelProfile, needed_tier: int, error_rate: float) -> Tuple:
+        """Sort key: models of the needed tier or above first (smallest adequate tier first),
+        then models meeting the latency SLOs with a tolerable error rate, then cheapest"""
+        stats = self._stats[profile.name]
+        degraded = (stats.ttft is not None and stats.ttft > self.ttft_slo) or \
+                   (stats.latency is not None and stats.latency > self.slo) or \
+                   error_rate > MODEL_ROUTER_MAX_ERROR_RATE
+        adequate = profile.tier >= needed_tier
+        return (not adequate, profile.tier if adequate else -profile.tier, degraded, profile.cost)
+
+    def record_success(self, name: str, latency: float, ttft: Optional[float] = None, tokens: int = 0):
+        """Report a completed call"""
+        self.breaker(name).record_success()
+        with self._lock:
+            stats = self._stats.setdefault(name, ModelStats())
+            stats.update(self.alpha, ttft, latency, tokens)
+
+    def record_ttft(self, name: str, ttft: float):
+        """Report a first-token wait without a completed call (e.g. a request that lost a hedge race)"""
+        with self._lock:
+            self._stats.setdefault(name, ModelStats()).observe_ttft(self.alpha, ttft)
+
+    def ttft_samples(self, name: str) -> List[float]:
+        """Recent time-to-first-token observations of a model"""
+        with self._lock:
+            stats = self._stats.get(name)
+            return list(stats.recent_ttft) if stats else []
+
+    def record_failure(self, name: str, error: BaseException):
+        """Report a failed call"""
+        self.breaker(name).record_failure()
+        logger.warning(f"⚠️ Model {name} failed: {type(error).__name__}: {error}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-model rolling latency, throughput and error rate, plus routing counters"""
+        with self._lock:
+            models = {
+                name: {
+                    "ttft": stats.ttft,
+                    "tokens_per_second": stats.tokens_per_second,
+                    "latency": stats.latency,
+                    "samples": stats.samples,
+                }
+                for name, stats in self._stats.items()
+            }
+            counters = dict(self._counters)
+        for name, model_stats in models.items():
+            breaker_status = self.breaker(name).get_status()
+            model_stats["error_rate"] = breaker_status["error_rate"]
+            model_stats["state"] = breaker_status["state"]
+        return dict(counters, models=models)
+
+
+class RoutePlan:
+    """The model cascade and latency budget of one request"""
+
+    def __init__(self, router: ModelRouter, models: List[ModelProfile], complexity: str):
+        self.router = router
+        self.models = models
+        self.complexity = complexity
+        self.deadline = time.time() + router.slo
+        self.attempted: List[str] = []
+
+    def remaining(self) -> float:
+        """Seconds left in the request's latency budget"""
+        return self.deadline - time.time()
+
+    def attempts(self, stream: bool = False) -> Iterator[Tuple[ModelProfile, float]]:
+        """Yield (model, timeout) for each model to try, in order
+
+        Models whose circuit is open are skipped. The timeout is the remaining
+        budget, capped at the TTFT SLO for streams (where it bounds the wait
+        for each chunk, the first one included). Once the budget is spent no
+        further models are tried; a stream that has started is never cut off.
+        """
+        for profile in self.models:
+            if profile.name in self.attempted:
+                continue
+            remaining = self.remaining()
+            if remaining <= 0:
+                with self.router._lock:
+                    self.router._counters["slo_exhausted"] += 1
+                logger.warning(f"⏱️ Latency SLO of {self.router.slo:g}s exhausted after {self.attempted}")
+                return
+            if not self.router.breaker(profile.name).allow_request():
+                continue
+            if self.attempted:
+                with self.router._lock:
+                    self.router._counters["escalations"] += 1
+                logger.info(f"🧭 Escalating to {profile.name} after {self.attempted[-1]} failed")
+            else:
+                logger.info(f"🧭 Routing {self.complexity} query to {profile.name}")
+            self.attempted.append(profile.name)
+            yield profile, min(remaining, self.router.ttft_slo) if stream else remaining
+
+    def hedge_for(self, profile: ModelProfile, alternate: bool = True) -> ModelProfile:
+        """Model to send a hedge request to while `profile` is slow to start
+
+        With `alternate`, the next model in the plan that has not been tried and
+        whose circuit allows a call; otherwise (or if there is none) `profile` itself.
+        """
+        if alternate:
+            for candidate in self.models:
+                if candidate.name not in self.attempted and self.router.breaker(candidate.name).allow_request():
+                    self.attempted.append(candidate.name)
+                    return candidate
+        return profile
+
+    def succeeded(self, profile: ModelProfile, started: float, ttft: Optional[float] = None, tokens: int = 0):
+        """Report that `profile` answered; `started` is its attempt's start time"""
+        self.router.record_success(profile.name, time.time() - started, ttft, tokens)
+
+    def failed(self, profile: ModelProfile, error: BaseException):
+        """Report that `profile` failed, so the next attempt escalates"""
+        self.router.record_failure(profile.name, error)
+
+    def abandoned(self, profile: ModelProfile):
+        """Report that the caller gave up on `profile` without an outcome (e.g. closed the stream)"""
+        self.router.breaker(profile.name).release()
+
+
+class ModelRoutingError(Exception):
+    """Raised when every model in a plan failed or the latency SLO ran out"""
+
+
+_shared_router: Optional[ModelRouter] = None
+_shared_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Get the process-wide router, so latency and error observations are shared across sessions"""
+    global _shared_router
+    with _shared_router_lock:
+        if _shared_router is None:
+            _shared_router = ModelRouter()
+        return _shared_router
@@ -0,0 +1,261 @@
+"""
+Near-duplicate Article Clustering
+Collapses syndicated copies of the same story with vectorized MinHash signatures and LSH banding
+"""
+
+import os
+import re
+import zlib
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from dotenv import load_dotenv
+from article import Article, ArticleBatch, coerce_article
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Clustering configuration (overridable via environment)
+NEAR_DUPLICATE_ENABLED = os.getenv('NEAR_DUPLICATE_ENABLED', 'true').lower() == 'true'
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', 0.5))
+NEAR_DUPLICATE_NUM_PERM = int(os.getenv('NEAR_DUPLICATE_NUM_PERM', 64))
+NEAR_DUPLICATE_BANDS = int(os.getenv('NEAR_DUPLICATE_BANDS', 32))
+
+# Extra results to request so collapsed duplicates can be replaced by distinct stories.
+# Serper bills up to 10 results as one query, so the default over-fetch stays free.
+NEAR_DUPLICATE_OVERFETCH = float(os.getenv('NEAR_DUPLICATE_OVERFETCH', 2))
+NEAR_DUPLICATE_MAX_FETCH = int(os.getenv('NEAR_DUPLICATE_MAX_FETCH', 10))
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _shingle_hashes(text: str, size: int) -> List[int]:
+    """32-bit hashes of the word `size`-grams of a normalized text"""
+    words = _TOKEN.findall(text.lower())
+    if len(words) <= size:
+        return [zlib.crc32(" ".join(words).encode("utf-8"))] if words else []
+    return [zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)]
+
+
+class MinHasher:
+    """MinHash signatures for many texts at once
+
+    All shingle hashes of a batch are permuted in one NumPy operation
+    (multiply-shift hashing) and reduced per text with `minimum.reduceat`, so
+    the cost is a handful of array passes instead of a Python loop per
+    permutation.
+    """
+
+    def __init__(self, num_perm: int = NEAR_DUPLICATE_NUM_PERM, shingle_size: int = 2, seed: int = 1):
+        """Initialize the hasher
+
+        Args:
+            num_perm: Signature length (number of hash permutations)
+            shingle_size: Words per shingle
+            seed: Seed of the permutation parameters (signatures only compare under the same seed)
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for MinHasher. Install with: pip install numpy")
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: odd 64-bit multipliers, wrapping arithmetic, keep the high 32 bits
+        self._a = rng.integers(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+
+    def signatures(self, texts: Sequence[str]) -> "np.ndarray":
+        """MinHash signature of every text
+
+        Returns:
+            (len(texts), num_perm) uint32 array; texts without words get an all-max row
+        """
+        shingles = [_shingle_hashes(text, self.shingle_size) for text in texts]
+        counts = np.fromiter((len(s) for s in shingles), dtype=np.int64, count=len(shingles))
+        result = np.full((len(texts), self.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+        nonempty = np.flatnonzero(counts)
+        if not nonempty.size:
+            return result
+
+        hashes = np.fromiter((h for s in shingles for h in s), dtype=np.uint64, count=int(counts.sum()))
+        # One row per permutation keeps each per-text minimum a contiguous reduction
+        permuted = ((self._a[:, None] * hashes + self._b[:, None]) >> np.uint64(32)).astype(np.uint32)
+        offsets = np.concatenate(([0], np.cumsum(counts[nonempty])[:-1]))
+        result[nonempty] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        return result
+
+
+class _UnionFind:
+    """Disjoint sets whose root is always the lowest (best-ranked) index"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, index: int) -> int:
+        root = index
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[index] != root:
+            self.parent[index], index = root, self.parent[index]
+        return root
+
+    def union(self, first: int, second: int):
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            self.parent[max(first, second)] = min(first, second)
+
+
+def _article_text(title: str, snippet: str) -> str:
+    return f"{title or ''} {snippet or ''}"
+
+
+def _similar_pairs(texts: Sequence[str], threshold: float, hasher: MinHasher,
+                   bands: int) -> List[Tuple[int, int]]:
+    """Index pairs whose MinHash signatures agree on at least `threshold` of their positions"""
+    signatures = hasher.signatures(texts)
+    indices = np.flatnonzero(signatures[:, 0] != np.iinfo(np.uint32).max)
+    signatures = signatures[indices]
+    rows = hasher.num_perm // bands
+    mixers = np.arange(1, rows + 1, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+
+    firsts, seconds = [], []
+    for band in range(bands):
+        # One uint64 key per item and band (wrapping arithmetic), then group equal keys by sorting
+        keys = (signatures[:, band * rows:(band + 1) * rows].astype(np.uint64) * mixers).sum(axis=1, dtype=np.uint64)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        run_start = np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1]))
+        leaders = order[np.flatnonzero(run_start)][np.cumsum(run_start) - 1]
+        followers = order != leaders
+        firsts.append(leaders[followers])
+        seconds.append(order[followers])
+
+    firsts, seconds = np.concatenate(firsts), np.concatenate(seconds)
+    if not firsts.size:
+        return []
+    pairs = np.unique(np.stack((firsts, seconds), axis=1), axis=0)
+    agreement = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).sum(axis=1)
+    similar = pairs[agreement >= threshold * hasher.num_perm]
+    return [(int(indices[first]), int(indices[second])) for first, second in similar]
+
+
+def find_duplicate_clusters(texts: Sequence[str], urls: Optional[Sequence[str]] = None,
+                            threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                            hasher: Optional[MinHasher] = None,
+                            bands: int = NEAR_DUPLICATE_BANDS) -> List[List[int]]:
+    """Group indices of texts that are near-duplicates of each other
+
+    Candidate pairs come from LSH banding of the MinHash signatures and are
+    kept only if their estimated Jaccard similarity reaches `threshold`.
+    Identical canonical URLs are always grouped. Without NumPy only exact
+    normalized text and URL matches are grouped.
+
+    Args:
+        texts: Text of each item (e.g. title and snippet), in rank order
+        urls: Canonical URLs of each item (optional)
+        threshold: Minimum estimated Jaccard similarity of word shingles
+        hasher: MinHasher to use (default: a shared one)
+        bands: LSH bands; must divide the signature length
+
+    Returns:
+        Clusters as index lists, each sorted and ordered by its first (best-ranked) member
+
+    Raises:
+        ValueError: If `bands` is not a divisor of the signature length
+    """
+    num_perm = hasher.num_perm if hasher is not None else NEAR_DUPLICATE_NUM_PERM
+    if bands < 1 or bands > num_perm or num_perm % bands:
+        raise ValueError(f"LSH bands (NEAR_DUPLICATE_BANDS={bands}) must divide the MinHash "
+                         f"signature length (NEAR_DUPLICATE_NUM_PERM={num_perm})")
+    groups = _UnionFind(len(texts))
+    first_seen: Dict[Any, int] = {}
+
+    def union_equal(keys):
+        for index, key in enumerate(keys):
+            if not key[1]:
+                continue
+            if key in first_seen:
+                groups.union(first_seen[key], index)
+            else:
+                first_seen[key] = index
+
+    if urls is not None:
+        union_equal(("url", url) for url in urls)
+    union_equal(("text", " ".join(_TOKEN.findall(text.lower()))) for text in texts)
+
+    if NUMPY_AVAILABLE and len(texts) > 1:
+        for first, second in _similar_pairs(texts, threshold, hasher or _get_hasher(), bands):
+            groups.union(first, second)
+
+    clusters: Dict[int, List[int]] = {}
+    for index in range(len(texts)):
+        clusters.setdefault(groups.find(index), []).append(index)
+    return list(clusters.values())
+
+
+def collapse_near_duplicates(articles: Sequence[Any], limit: Optional[int] = None,
+                             threshold: float = NEAR_DUPLICATE_THRESHOLD) -> List[Article]:
+    """Keep one article per story, recording syndicated copies as its alternates
+
+    The best-ranked copy represents each cluster, so ranking order is preserved.
+
+    Args:
+        articles: Articles (or legacy result dicts) in rank order
+        limit: Maximum number of distinct stories to return
+        threshold: Minimum estimated Jaccard similarity to treat two articles as copies
+
+    Returns:
+        Representative articles with `alternates` set
+    """
+    articles = [coerce_article(article) for article in articles]
+    clusters = find_duplicate_clusters([_article_text(a.title, a.snippet) for a in articles],
+                                       [a.canonical_url for a in articles], threshold)
+    if limit is not None:
+        clusters = clusters[:limit]
+
+    representatives = []
+    for cluster in clusters:
+        representative = articles[cluster[0]]
+        representative.alternates = [articles[i] for i in cluster[1:]]
+        representatives.append(representative)
+
+    collapsed = sum(len(cluster) - 1 for cluster in clusters)
+    if collapsed:
+        logger.info(f"🧬 Collapsed {collapsed} syndicated copies into {len(representatives)} distinct stories")
+    return representatives
+
+
+def dedupe_batch(batch: ArticleBatch,
+                 threshold: float = NEAR_DUPLICATE_THRESHOLD) -> Tuple[ArticleBatch, List[List[int]]]:
+    """Collapse near-duplicates in a columnar batch without materializing articles
+
+    Returns:
+        (batch of cluster representatives, clusters as row-index lists)
+    """
+    texts = [_article_text(title, snippet) for title, snippet in zip(batch.titles, batch.snippets)]
+    clusters = find_duplicate_clusters(texts, batch.canonical_urls(), threshold)
+    return batch.take([cluster[0] for cluster in clusters]), clusters
+
+
+def fetch_count(num_results: int) -> int:
+    """Number of results to request so `num_results` distinct stories remain after collapsing"""
+    if not NEAR_DUPLICATE_ENABLED:
+        return num_results
+    return max(num_results, min(int(num_results * NEAR_DUPLICATE_OVERFETCH), NEAR_DUPLICATE_MAX_FETCH))
+
+
+_shared_hasher: Optional[MinHasher] = None
+
+
+def _get_hasher() -> MinHasher:
+    """Shared hasher with the configured signature length (permutation parameters are immutable)"""
+    global _shared_hasher
+    if _shared_hasher is None:
+        _shared_hasher = MinHasher()
+    return _shared_hasher
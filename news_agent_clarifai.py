@@ -5,40 +5,127 @@ Handles news search using Google ADK, Serper API, and AI analysis via Clarifai m
 
 import os
 import json
+import time
+import asyncio
 import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Dict, List, Optional, Any
-from datetime import datetime
 import requests
-import litellm
-from litellm import completion
 from dotenv import load_dotenv
-from google import genai
-from google.genai import types
-from google.genai.types import Tool, FunctionDeclaration
-from google.adk.models.lite_llm import LiteLlm
+from circuit_breaker import CircuitBreaker, get_circuit_breaker
+from article import Article
+from lazy_imports import LazyModule, is_installed
+from health_check import get_health_checker
+from analysis_cache import get_analysis_cache, make_analysis_key, replay_stream, areplay_stream
+from semantic_cache import get_semantic_cache
+from context_builder import ContextBuilder, BuiltContext, CONTEXT_COMPLETION_TOKENS
+from near_duplicates import collapse_near_duplicates, fetch_count, NEAR_DUPLICATE_ENABLED
+from model_router import get_model_router, ModelRoutingError, AUTO_MODEL
+from hedging import get_hedger, HedgeFailed, PRIMARY, HEDGE, LLM_HEDGING_ENABLED, LLM_HEDGE_MODEL
+from http_pool import HTTPX_AVAILABLE, LLM_POOL_NAME, get_llm_http_client, get_llm_async_client, get_http_client_stats
 
 # Load environment variables
 load_dotenv()
 
-# Enable LiteLLM debug mode
-litellm.set_verbose = True
-litellm._turn_on_debug()
-LITELLM_AVAILABLE = True
-GOOGLE_ADK_AVAILABLE = True
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    force=True
-)
+# LiteLLM debug output is verbose and slow to enable; opt in via environment
+LITELLM_DEBUG = os.getenv('LITELLM_DEBUG', 'false').lower() == 'true'
+
+# Pipelined streaming: generation starts on the first K primary results while
+# secondary coverage searches finish in the background (0 = use all primary results)
+PIPELINE_FIRST_K = int(os.getenv('PIPELINE_FIRST_K', 0))
+# The secondary coverage search is a second billed Serper request per query, so it is opt-in
+PIPELINE_SECONDARY_SEARCH = os.getenv('PIPELINE_SECONDARY_SEARCH', 'false').lower() == 'true'
+PIPELINE_SECONDARY_TIMEOUT = float(os.getenv('PIPELINE_SECONDARY_TIMEOUT', 5))
+
+
+def _configure_litellm(module):
+    """Apply process-wide LiteLLM settings once, when LiteLLM is first imported"""
+    if LITELLM_DEBUG:
+        module.set_verbose = True
+        module._turn_on_debug()
+
+
+# Heavy dependencies are imported on first use; availability is checked from package metadata
+litellm = LazyModule("litellm", on_load=_configure_litellm)
+openai = LazyModule("openai")
+genai = LazyModule("google.genai")
+genai_types = LazyModule("google.genai.types")
+LITELLM_AVAILABLE = is_installed("litellm")
+GOOGLE_ADK_AVAILABLE = is_installed("google-genai", "google.genai") and is_installed("google-adk", "google.adk")
+
 logger = logging.getLogger(__name__)
+_logging_configured = False
+
+
+def configure_logging():
+    """Configure root logging for the agent (called once, when the first agent is created)"""
+    global _logging_configured
+    if _logging_configured:
+        return
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        force=True
+    )
+    # Also ensure all logger messages are visible
+    logger.setLevel(logging.INFO)
+    _logging_configured = True
+    logger.info("🔧 News Agent logging is active")
+
+CLARIFAI_BASE_URL = "https://api.clarifai.com/v2/ext/openai/v1"
+
+# OpenAI SDK clients on the shared LLM connection pool, passed to LiteLLM as `client`.
+# Left to itself LiteLLM caches one SDK client (and connection pool) per distinct
+# timeout, and the router passes a different remaining-time timeout on every call.
+_llm_clients: Dict[str, tuple] = {}
+_llm_clients_lock = threading.Lock()
+# Async clients are bound to their event loop
+_async_llm_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, tuple]]" = \
+    weakref.WeakKeyDictionary()
 
-# Also ensure all logger messages are visible
-logger.setLevel(logging.INFO)
 
-# Test logging immediately when module loads
-logger.info("🔧 News Agent module loaded - logging is active")
+def _llm_client(api_key: str):
+    """Process-wide `openai.OpenAI` client for Clarifai on the pooled HTTP client"""
+    http_client = get_llm_http_client()
+    entry = _llm_clients.get(api_key)
+    if entry is None or entry[0] is not http_client:
+        with _llm_clients_lock:
+            entry = _llm_clients.get(api_key)
+            if entry is None or entry[0] is not http_client:
+                entry = (http_client, openai.OpenAI(base_url=CLARIFAI_BASE_URL, api_key=api_key,
+                                                    http_client=http_client))
+                _llm_clients[api_key] = entry
+    return entry[1]
+
+
+def _async_llm_client(api_key: str):
+    """`openai.AsyncOpenAI` client for Clarifai on the running loop's pooled HTTP client"""
+    http_client = get_llm_async_client()
+    clients = _async_llm_clients.setdefault(asyncio.get_running_loop(), {})
+    entry = clients.get(api_key)
+    if entry is None or entry[0] is not http_client:
+        entry = (http_client, openai.AsyncOpenAI(base_url=CLARIFAI_BASE_URL, api_key=api_key,
+                                                 http_client=http_client))
+        clients[api_key] = entry
+    return entry[1]
+
+# Bump when the analysis prompts change so cached analyses are not reused
+ANALYSIS_PROMPT_VERSION = 2
+NO_RESULTS_MESSAGE = ("I couldn't find any recent news articles for your query. "
+                      "Please try a different search term or check back later.")
+
+class SearchProviderError(Exception):
+    """Raised when a search provider returns an error response"""
+
+class SearchProviderRefused(SearchProviderError):
+    """Raised when our own rate limiter or quota refused a search before it reached the provider"""
+
+def _serper_error(results: Dict[str, Any]) -> SearchProviderError:
+    """Exception for a Serper error dict; local refusals are not provider failures"""
+    error = SearchProviderRefused if results.get("refused") else SearchProviderError
+    return error(f"Serper API error: {results['error']}")
 
 # Import Serper search tool
 try:
@@ -49,6 +136,13 @@ except ImportError:
     SERPER_AVAILABLE = False
     logger.warning("⚠️ Serper search tool not available")
 
+# Import async Serper search tool (requires httpx)
+try:
+    from async_serper_search_tool import AsyncSerperSearchTool
+    from http_pool import HTTPX_AVAILABLE as ASYNC_SERPER_AVAILABLE
+except ImportError:
+    ASYNC_SERPER_AVAILABLE = False
+
 class NewsAgent:
     """
     News Agent that combines Google ADK for search capabilities
@@ -57,11 +151,38 @@ class NewsAgent:
     
     def __init__(self, model_name: str = "gpt-4o"):
         """Initialize the News Agent"""
+        configure_logging()
         self.model_name = model_name
         self.clarifai_pat = os.getenv('CLARIFAI_PAT')
         
-        # Convert model name to Clarifai format
+        # Convert model name to Clarifai format ("auto" lets the router pick per request)
         self.clarifai_model_name = self._convert_to_clarifai_format(model_name)
+        self.auto_routing = model_name == AUTO_MODEL
+        self.router = get_model_router()
+        self.last_model: Optional[str] = None
+        # Latencies of the last request, for the statistics sidebar
+        self.last_ttft: Optional[float] = None
+        self.last_search_latency: Optional[float] = None
+        # Opt-in: race a backup request when the first token is unusually late
+        self.hedging = LLM_HEDGING_ENABLED
+        self.hedger = get_hedger()
+        
+        # Circuit breakers are shared process-wide so one session's failures protect all
+        self.serper_breaker = get_circuit_breaker("Serper API")
+        self.google_adk_breaker = get_circuit_breaker("Google ADK")
+        self.health = get_health_checker()
+        self.last_pipeline_timings: Dict[str, float] = {}
+        self.analysis_cache = get_analysis_cache()
+        self.semantic_cache = get_semantic_cache()
+        self.context_builder = ContextBuilder(model_name)
+        self.last_context: Optional[BuiltContext] = None
+        
+        # Heavy SDK objects are created lazily by the properties below
+        self._llm_model = None
+        self._llm_model_failed = False
+        self._genai_client = None
+        self._genai_client_failed = False
+        self.search_tool = None
         
         self.setup_litellm()
         self.setup_google_adk()
@@ -72,24 +193,24 @@ class NewsAgent:
         if not SERPER_AVAILABLE:
             logger.warning("⚠️ Serper search tool not available")
             self.serper_tool = None
+            self.async_serper_tool = None
             return
             
         try:
-            # Initialize Serper search tool
+            # Initialize Serper search tool; reachability is probed in the
+            # background by the shared health checker, never with a billed search here
             self.serper_tool = SerperSearchTool()
-            
-            # Test connection
-            if self.serper_tool.test_connection():
-                logger.info("✅ Serper API connection successful")
-                print("✅ Serper API connection successful")
-            else:
-                logger.warning("⚠️ Serper API connection failed")
-                print("⚠️ Serper API connection failed")
+            # Async counterpart shares the same cache, rate limiter and quota
+            self.async_serper_tool = AsyncSerperSearchTool(api_key=self.serper_tool.api_key) \
+                if ASYNC_SERPER_AVAILABLE else None
+            logger.info("✅ Serper API configured")
+            print("✅ Serper API configured")
                 
         except Exception as e:
             logger.error(f"❌ Failed to setup Serper API: {str(e)}")
             print(f"❌ Failed to setup Serper API: {str(e)}")
             self.serper_tool = None
+            self.async_serper_tool = None
         
     def _convert_to_clarifai_format(self, model_name: str) -> str:
         """Convert model name to Clarifai OpenAI-compatible format"""
@@ -119,72 +240,94 @@ class NewsAgent:
             print(f"🔧 Using Clarifai model: {self.clarifai_model_name}")
             print(f"🔧 Base URL: https://api.clarifai.com/v2/ext/openai/v1")
             
-            # Set up LiteLLM with Clarifai base URL
-            if GOOGLE_ADK_AVAILABLE:
-                try:
-                    self.llm_model = LiteLlm(
-                        model=self.clarifai_model_name,
-                        base_url="https://api.clarifai.com/v2/ext/openai/v1",
-                        api_key=self.clarifai_pat
-                    )
-                    logger.info("✅ Google ADK LiteLLM configured for Clarifai")
-                    print("✅ Google ADK LiteLLM configured for Clarifai")  # Ensure visibility
-                except Exception as e:
-                    logger.warning(f"⚠️ Google ADK LiteLLM setup failed: {e}")
-                    print(f"⚠️ Google ADK LiteLLM setup failed: {e}")  # Ensure visibility
-                    self.llm_model = None
-            else:
-                self.llm_model = None
-                
             logger.info("✅ LiteLLM configured for Clarifai")
             print("✅ LiteLLM configured for Clarifai")
         else:
             logger.warning("⚠️ CLARIFAI_PAT not set - AI features will be limited")
-            self.llm_model = None
+    
+    @property
+    def llm_model(self):
+        """Google ADK LiteLlm model for Clarifai, created on first access"""
+        if self._llm_model is None and not self._llm_model_failed:
+            if not GOOGLE_ADK_AVAILABLE or not self.clarifai_pat or \
+                    self.clarifai_pat == 'your_clarifai_personal_access_token_here':
+                self._llm_model_failed = True
+                return None
+            try:
+                from google.adk.models.lite_llm import LiteLlm
+                self._llm_model = LiteLlm(
+                    model=self.clarifai_model_name,
+                    base_url=CLARIFAI_BASE_URL,
+                    api_key=self.clarifai_pat
+                )
+                logger.info("✅ Google ADK LiteLLM configured for Clarifai")
+            except Exception as e:
+                logger.warning(f"⚠️ Google ADK LiteLLM setup failed: {e}")
+                self._llm_model_failed = True
+        return self._llm_model
     
     def setup_google_adk(self):
-        """Setup Google ADK for search capabilities"""
+        """Setup Google ADK for search capabilities
+        
+        The client and tool declarations are built on first use (see `genai_client`),
+        so creating an agent doesn't import the Google SDK.
+        """
         if not GOOGLE_ADK_AVAILABLE:
             logger.warning("Google ADK not available")
-            return
-            
-        try:
-            # Initialize Google ADK client
-            self.genai_client = genai.Client()
-            
-            # Define search tools using Google ADK
-            self.search_tool = Tool(
-                function_declarations=[
-                    FunctionDeclaration(
-                        name="google_search_news",
-                        description="Search for current news articles and information using Google Search",
-                        parameters={
-                            "type": "object",
-                            "properties": {
-                                "query": {
-                                    "type": "string",
-                                    "description": "The search query for news articles"
+    
+    @property
+    def genai_client(self):
+        """Google ADK client, created on first access (None if unavailable)"""
+        if self._genai_client is None and not self._genai_client_failed and GOOGLE_ADK_AVAILABLE:
+            try:
+                # Initialize Google ADK client
+                client = genai.Client()
+                
+                # Define search tools using Google ADK
+                self.search_tool = genai_types.Tool(
+                    function_declarations=[
+                        genai_types.FunctionDeclaration(
+                            name="google_search_news",
+                            description="Search for current news articles and information using Google Search",
+                            parameters={
+                                "type": "object",
+                                "properties": {
+                                    "query": {
+                                        "type": "string",
+                                        "description": "The search query for news articles"
+                                    },
+                                    "num_results": {
+                                        "type": "integer", 
+                                        "description": "Number of search results to return (default: 5)",
+                                        "default": 5
+                                    }
                                 },
-                                "num_results": {
-                                    "type": "integer", 
-                                    "description": "Number of search results to return (default: 5)",
-                                    "default": 5
-                                }
-                            },
-                            "required": ["query"]
-                        }
-                    )
-                ]
-            )
-            logger.info("✅ Google ADK search tools configured")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to setup Google ADK: {str(e)}")
-            self.genai_client = None
-            self.search_tool = None
+                                "required": ["query"]
+                            }
+                        )
+                    ]
+                )
+                self._genai_client = client
+                logger.info("✅ Google ADK search tools configured")
+                
+            except Exception as e:
+                logger.error(f"❌ Failed to setup Google ADK: {str(e)}")
+                self._genai_client_failed = True
+                self.search_tool = None
+        return self._genai_client
+    
+    def is_llm_available(self) -> bool:
+        """Non-blocking LLM availability from the cached background health check
+        
+        Before the first probe completes, a configured PAT is assumed to work.
+        """
+        if not LITELLM_AVAILABLE or not self.clarifai_pat or \
+                self.clarifai_pat == 'your_clarifai_personal_access_token_here':
+            return False
+        return not self.health.is_unhealthy("Clarifai")
     
     def test_connection(self) -> bool:
-        """Test connection to Clarifai"""
+        """Test connection to Clarifai with a real completion (billed; for diagnostics only)"""
         try:
             if not LITELLM_AVAILABLE:
                 logger.warning("🔴 LiteLLM not available for connection test")
@@ -200,14 +343,17 @@ class NewsAgent:
             print("🔧 Testing Clarifai connection...")
             print(f"🔧 Model: {self.clarifai_model_name}")
             
-            # Test using Clarifai OpenAI-compatible endpoint
-            response = completion(
+            # Test using Clarifai OpenAI-compatible endpoint, over the agent's pooled client
+            # (passed per call rather than set as litellm.client_session, which is process-wide)
+            pooled = {"client": _llm_client(self.clarifai_pat)} if HTTPX_AVAILABLE else {}
+            response = litellm.completion(
                 model=self.clarifai_model_name,
                 messages=[{"role": "user", "content": "Hello, can you respond?"}],
                 max_tokens=20,
                 base_url="https://api.clarifai.com/v2/ext/openai/v1",
                 api_key=self.clarifai_pat,
-                stream=False
+                stream=False,
+                **pooled
             )
             
             result = bool(response.choices[0].message.content)
@@ -221,238 +367,414 @@ class NewsAgent:
             # Return True if we have a PAT (assume it works even if test fails)
             return bool(self.clarifai_pat and self.clarifai_pat != 'your_clarifai_personal_access_token_here')
     
-    def search_news(self, query: str, num_results: int = 5) -> List[Dict]:
-        """Search for news using available search tools (Serper API preferred, Google ADK fallback)"""
+    def search_news(self, query: str, num_results: int = 5) -> List[Article]:
+        """Search for news using available search tools (Serper API preferred, Google ADK fallback)
+        
+        Each provider sits behind a circuit breaker, so during an outage requests
+        fail over to the next provider immediately instead of waiting on timeouts.
+        """
         try:
             # Priority 1: Use Serper API if available
-            if SERPER_AVAILABLE and self.serper_tool:
-                print("🔍 Using Serper API for news search")
-                return self._search_with_serper(query, num_results)
+            if self._serper_usable(self.serper_tool):
+                results = self._search_with_breaker(self.serper_breaker, self._search_with_serper, query, num_results)
+                if results is not None:
+                    return results
             
             # Priority 2: Use Google ADK if available
-            elif GOOGLE_ADK_AVAILABLE and self.genai_client:
-                print("🔍 Using Google ADK for news search")
-                return self._search_with_google_adk(query, num_results)
+            if self._google_adk_usable():
+                results = self._search_with_breaker(self.google_adk_breaker, self._search_with_google_adk,
+                                                    query, num_results)
+                if results is not None:
+                    return results
             
             # Fallback: Simple web search
-            else:
-                print("🔴 No advanced search tools available, using fallback search")
-                return self._fallback_search(query, num_results)
+            print("🔴 No advanced search tools available, using fallback search")
+            return self._fallback_search(query, num_results)
                 
         except Exception as e:
             logger.error(f"❌ Search failed: {str(e)}")
             return self._fallback_search(query, num_results)
     
-    def _search_with_serper(self, query: str, num_results: int = 5) -> List[Dict]:
+    def _serper_usable(self, tool) -> bool:
+        """Whether a Serper tool is configured, healthy and within its plan quota"""
+        if not (SERPER_AVAILABLE and tool):
+            return False
+        if tool.quota.should_shed():
+            logger.warning("⚠️ Serper quota nearly exhausted - shedding search to fallback providers")
+            return False
+        if self.health.is_unhealthy("Serper API"):
+            logger.warning("⚠️ Serper API failed its last health check - using fallback providers")
+            return False
+        return True
+    
+    def _google_adk_usable(self) -> bool:
+        """Whether Google ADK is installed, not failing health checks and has a client"""
+        return GOOGLE_ADK_AVAILABLE and not self.health.is_unhealthy("Google ADK") and self.genai_client is not None
+    
+    def _search_with_breaker(self, breaker: CircuitBreaker, search, query: str,
+                             num_results: int) -> Optional[List[Article]]:
+        """Run a provider search through its circuit breaker
+        
+        Searches refused by our own rate limiter or quota fail over without
+        counting against the provider.
+        
+        Returns:
+            The provider's results, or None if the circuit is open or the call failed
+        """
+        if not breaker.allow_request():
+            print(f"⚡ {breaker.name} circuit open - failing over")
+            return None
+        
+        print(f"🔍 Using {breaker.name} for news search")
+        try:
+            results = search(query, num_results)
+        except SearchProviderRefused as e:
+            breaker.release()
+            logger.warning(f"⚠️ {breaker.name} search refused locally - failing over: {str(e)}")
+            return None
+        except Exception as e:
+            breaker.record_failure()
+            logger.error(f"❌ {breaker.name} search failed: {str(e)}")
+            return None
+        
+        breaker.record_success()
+        return results
+    
+    def _search_with_serper(self, query: str, num_results: int = 5) -> List[Article]:
         """Search for news using Serper API"""
         try:
             # Use news-specific search for better results
-            results = self.serper_tool.search_news(query, num_results)
+            results = self.serper_tool.search_news(query, fetch_count(num_results))
             
             if "error" in results:
-                logger.error(f"Serper API error: {results['error']}")
-                return []
+                raise _serper_error(results)
             
             # Convert Serper results to our standard format
-            search_results = []
-            
-            # Process news results
-            if "news" in results:
-                for article in results["news"][:num_results]:
-                    search_results.append({
-                        "title": article.get("title", "No title"),
-                        "url": article.get("link", ""),
-                        "snippet": article.get("snippet", "No description available"),
-                        "source": article.get("source", "Unknown source"),
-                        "date": article.get("date", "No date"),
-                        "published": article.get("date", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
-                        "search_engine": "Serper API"
-                    })
+            search_results = self._convert_serper_news(results, num_results)
             
             # If no news results, try general search
             if not search_results:
                 general_results = self.serper_tool.search(f"news {query}", num_results)
                 if "organic" in general_results:
-                    for item in general_results["organic"][:num_results]:
-                        search_results.append({
-                            "title": item.get("title", "No title"),
-                            "url": item.get("link", ""),
-                            "snippet": item.get("snippet", "No description available"),
-                            "source": "Web search",
-                            "date": "Recent",
-                            "published": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            "search_engine": "Serper API"
-                        })
+                    fetched_at = time.time()
+                    search_results = [Article.from_serper_organic(item, fetched_at)
+                                      for item in general_results["organic"][:num_results]]
             
             logger.info(f"✅ Serper search found {len(search_results)} results")
             return search_results
             
         except Exception as e:
             logger.error(f"❌ Serper search failed: {str(e)}")
-            return []
+            raise
     
-    def _search_with_google_adk(self, query: str, num_results: int = 5) -> List[Dict]:
+    def _convert_serper_news(self, results: Dict, num_results: int) -> List[Article]:
+        """Convert a Serper news response to Article records, one per distinct story
+        
+        Syndicated copies are collapsed into the best-ranked one (see `Article.alternates`),
+        so the over-fetched extra results fill the list with other stories.
+        """
+        fetched_at = time.time()
+        articles = [Article.from_serper_news(item, fetched_at) for item in results.get("news", [])]
+        if NEAR_DUPLICATE_ENABLED:
+            return collapse_near_duplicates(articles, limit=num_results)
+        return articles[:num_results]
+    
+    def _timed_search(self, query: str, num_results: int = 5) -> List[Article]:
+        """`search_news`, recording how long it took in `last_search_latency`"""
+        started = time.time()
+        try:
+            return self.search_news(query, num_results)
+        finally:
+            self.last_search_latency = time.time() - started
+    
+    def search_news_batch(self, queries: List[str], num_results: int = 5) -> List[List[Article]]:
+        """Search news for many queries with batched Serper requests (e.g. for digest jobs)
+        
+        Falls back to per-query `search_news` when Serper is unavailable.
+        """
+        if not (SERPER_AVAILABLE and self.serper_tool) or not self.serper_breaker.allow_request():
+            return [self.search_news(query, num_results) for query in queries]
+        
+        try:
+            batch_results = self.serper_tool.search_news_batch(queries, fetch_count(num_results))
+        except Exception as e:
+            self.serper_breaker.record_failure()
+            logger.error(f"❌ Serper batch search failed: {str(e)}")
+            return [self.search_news(query, num_results) for query in queries]
+        
+        errors = [results for results in batch_results if "error" in results]
+        if batch_results and len(errors) == len(batch_results):
+            if all(results.get("refused") for results in errors):
+                self.serper_breaker.release()       # refused locally, Serper never saw it
+            else:
+                self.serper_breaker.record_failure()
+        else:
+            self.serper_breaker.record_success()
+        
+        converted = []
+        for query, results in zip(queries, batch_results):
+            if "error" in results:
+                logger.error(f"Serper API error for {query!r}: {results['error']}")
+                converted.append([])
+            else:
+                converted.append(self._convert_serper_news(results, num_results))
+        logger.info(f"✅ Serper batch search completed for {len(queries)} queries")
+        return converted
+    
+    def _search_with_google_adk(self, query: str, num_results: int = 5) -> List[Article]:
         """Search for news using Google ADK"""
         try:
             # Use Google ADK for search
-            search_results = []
-            
-            # Create a prompt for the ADK agent to search
-            search_prompt = f"Search for recent news about: {query}. Find {num_results} relevant articles."
-            
-            response = self.genai_client.models.generate_content(
-                model="gemini-1.5-flash",
-                contents=search_prompt,
-                tools=[self.search_tool],
-                tool_config={'function_calling_config': {'mode': 'ANY'}}
-            )
-            
-            # Process the response and extract search results
-            if hasattr(response, 'candidates') and response.candidates:
-                candidate = response.candidates[0]
-                if hasattr(candidate, 'content') and candidate.content.parts:
-                    for part in candidate.content.parts:
-                        if hasattr(part, 'function_call'):
-                            # This would be the actual search results
-                            # For now, return mock results
-                            search_results = self._get_mock_search_results(query, num_results)
-                        elif hasattr(part, 'text'):
-                            # Parse text response for search results
-                            search_results = self._parse_search_response(part.text, num_results)
-            
-            if not search_results:
-                search_results = self._get_mock_search_results(query, num_results)
-                
-            return search_results
+            response = self.genai_client.models.generate_content(**self._google_adk_request(query, num_results))
+            return self._parse_google_adk_response(response, query, num_results)
             
         except Exception as e:
             logger.error(f"Search failed: {str(e)}")
-            return self._fallback_search(query, num_results)
+            raise
     
-    def _fallback_search(self, query: str, num_results: int = 5) -> List[Dict]:
+    def _google_adk_request(self, query: str, num_results: int) -> Dict[str, Any]:
+        """Build the generate_content arguments for an ADK news search"""
+        # Create a prompt for the ADK agent to search
+        search_prompt = f"Search for recent news about: {query}. Find {num_results} relevant articles."
+        return {
+            "model": "gemini-1.5-flash",
+            "contents": search_prompt,
+            "tools": [self.search_tool],
+            "tool_config": {'function_calling_config': {'mode': 'ANY'}}
+        }
+    
+    def _parse_google_adk_response(self, response, query: str, num_results: int) -> List[Article]:
+        """Extract search results from an ADK generate_content response"""
+        search_results = []
+        
+        # Process the response and extract search results
+        if hasattr(response, 'candidates') and response.candidates:
+            candidate = response.candidates[0]
+            if hasattr(candidate, 'content') and candidate.content.parts:
+                for part in candidate.content.parts:
+                    if hasattr(part, 'function_call'):
+                        # This would be the actual search results
+                        # For now, return mock results
+                        search_results = self._get_mock_search_results(query, num_results)
+                    elif hasattr(part, 'text'):
+                        # Parse text response for search results
+                        search_results = self._parse_search_response(part.text, num_results)
+        
+        if not search_results:
+            search_results = self._get_mock_search_results(query, num_results)
+            
+        return search_results
+    
+    def _fallback_search(self, query: str, num_results: int = 5) -> List[Article]:
         """Fallback search method when Google ADK is not available"""
         # Return mock results for demonstration
         return self._get_mock_search_results(query, num_results)
     
-    def _get_mock_search_results(self, query: str, num_results: int = 5) -> List[Dict]:
+    def _get_mock_search_results(self, query: str, num_results: int = 5) -> List[Article]:
         """Generate mock search results for demonstration"""
+        fetched_at = time.time()
         mock_results = [
-            {
-                "title": f"Breaking: Latest developments in {query}",
-                "url": "https://example.com/news1",
-                "snippet": f"Recent updates and analysis about {query}. Stay informed with the latest information...",
-                "source": "News Source 1",
-                "published": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            },
-            {
-                "title": f"Analysis: Understanding {query} trends",
-                "url": "https://example.com/news2", 
-                "snippet": f"Expert analysis on {query} and its implications for the future...",
-                "source": "News Source 2",
-                "published": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            },
-            {
-                "title": f"Global impact of {query}",
-                "url": "https://example.com/news3",
-                "snippet": f"How {query} is affecting markets and communities worldwide...",
-                "source": "International News",
-                "published": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
+            Article(
+                title=f"Breaking: Latest developments in {query}",
+                url="https://example.com/news1",
+                snippet=f"Recent updates and analysis about {query}. Stay informed with the latest information...",
+                source="News Source 1",
+                fetched_at=fetched_at
+            ),
+            Article(
+                title=f"Analysis: Understanding {query} trends",
+                url="https://example.com/news2",
+                snippet=f"Expert analysis on {query} and its implications for the future...",
+                source="News Source 2",
+                fetched_at=fetched_at
+            ),
+            Article(
+                title=f"Global impact of {query}",
+                url="https://example.com/news3",
+                snippet=f"How {query} is affecting markets and communities worldwide...",
+                source="International News",
+                fetched_at=fetched_at
+            )
         ]
         
         return mock_results[:num_results]
     
-    def _parse_search_response(self, text: str, num_results: int) -> List[Dict]:
+    def _parse_search_response(self, text: str, num_results: int) -> List[Article]:
         """Parse search results from text response"""
         # Simple parsing logic - in a real implementation, 
         # this would parse structured search results
         results = []
         lines = text.split('\n')
+        fetched_at = time.time()
         
         for i, line in enumerate(lines[:num_results]):
             if line.strip():
-                results.append({
-                    "title": line.strip(),
-                    "url": f"https://example.com/news{i+1}",
-                    "snippet": f"Content related to: {line.strip()}",
-                    "source": f"News Source {i+1}",
-                    "published": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                })
+                results.append(Article(
+                    title=line.strip(),
+                    url=f"https://example.com/news{i+1}",
+                    snippet=f"Content related to: {line.strip()}",
+                    source=f"News Source {i+1}",
+                    fetched_at=fetched_at
+                ))
         
         return results
     
-    def analyze_with_ai(self, search_results: List[Dict], original_query: str) -> str:
-        """Analyze search results using Clarifai AI models via LiteLLM"""
+    def analyze_with_ai(self, search_results: List[Article], original_query: str,
+                        outcome: Optional[Dict[str, Any]] = None) -> str:
+        """Analyze search results using Clarifai AI models via LiteLLM
+        
+        Args:
+            search_results: Articles to analyze
+            original_query: User query
+            outcome: Optional dict; "complete" is set to True when a real analysis
+                (not the basic fallback) was produced
+        """
         try:
             if not LITELLM_AVAILABLE or not self.clarifai_pat or self.clarifai_pat == 'your_clarifai_personal_access_token_here':
                 return self._format_basic_response(search_results, original_query)
             
-            # Prepare context from search results
-            context = "Recent news articles:\n\n"
-            for i, result in enumerate(search_results, 1):
-                context += f"{i}. **{result['title']}**\n"
-                context += f"   Source: {result['source']}\n"
-                context += f"   Summary: {result['snippet']}\n"
-                context += f"   Published: {result['published']}\n\n"
-            
-            # Create analysis prompt
-            prompt = f"""Based on the following news articles about "{original_query}", provide a comprehensive analysis:
-
-{context}
-
-Please provide:
-1. A summary of the key developments
-2. Analysis of the main trends and patterns
-3. Potential implications or future outlook
-4. Any important context or background information
-
-Format your response in a clear, engaging way that helps the user understand the current situation."""
-
-            # Get AI analysis using Clarifai via LiteLLM
-            response = completion(
-                model=self.clarifai_model_name,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=800,
-                temperature=0.7,
-                base_url="https://api.clarifai.com/v2/ext/openai/v1",
-                api_key=self.clarifai_pat,
-                stream=False
-            )
+            key = self._analysis_key("summary", search_results, original_query)
+            ai_analysis = self._cached_analysis(key)
+            if ai_analysis is None:
+                prompt = self._build_prompt("summary", search_results, original_query)
+                
+                # Get AI analysis using Clarifai via LiteLLM, escalating across models on failure
+                ai_analysis = self._complete(prompt, original_query)
+                self._store_analysis(key, ai_analysis)
             
-            ai_analysis = response.choices[0].message.content
+            if outcome is not None:
+                outcome["complete"] = True
             
             # Combine AI analysis with source links
-            formatted_response = f"{ai_analysis}\n\n---\n\n**📰 Sources:**\n"
-            for i, result in enumerate(search_results, 1):
-                formatted_response += f"{i}. [{result['title']}]({result['url']}) - {result['source']}\n"
-            
-            return formatted_response
+            return ai_analysis + self._sources_section(search_results)
             
         except Exception as e:
             logger.error(f"AI analysis failed: {str(e)}")
             return self._format_basic_response(search_results, original_query)
 
-    def analyze_with_ai_stream(self, search_results: List[Dict], original_query: str):
-        """Analyze search results using AI with streaming response"""
+    def analyze_with_ai_stream(self, search_results: List[Article], original_query: str,
+                               outcome: Optional[Dict[str, Any]] = None):
+        """Analyze search results using AI with streaming response
+        
+        `outcome`, if given, gets "complete" set to True once a real analysis has
+        been fully streamed (see `analyze_with_ai`).
+        """
         if not self.clarifai_pat:
             logger.warning("No Clarifai PAT available for AI analysis")
             yield self._format_basic_response(search_results, original_query)
             return
             
         try:
-            # Create context from search results
-            context = ""
-            for i, result in enumerate(search_results, 1):
-                context += f"\n{i}. **{result['title']}** ({result['source']}, {result['published']})\n"
-                context += f"   {result['snippet']}\n"
-                context += f"   URL: {result['url']}\n"
-            
-            if not context.strip():
+            if not search_results:
                 logger.warning("No search results to analyze")
-                yield "I couldn't find any recent news articles for your query. Please try a different search term or check back later."
+                yield NO_RESULTS_MESSAGE
                 return
             
-            prompt = f"""Based on the following news articles about "{original_query}", provide a comprehensive analysis:
+            # Replay a cached analysis of the same articles instead of calling the model
+            key = self._analysis_key("stream", search_results, original_query)
+            cached = self._cached_analysis(key)
+            if cached is not None:
+                yield from replay_stream(cached)
+                if outcome is not None:
+                    outcome["complete"] = True
+                return
+            
+            prompt = self._build_prompt("stream", search_results, original_query)
+            
+            # Stream the AI analysis using Clarifai via LiteLLM
+            parts = []
+            for content in self._complete_stream(prompt, original_query):
+                parts.append(content)
+                yield content
+            
+            # Only complete streams are cached (an abandoned generator never gets here)
+            self._store_analysis(key, "".join(parts))
+            if outcome is not None:
+                outcome["complete"] = True
+            
+        except Exception as e:
+            logger.error(f"Streaming AI analysis failed: {str(e)}")
+            yield self._format_basic_response(search_results, original_query)
+    
+    def _analysis_key(self, mode: str, search_results: List[Article], original_query: str):
+        """Analysis cache key: model, prompt template version and article-set fingerprint"""
+        return make_analysis_key(self._cache_model_name, f"{mode}-v{ANALYSIS_PROMPT_VERSION}",
+                                 original_query, search_results)
+    
+    def _cached_analysis(self, key) -> Optional[str]:
+        """Look up a cached analysis (None on a miss or when caching is disabled)"""
+        if self.analysis_cache is None:
+            return None
+        cached = self.analysis_cache.get(key, record_stats=True)
+        if cached is None:
+            return None
+        logger.info("✅ Reusing cached analysis - skipping the Clarifai call")
+        return cached["analysis"]
+    
+    def _store_analysis(self, key, analysis: str):
+        """Cache a successfully generated analysis"""
+        if self.analysis_cache is not None and analysis:
+            self.analysis_cache.put(key, {"analysis": analysis, "model": self.last_model or self.model_name})
+    
+    def get_analysis_cache_stats(self) -> Dict[str, Any]:
+        """Get analysis cache hit/miss/eviction statistics"""
+        return self.analysis_cache.get_stats() if self.analysis_cache else {}
+    
+    def _build_prompt(self, mode: str, search_results: List[Article], original_query: str) -> str:
+        """Build the analysis prompt within the token budget and record its exact size
+        
+        Args:
+            mode: "summary" for one-shot analyses, "stream" for streamed ones
+            search_results: Articles in ranked order
+            original_query: User query
+        """
+        if mode == "summary":
+            built = self.context_builder.build(
+                search_results, self._summary_article,
+                lambda context: self._analysis_prompt("Recent news articles:\n\n" + context, original_query)
+            )
+        else:
+            built = self.context_builder.build(
+                search_results, self._stream_article,
+                lambda context: self._analysis_prompt(context, original_query)
+            )
+        self.last_context = built
+        logger.info(f"🔧 Analysis prompt: {built.prompt_tokens} tokens for {len(built.articles)} articles")
+        return built.prompt
+    
+    @property
+    def last_prompt_tokens(self) -> Optional[int]:
+        """Exact token count of the most recently built analysis prompt"""
+        return self.last_context.prompt_tokens if self.last_context else None
+    
+    def _summary_article(self, i: int, result: Article, snippet: str) -> str:
+        """Context block for one article in a one-shot analysis"""
+        also = self._also_reported_by(result)
+        return (f"{i}. **{result.title}**\n"
+                f"   Source: {result.source}\n"
+                + (f"   Also reported by: {also}\n" if also else "") +
+                f"   Summary: {snippet}\n"
+                f"   Published: {result.published}\n\n")
+    
+    def _stream_article(self, i: int, result: Article, snippet: str) -> str:
+        """Context block for one article in a streamed analysis"""
+        also = self._also_reported_by(result)
+        return (f"\n{i}. **{result.title}** ({result.source}, {result.published})\n"
+                + (f"   Also reported by: {also}\n" if also else "") +
+                f"   {snippet}\n"
+                f"   URL: {result.url}\n")
+    
+    def _also_reported_by(self, result: Article) -> str:
+        """Other outlets that ran the same story, comma-separated"""
+        sources = []
+        for alternate in result.alternates:
+            if alternate.source != result.source and alternate.source not in sources:
+                sources.append(alternate.source)
+        return ", ".join(sources)
+    
+    def _analysis_prompt(self, context: str, original_query: str) -> str:
+        """Create the analysis prompt for a set of articles"""
+        return f"""Based on the following news articles about "{original_query}", provide a comprehensive analysis:
 
 {context}
 
@@ -463,28 +785,190 @@ Please provide:
 4. Any important context or background information
 
 Format your response in a clear, engaging way that helps the user understand the current situation."""
-
-            # Get AI analysis using Clarifai via LiteLLM with streaming
-            response = completion(
-                model=self.clarifai_model_name,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=800,
-                temperature=0.7,
-                base_url="https://api.clarifai.com/v2/ext/openai/v1",
-                api_key=self.clarifai_pat,
-                stream=True
-            )
-            
-            # Stream the response
-            for chunk in response:
-                if chunk.choices[0].delta.content is not None:
-                    yield chunk.choices[0].delta.content
+    
+    def _completion_kwargs(self, prompt: str, stream: bool, model: Optional[str] = None,
+                           timeout: Optional[float] = None, is_async: bool = False) -> Dict[str, Any]:
+        """LiteLLM arguments for a Clarifai analysis request
+        
+        Args:
+            prompt: Analysis prompt
+            stream: Whether to stream the response
+            model: Model name to use instead of the agent's own (e.g. chosen by the router)
+            timeout: Request timeout in seconds
+            is_async: Build the arguments for `litellm.acompletion` (must run inside the event loop)
+        """
+        kwargs = {
+            "model": self._convert_to_clarifai_format(model) if model else self.clarifai_model_name,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": CONTEXT_COMPLETION_TOKENS,
+            "temperature": 0.7,
+            "base_url": CLARIFAI_BASE_URL,
+            "api_key": self.clarifai_pat,
+            "stream": stream
+        }
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        if HTTPX_AVAILABLE:
+            kwargs["client"] = _async_llm_client(self.clarifai_pat) if is_async else _llm_client(self.clarifai_pat)
+        return kwargs
+    
+    @property
+    def _cache_model_name(self) -> str:
+        """Model identity for cache keys ("auto" answers are shared whichever model produced them)"""
+        return AUTO_MODEL if self.auto_routing else self.clarifai_model_name
+    
+    def _route(self, original_query: str):
+        """Plan the model cascade for the analysis just built for `original_query`"""
+        return self.router.plan(original_query, pinned=None if self.auto_routing else self.model_name,
+                                prompt_tokens=self.last_prompt_tokens)
+    
+    def _complete(self, prompt: str, original_query: str) -> str:
+        """Run a completion through the model cascade, returning the first successful answer
+        
+        Raises:
+            ModelRoutingError: Every model failed or the latency SLO ran out
+        """
+        plan = self._route(original_query)
+        for profile, timeout in plan.attempts():
+            started = time.time()
+            try:
+                response = litellm.completion(**self._completion_kwargs(prompt, False, profile.name, timeout))
+                content = response.choices[0].message.content
+                if not content:
+                    raise ValueError("empty completion")
+            except Exception as e:
+                plan.failed(profile, e)
+                continue
+            usage = getattr(response, "usage", None)
+            plan.succeeded(profile, started, tokens=getattr(usage, "completion_tokens", 0) or 0)
+            self.last_model = profile.name
+            return content
+        raise ModelRoutingError(f"No model answered (tried {plan.attempted or 'none'})")
+    
+    def _complete_stream(self, prompt: str, original_query: str):
+        """Stream a completion through the model cascade
+        
+        A model that errors or sends nothing before its first token is replaced
+        by the next one; once content has been yielded the stream is committed
+        to that model.
+        
+        Raises:
+            ModelRoutingError: Every model failed or the latency SLO ran out
+        """
+        plan = self._route(original_query)
+        for profile, timeout in plan.attempts(stream=True):
+            started = time.time()
+            try:
+                profile, first, chunks, ttft = self._open_stream(plan, profile, prompt, timeout)
+            except Exception as e:
+                plan.failed(profile, e)
+                continue
             
-        except Exception as e:
-            logger.error(f"Streaming AI analysis failed: {str(e)}")
-            yield self._format_basic_response(search_results, original_query)
+            self.last_model = profile.name
+            self.last_ttft = time.time() - started
+            tokens = 1
+            try:
+                yield first
+                for content in chunks:
+                    tokens += 1
+                    yield content
+            except GeneratorExit:
+                plan.abandoned(profile)
+                raise
+            except Exception as e:
+                plan.failed(profile, e)
+                raise
+            finally:
+                chunks.close()
+            # Streamed chunks carry about one token each
+            plan.succeeded(profile, started, ttft=ttft, tokens=tokens)
+            return
+        raise ModelRoutingError(f"No model answered (tried {plan.attempted or 'none'})")
+    
+    def _open_stream(self, plan, profile, prompt: str, timeout: float):
+        """Start a streamed completion on `profile` and wait for its first chunk
+        
+        With hedging enabled, a backup request is sent once the wait exceeds the
+        model's usual time to first token, and whichever stream starts first is kept.
+        
+        Returns:
+            (model that answered, first chunk, remaining chunks, time to first chunk)
+        """
+        def start(target):
+            return _content_chunks(litellm.completion(**self._completion_kwargs(prompt, True, target.name, timeout)))
+        
+        if not self.hedging:
+            started = time.time()
+            chunks = start(profile)
+            try:
+                first = next(chunks)
+            except StopIteration:
+                raise ValueError("empty stream")
+            except BaseException:
+                chunks.close()
+                raise
+            return profile, first, chunks, time.time() - started
+        
+        hedge_target = []
+        
+        def start_hedge():
+            hedge_target.append(plan.hedge_for(profile, alternate=LLM_HEDGE_MODEL == "alternate"))
+            return start(hedge_target[0])
+        
+        delay = self.hedger.delay(self.router.ttft_samples(profile.name))
+        try:
+            result = self.hedger.race(lambda: start(profile), start_hedge, delay, timeout)
+        except HedgeFailed as e:
+            self._settle_hedge(plan, profile, hedge_target, e.errors, None, delay)
+            raise e.errors.get(PRIMARY, e)
+        self._settle_hedge(plan, profile, hedge_target, result.errors, result, delay)
+        winner = hedge_target[0] if result.index == HEDGE else profile
+        return winner, result.first, result.chunks, result.ttft
+    
+    def _settle_hedge(self, plan, profile, hedge_target: List, errors: Dict[int, BaseException],
+                      result, delay: float):
+        """Attribute the outcome of a hedged race to the models involved
+        
+        The primary's own outcome (success or the error raised to the caller) is
+        recorded by the caller; this records the hedge's failure, the losing
+        model's lower-bound TTFT, and frees circuit slots of requests that lost.
+        """
+        if not hedge_target:
+            return
+        hedge = hedge_target[0]
+        if hedge is profile:
+            return
+        if HEDGE in errors:
+            plan.failed(hedge, errors[HEDGE])
+        elif result is None or result.index == PRIMARY:
+            plan.abandoned(hedge)
+        if result is not None and result.index == HEDGE:
+            # The primary had not started after waiting this long
+            self.router.record_ttft(profile.name, delay + result.ttft)
+            plan.abandoned(profile)
+    
+    def get_hedge_stats(self) -> Dict[str, Any]:
+        """Hedge rate, hedge win rate and first-token p50/p99 (shared across sessions)"""
+        return self.hedger.get_stats()
+    
+    def get_llm_pool_stats(self) -> Dict[str, Any]:
+        """Requests, HTTP/2 use and connection reuse of the shared LLM pool (all sessions)"""
+        return get_http_client_stats(LLM_POOL_NAME)
+    
+    def get_router_stats(self) -> Dict[str, Any]:
+        """Per-model rolling latency, throughput and error rate from the model router"""
+        return self.router.get_stats()
+    
+    def _sources_section(self, search_results: List[Article]) -> str:
+        """Markdown list of source links appended after an analysis"""
+        sources_section = "\n\n---\n\n**📰 Sources:**\n"
+        for i, result in enumerate(search_results, 1):
+            sources_section += f"{i}. [{result.title}]({result.url}) - {result.source}"
+            also = self._also_reported_by(result)
+            sources_section += f" (also: {also})\n" if also else "\n"
+        return sources_section
     
-    def _format_basic_response(self, search_results: List[Dict], query: str) -> str:
+    def _format_basic_response(self, search_results: List[Article], query: str) -> str:
         """Format a basic response without AI analysis"""
         response = f"## 📰 News Results for: {query}\n\n"
         
@@ -495,23 +979,37 @@ Format your response in a clear, engaging way that helps the user understand the
         response += f"Found {len(search_results)} recent articles:\n\n"
         
         for i, result in enumerate(search_results, 1):
-            response += f"### {i}. {result['title']}\n"
-            response += f"**Source:** {result['source']} | **Published:** {result['published']}\n\n"
-            response += f"{result['snippet']}\n\n"
-            response += f"[Read more]({result['url']})\n\n---\n\n"
+            response += f"### {i}. {result.title}\n"
+            response += f"**Source:** {result.source} | **Published:** {result.published}\n\n"
+            response += f"{result.snippet}\n\n"
+            response += f"[Read more]({result.url})\n\n---\n\n"
         
         response += "💡 *Set your CLARIFAI_PAT in the .env file to enable AI-powered analysis and insights.*"
         
         return response
     
     def search_and_analyze(self, query: str) -> str:
-        """Main method to search for news and provide AI analysis"""
+        """Main method to search for news and provide AI analysis
+        
+        Paraphrases of a recently answered query are served from the semantic cache.
+        """
+        self.last_context = None
+        self.last_model = None
+        self.last_ttft = None
+        self.last_search_latency = None
         try:
+            cached = self._semantic_lookup(query, "answer")
+            if cached is not None:
+                return cached
+            
             # Search for news
-            search_results = self.search_news(query, num_results=5)
+            search_results = self._timed_search(query, num_results=5)
             
             # Analyze with AI
-            analysis = self.analyze_with_ai(search_results, query)
+            outcome = {}
+            analysis = self.analyze_with_ai(search_results, query, outcome)
+            if outcome.get("complete"):
+                self._semantic_store(query, "answer", analysis)
             
             return analysis
             
@@ -521,25 +1019,613 @@ Format your response in a clear, engaging way that helps the user understand the
 
     def search_and_analyze_stream(self, query: str):
         """Main method to search for news and provide AI analysis with streaming"""
+        return self._semantic_cached_stream(query, "stream", self._search_and_analyze_stream)
+    
+    def _search_and_analyze_stream(self, query: str, outcome: Dict[str, Any]):
         try:
             # Search for news
-            search_results = self.search_news(query, num_results=5)
+            search_results = self._timed_search(query, num_results=5)
             
             # Analyze with AI using streaming
-            for chunk in self.analyze_with_ai_stream(search_results, query):
+            for chunk in self.analyze_with_ai_stream(search_results, query, outcome):
                 yield chunk
             
             # Add source links at the end
-            sources_section = "\n\n---\n\n**📰 Sources:**\n"
-            for i, result in enumerate(search_results, 1):
-                sources_section += f"{i}. [{result['title']}]({result['url']}) - {result['source']}\n"
+            yield self._sources_section(search_results)
+            
+        except Exception as e:
+            logger.error(f"Streaming search and analysis failed: {str(e)}")
+            yield f"❌ Sorry, I encountered an error while processing your request: {str(e)}\n\nPlease try again or check your configuration."
+
+    def search_and_analyze_pipelined(self, query: str, num_results: int = 5,
+                                     first_k: int = PIPELINE_FIRST_K):
+        """Stream search and analysis with retrieval and generation overlapped
+        
+        Yields a "found N articles" header and the sources block as soon as the
+        primary search returns, then streams the analysis of the first `first_k`
+        results. With PIPELINE_SECONDARY_SEARCH on, a secondary coverage search
+        runs in the background meanwhile and its extra articles are appended at
+        the end. Timings for the request are kept
+        in `last_pipeline_timings`. Paraphrases of a recently answered query are
+        replayed from the semantic cache.
+        
+        Args:
+            query: User query
+            num_results: Number of primary results
+            first_k: Results handed to the LLM (0 = all primary results)
+        """
+        return self._semantic_cached_stream(
+            query, f"pipelined-{num_results}-{first_k}",
+            lambda q, outcome: self._search_and_analyze_pipelined(q, num_results, first_k, outcome)
+        )
+    
+    def _search_and_analyze_pipelined(self, query: str, num_results: int, first_k: int,
+                                      outcome: Dict[str, Any]):
+        """Body of `search_and_analyze_pipelined`; sets outcome["complete"] once the analysis finished"""
+        timings = {"started_at": time.time()}
+        self.last_pipeline_timings = timings
+        executor = _get_pipeline_executor()
+        # cancel() can't stop a search a worker already picked up, so it also checks this flag
+        abandoned = threading.Event()
+        secondary = executor.submit(self._search_web_coverage, query, num_results, abandoned) \
+            if PIPELINE_SECONDARY_SEARCH and self._serper_usable(self.serper_tool) else None
+        
+        try:
+            search_results = self._timed_search(query, num_results=num_results)
+            timings["search"] = time.time() - timings["started_at"]
+            
+            yield (self._results_header(search_results, query) + self._sources_section(search_results)
+                   + "\n**🧠 Analysis:**\n\n")
+            timings["first_byte"] = time.time() - timings["started_at"]
+            
+            analyzed = search_results[:first_k] if first_k > 0 else search_results
+            for chunk in self.analyze_with_ai_stream(analyzed, query, outcome):
+                timings.setdefault("first_token", time.time() - timings["started_at"])
+                yield chunk
+            
+            if secondary is not None:
+                yield self._more_coverage_section(search_results, self._collect_secondary(secondary))
+            
+        except Exception as e:
+            logger.error(f"Pipelined search and analysis failed: {str(e)}")
+            yield f"❌ Sorry, I encountered an error while processing your request: {str(e)}\n\nPlease try again or check your configuration."
+        finally:
+            if secondary is not None:
+                abandoned.set()
+                secondary.cancel()
+            timings["total"] = time.time() - timings["started_at"]
+            logger.info(f"⏱️ Pipelined response: first byte {timings.get('first_byte', 0):.2f}s, "
+                        f"first token {timings.get('first_token', 0):.2f}s, total {timings['total']:.2f}s")
+    
+    def _semantic_namespace(self, response_format: str) -> str:
+        """Semantic cache partition: answers only match for the same model and output format"""
+        return f"{self._cache_model_name}|{response_format}|v{ANALYSIS_PROMPT_VERSION}"
+    
+    def _semantic_lookup(self, query: str, response_format: str) -> Optional[str]:
+        """Cached answer to a similar recent query, if any"""
+        if self.semantic_cache is None:
+            return None
+        hit = self.semantic_cache.lookup(query, self._semantic_namespace(response_format))
+        if hit is None:
+            return None
+        logger.info(f"✅ Semantic cache hit for {query!r} (matched {hit['query']!r}, "
+                    f"similarity {hit['similarity']:.2f})")
+        return hit["value"]
+    
+    def _semantic_store(self, query: str, response_format: str, answer: str):
+        """Remember a complete answer for paraphrases of this query"""
+        if self.semantic_cache is not None and answer:
+            self.semantic_cache.put(query, answer, self._semantic_namespace(response_format))
+    
+    def _semantic_cached_stream(self, query: str, response_format: str, produce):
+        """Replay a semantically cached answer, or stream `produce(query, outcome)` and cache it if complete"""
+        self.last_context = None
+        self.last_model = None
+        self.last_ttft = None
+        self.last_search_latency = None
+        cached = self._semantic_lookup(query, response_format)
+        if cached is not None:
+            yield from replay_stream(cached)
+            return
+        
+        outcome = {}
+        parts = []
+        for chunk in produce(query, outcome):
+            parts.append(chunk)
+            yield chunk
+        if outcome.get("complete"):
+            self._semantic_store(query, response_format, "".join(parts))
+    
+    async def _asemantic_cached_stream(self, query: str, response_format: str, produce):
+        """Async-iterator counterpart of `_semantic_cached_stream`"""
+        self.last_context = None
+        self.last_model = None
+        self.last_ttft = None
+        self.last_search_latency = None
+        cached = self._semantic_lookup(query, response_format)
+        if cached is not None:
+            async for chunk in areplay_stream(cached):
+                yield chunk
+            return
+        
+        outcome = {}
+        parts = []
+        stream = produce(query, outcome)
+        try:
+            async for chunk in stream:
+                parts.append(chunk)
+                yield chunk
+        finally:
+            await stream.aclose()
+        if outcome.get("complete"):
+            self._semantic_store(query, response_format, "".join(parts))
+    
+    def get_semantic_cache_stats(self) -> Dict[str, Any]:
+        """Get semantic cache hit/miss/eviction statistics"""
+        return self.semantic_cache.get_stats() if self.semantic_cache else {}
+    
+    def _search_web_coverage(self, query: str, num_results: int,
+                             abandoned: Optional[threading.Event] = None) -> List[Article]:
+        """Secondary search: Serper web results for extra coverage of the story
+        
+        Runs through the Serper circuit breaker; returns nothing if the circuit is
+        open or the search failed, and without spending a Serper request once
+        `abandoned` is set.
+        """
+        if abandoned is not None and abandoned.is_set():
+            logger.info("⏭️ Pipeline abandoned - skipping the secondary coverage search")
+            return []
+        return self._search_with_breaker(self.serper_breaker, self._serper_web_coverage, query, num_results) or []
+    
+    def _serper_web_coverage(self, query: str, num_results: int) -> List[Article]:
+        """Serper web search for `_search_web_coverage`"""
+        results = self.serper_tool.search(f"news {query}", num_results)
+        if "error" in results:
+            raise _serper_error(results)
+        fetched_at = time.time()
+        return [Article.from_serper_organic(item, fetched_at) for item in results.get("organic", [])[:num_results]]
+    
+    def _collect_secondary(self, future) -> List[Article]:
+        """Wait briefly for a secondary search; a slow or failed one is simply skipped"""
+        try:
+            return future.result(timeout=PIPELINE_SECONDARY_TIMEOUT)
+        except FutureTimeoutError:
+            logger.warning("⚠️ Secondary coverage search timed out - skipping")
+        except Exception as e:
+            logger.warning(f"⚠️ Secondary coverage search failed: {str(e)}")
+        return []
+    
+    def _results_header(self, search_results: List[Article], query: str) -> str:
+        """Header emitted as soon as the primary search returns"""
+        count = len(search_results)
+        return f"🔎 Found {count} article{'s' if count != 1 else ''} for **{query}**"
+    
+    def _more_coverage_section(self, search_results: List[Article], extra: List[Article]) -> str:
+        """Markdown list of secondary articles not already among the primary sources"""
+        seen = {result.canonical_url for result in search_results}
+        extra = [article for article in extra if article.canonical_url not in seen]
+        if not extra:
+            return ""
+        section = "\n\n**➕ More coverage:**\n"
+        for i, result in enumerate(extra, len(search_results) + 1):
+            section += f"{i}. [{result.title}]({result.url}) - {result.source}\n"
+        return section
+    
+    # ------------------------------------------------------------------
+    # Async API: one event loop can serve many concurrent users. Cancelling
+    # the calling task cancels the in-flight search and LLM request.
+    # ------------------------------------------------------------------
+    
+    async def _atimed_search(self, query: str, num_results: int = 5) -> List[Article]:
+        """Async counterpart of `_timed_search`"""
+        started = time.time()
+        try:
+            return await self.asearch_news(query, num_results)
+        finally:
+            self.last_search_latency = time.time() - started
+    
+    async def asearch_news(self, query: str, num_results: int = 5) -> List[Article]:
+        """Async counterpart of `search_news` using async HTTP for every provider"""
+        try:
+            # Priority 1: Use Serper API if available
+            if ASYNC_SERPER_AVAILABLE and self._serper_usable(self.async_serper_tool):
+                results = await self._asearch_with_breaker(self.serper_breaker, self._asearch_with_serper,
+                                                           query, num_results)
+                if results is not None:
+                    return results
+            
+            # Priority 2: Use Google ADK if available
+            if self._google_adk_usable():
+                results = await self._asearch_with_breaker(self.google_adk_breaker, self._asearch_with_google_adk,
+                                                           query, num_results)
+                if results is not None:
+                    return results
+            
+            # Fallback: Simple web search
+            return self._fallback_search(query, num_results)
+                
+        except Exception as e:
+            logger.error(f"❌ Search failed: {str(e)}")
+            return self._fallback_search(query, num_results)
+    
+    async def _asearch_with_breaker(self, breaker: CircuitBreaker, search, query: str,
+                                    num_results: int) -> Optional[List[Article]]:
+        """Async counterpart of `_search_with_breaker`; cancellation and local refusals are not counted as failures"""
+        if not breaker.allow_request():
+            logger.info(f"⚡ {breaker.name} circuit open - failing over")
+            return None
+        
+        try:
+            results = await search(query, num_results)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except SearchProviderRefused as e:
+            breaker.release()
+            logger.warning(f"⚠️ {breaker.name} search refused locally - failing over: {str(e)}")
+            return None
+        except Exception as e:
+            breaker.record_failure()
+            logger.error(f"❌ {breaker.name} search failed: {str(e)}")
+            return None
+        
+        breaker.record_success()
+        return results
+    
+    async def _asearch_with_serper(self, query: str, num_results: int = 5) -> List[Article]:
+        """Search for news using the async Serper client"""
+        results = await self.async_serper_tool.search_news(query, fetch_count(num_results))
+        if "error" in results:
+            raise _serper_error(results)
+        
+        search_results = self._convert_serper_news(results, num_results)
+        
+        # If no news results, try general search
+        if not search_results:
+            general_results = await self.async_serper_tool.search(f"news {query}", num_results)
+            if "organic" in general_results:
+                fetched_at = time.time()
+                search_results = [Article.from_serper_organic(item, fetched_at)
+                                  for item in general_results["organic"][:num_results]]
+        
+        logger.info(f"✅ Serper search found {len(search_results)} results")
+        return search_results
+    
+    async def _asearch_with_google_adk(self, query: str, num_results: int = 5) -> List[Article]:
+        """Search for news using the Google ADK async client"""
+        response = await self.genai_client.aio.models.generate_content(**self._google_adk_request(query, num_results))
+        return self._parse_google_adk_response(response, query, num_results)
+    
+    async def aanalyze_with_ai(self, search_results: List[Article], original_query: str,
+                               outcome: Optional[Dict[str, Any]] = None) -> str:
+        """Async counterpart of `analyze_with_ai` using `litellm.acompletion`"""
+        try:
+            if not LITELLM_AVAILABLE or not self.clarifai_pat or self.clarifai_pat == 'your_clarifai_personal_access_token_here':
+                return self._format_basic_response(search_results, original_query)
+            
+            key = self._analysis_key("summary", search_results, original_query)
+            ai_analysis = self._cached_analysis(key)
+            if ai_analysis is None:
+                prompt = self._build_prompt("summary", search_results, original_query)
+                ai_analysis = await self._acomplete(prompt, original_query)
+                self._store_analysis(key, ai_analysis)
+            if outcome is not None:
+                outcome["complete"] = True
+            return ai_analysis + self._sources_section(search_results)
+            
+        except Exception as e:
+            logger.error(f"AI analysis failed: {str(e)}")
+            return self._format_basic_response(search_results, original_query)
+    
+    async def aanalyze_with_ai_stream(self, search_results: List[Article], original_query: str,
+                                      outcome: Optional[Dict[str, Any]] = None):
+        """Async-iterator counterpart of `analyze_with_ai_stream`
+        
+        Closing the iterator or cancelling the consumer closes the upstream stream.
+        `outcome`, if given, gets "complete" set to True once a real analysis has
+        been fully streamed.
+        """
+        if not self.clarifai_pat:
+            logger.warning("No Clarifai PAT available for AI analysis")
+            yield self._format_basic_response(search_results, original_query)
+            return
+        
+        if not search_results:
+            logger.warning("No search results to analyze")
+            yield NO_RESULTS_MESSAGE
+            return
+        
+        key = self._analysis_key("stream", search_results, original_query)
+        cached = self._cached_analysis(key)
+        if cached is not None:
+            async for chunk in areplay_stream(cached):
+                yield chunk
+            if outcome is not None:
+                outcome["complete"] = True
+            return
+        
+        prompt = self._build_prompt("stream", search_results, original_query)
+        stream = self._acomplete_stream(prompt, original_query)
+        try:
+            parts = []
+            async for content in stream:
+                parts.append(content)
+                yield content
+            self._store_analysis(key, "".join(parts))
+            if outcome is not None:
+                outcome["complete"] = True
+        except Exception as e:
+            logger.error(f"Streaming AI analysis failed: {str(e)}")
+            yield self._format_basic_response(search_results, original_query)
+        finally:
+            await stream.aclose()
+    
+    async def _acomplete(self, prompt: str, original_query: str) -> str:
+        """Async counterpart of `_complete`"""
+        plan = self._route(original_query)
+        for profile, timeout in plan.attempts():
+            started = time.time()
+            try:
+                response = await litellm.acompletion(**self._completion_kwargs(prompt, False, profile.name, timeout,
+                                                                                is_async=True))
+                content = response.choices[0].message.content
+                if not content:
+                    raise ValueError("empty completion")
+            except asyncio.CancelledError:
+                plan.abandoned(profile)
+                raise
+            except Exception as e:
+                plan.failed(profile, e)
+                continue
+            usage = getattr(response, "usage", None)
+            plan.succeeded(profile, started, tokens=getattr(usage, "completion_tokens", 0) or 0)
+            self.last_model = profile.name
+            return content
+        raise ModelRoutingError(f"No model answered (tried {plan.attempted or 'none'})")
+    
+    async def _acomplete_stream(self, prompt: str, original_query: str):
+        """Async counterpart of `_complete_stream`; the upstream stream is closed however it ends"""
+        plan = self._route(original_query)
+        for profile, timeout in plan.attempts(stream=True):
+            started = time.time()
+            try:
+                profile, first, chunks, ttft = await self._aopen_stream(plan, profile, prompt, timeout)
+            except asyncio.CancelledError:
+                plan.abandoned(profile)
+                raise
+            except Exception as e:
+                plan.failed(profile, e)
+                continue
+            
+            self.last_model = profile.name
+            self.last_ttft = time.time() - started
+            tokens = 1
+            try:
+                yield first
+                async for content in chunks:
+                    tokens += 1
+                    yield content
+            except (GeneratorExit, asyncio.CancelledError):
+                plan.abandoned(profile)
+                raise
+            except Exception as e:
+                plan.failed(profile, e)
+                raise
+            finally:
+                await chunks.aclose()
+            plan.succeeded(profile, started, ttft=ttft, tokens=tokens)
+            return
+        raise ModelRoutingError(f"No model answered (tried {plan.attempted or 'none'})")
+    
+    async def _aopen_stream(self, plan, profile, prompt: str, timeout: float):
+        """Async counterpart of `_open_stream`; a losing hedge request is cancelled"""
+        async def start(target):
+            response = await litellm.acompletion(**self._completion_kwargs(prompt, True, target.name, timeout,
+                                                                            is_async=True))
+            return _acontent_chunks(response)
+        
+        if not self.hedging:
+            started = time.time()
+            chunks = await start(profile)
+            try:
+                first = await chunks.__anext__()
+            except StopAsyncIteration:
+                raise ValueError("empty stream")
+            except BaseException:
+                await chunks.aclose()
+                raise
+            return profile, first, chunks, time.time() - started
+        
+        hedge_target = []
+        
+        async def start_hedge():
+            hedge_target.append(plan.hedge_for(profile, alternate=LLM_HEDGE_MODEL == "alternate"))
+            return await start(hedge_target[0])
+        
+        delay = self.hedger.delay(self.router.ttft_samples(profile.name))
+        try:
+            result = await self.hedger.arace(lambda: start(profile), start_hedge, delay, timeout)
+        except HedgeFailed as e:
+            self._settle_hedge(plan, profile, hedge_target, e.errors, None, delay)
+            raise e.errors.get(PRIMARY, e)
+        self._settle_hedge(plan, profile, hedge_target, result.errors, result, delay)
+        winner = hedge_target[0] if result.index == HEDGE else profile
+        return winner, result.first, result.chunks, result.ttft
+    
+    async def asearch_and_analyze(self, query: str) -> str:
+        """Async counterpart of `search_and_analyze`"""
+        self.last_context = None
+        self.last_model = None
+        self.last_ttft = None
+        self.last_search_latency = None
+        try:
+            cached = self._semantic_lookup(query, "answer")
+            if cached is not None:
+                return cached
             
-            yield sources_section
+            search_results = await self._atimed_search(query, num_results=5)
+            outcome = {}
+            analysis = await self.aanalyze_with_ai(search_results, query, outcome)
+            if outcome.get("complete"):
+                self._semantic_store(query, "answer", analysis)
+            return analysis
+        except Exception as e:
+            logger.error(f"Search and analysis failed: {str(e)}")
+            return f"❌ Sorry, I encountered an error while processing your request: {str(e)}\n\nPlease try again or check your configuration."
+    
+    async def asearch_and_analyze_pipelined(self, query: str, num_results: int = 5,
+                                            first_k: int = PIPELINE_FIRST_K):
+        """Async-iterator counterpart of `search_and_analyze_pipelined`"""
+        stream = self._asemantic_cached_stream(
+            query, f"pipelined-{num_results}-{first_k}",
+            lambda q, outcome: self._asearch_and_analyze_pipelined(q, num_results, first_k, outcome)
+        )
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+    
+    async def _asearch_and_analyze_pipelined(self, query: str, num_results: int, first_k: int,
+                                             outcome: Dict[str, Any]):
+        """Body of `asearch_and_analyze_pipelined`; sets outcome["complete"] once the analysis finished"""
+        timings = {"started_at": time.time()}
+        self.last_pipeline_timings = timings
+        secondary = asyncio.ensure_future(self._asearch_web_coverage(query, num_results)) \
+            if PIPELINE_SECONDARY_SEARCH and ASYNC_SERPER_AVAILABLE and self._serper_usable(self.async_serper_tool) \
+            else None
+        
+        try:
+            search_results = await self._atimed_search(query, num_results=num_results)
+            timings["search"] = time.time() - timings["started_at"]
+            
+            yield (self._results_header(search_results, query) + self._sources_section(search_results)
+                   + "\n**🧠 Analysis:**\n\n")
+            timings["first_byte"] = time.time() - timings["started_at"]
+            
+            analyzed = search_results[:first_k] if first_k > 0 else search_results
+            stream = self.aanalyze_with_ai_stream(analyzed, query, outcome)
+            try:
+                async for chunk in stream:
+                    timings.setdefault("first_token", time.time() - timings["started_at"])
+                    yield chunk
+            finally:
+                await stream.aclose()
+            
+            if secondary is not None:
+                try:
+                    extra = await asyncio.wait_for(asyncio.shield(secondary), PIPELINE_SECONDARY_TIMEOUT)
+                except asyncio.TimeoutError:
+                    logger.warning("⚠️ Secondary coverage search timed out - skipping")
+                    extra = []
+                except Exception as e:
+                    logger.warning(f"⚠️ Secondary coverage search failed: {str(e)}")
+                    extra = []
+                yield self._more_coverage_section(search_results, extra)
+            
+        except Exception as e:
+            logger.error(f"Pipelined search and analysis failed: {str(e)}")
+            yield f"❌ Sorry, I encountered an error while processing your request: {str(e)}\n\nPlease try again or check your configuration."
+        finally:
+            if secondary is not None:
+                if not secondary.done():
+                    secondary.cancel()
+                elif not secondary.cancelled():
+                    secondary.exception()  # mark a failure as retrieved
+            timings["total"] = time.time() - timings["started_at"]
+    
+    async def _asearch_web_coverage(self, query: str, num_results: int) -> List[Article]:
+        """Async secondary search: Serper web results for extra coverage, through the Serper breaker"""
+        return await self._asearch_with_breaker(self.serper_breaker, self._aserper_web_coverage,
+                                                query, num_results) or []
+    
+    async def _aserper_web_coverage(self, query: str, num_results: int) -> List[Article]:
+        """Async Serper web search for `_asearch_web_coverage`"""
+        results = await self.async_serper_tool.search(f"news {query}", num_results)
+        if "error" in results:
+            raise _serper_error(results)
+        fetched_at = time.time()
+        return [Article.from_serper_organic(item, fetched_at) for item in results.get("organic", [])[:num_results]]
+    
+    async def asearch_and_analyze_stream(self, query: str):
+        """Async-iterator counterpart of `search_and_analyze_stream`"""
+        stream = self._asemantic_cached_stream(query, "stream", self._asearch_and_analyze_stream)
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+    
+    async def _asearch_and_analyze_stream(self, query: str, outcome: Dict[str, Any]):
+        try:
+            search_results = await self._atimed_search(query, num_results=5)
+            
+            stream = self.aanalyze_with_ai_stream(search_results, query, outcome)
+            try:
+                async for chunk in stream:
+                    yield chunk
+            finally:
+                await stream.aclose()
+            
+            yield self._sources_section(search_results)
             
         except Exception as e:
             logger.error(f"Streaming search and analysis failed: {str(e)}")
             yield f"❌ Sorry, I encountered an error while processing your request: {str(e)}\n\nPlease try again or check your configuration."
 
+
+_pipeline_executor = None
+_pipeline_executor_lock = threading.Lock()
+
+
+def _get_pipeline_executor() -> ThreadPoolExecutor:
+    """Shared pool running secondary searches alongside streamed generation"""
+    global _pipeline_executor
+    with _pipeline_executor_lock:
+        if _pipeline_executor is None:
+            _pipeline_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pipeline-search")
+        return _pipeline_executor
+
+
+def _content_chunks(response):
+    """Text deltas of a LiteLLM streaming response; closing the generator closes the response"""
+    try:
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content is not None:
+                yield chunk.choices[0].delta.content
+    finally:
+        close = getattr(response, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                logger.debug(f"Closing LLM stream failed: {e}")
+
+
+async def _acontent_chunks(response):
+    """Text deltas of an async LiteLLM streaming response; closing the generator closes the response"""
+    try:
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content is not None:
+                yield chunk.choices[0].delta.content
+    finally:
+        await _aclose_stream(response)
+
+
+async def _aclose_stream(response):
+    """Close a LiteLLM streaming response so its HTTP connection is released"""
+    for name in ("aclose", "close"):
+        close = getattr(response, name, None)
+        if close is None:
+            continue
+        try:
+            result = close()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.debug(f"Closing LLM stream failed: {e}")
+        return
+
 # Utility functions for the agent
 def get_available_models() -> List[str]:
     """Get list of available Clarifai models"""
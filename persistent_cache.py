@@ -0,0 +1,226 @@
+"""
+Persistent Search Response Store
+SQLite-backed durable cache shared by every worker process on the host
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, Any, Optional, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Store configuration (overridable via environment)
+SEARCH_CACHE_PERSIST = os.getenv('SEARCH_CACHE_PERSIST', 'true').lower() == 'true'
+# Next to the app by default, so every worker shares one cache file whatever its working directory
+SEARCH_CACHE_DB_PATH = os.getenv('SEARCH_CACHE_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                      '.cache', 'search_cache.sqlite3'))
+SEARCH_CACHE_DB_MAX_BYTES = int(os.getenv('SEARCH_CACHE_DB_MAX_BYTES', 256 * 1024 * 1024))
+SEARCH_CACHE_DB_MAX_AGE = float(os.getenv('SEARCH_CACHE_DB_MAX_AGE', 24 * 3600))
+
+# Run compaction after this many writes from one process
+COMPACT_EVERY_WRITES = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_responses (
+    endpoint    TEXT    NOT NULL,
+    query       TEXT    NOT NULL,
+    num_results INTEGER NOT NULL,
+    location    TEXT    NOT NULL,
+    response    TEXT    NOT NULL,
+    size        INTEGER NOT NULL,
+    fetched_at  REAL    NOT NULL,
+    PRIMARY KEY (endpoint, query, num_results, location)
+);
+CREATE INDEX IF NOT EXISTS idx_search_responses_fetched_at ON search_responses (fetched_at);
+"""
+
+
+class SQLiteResponseStore:
+    """Durable store of raw Serper responses keyed like the in-process cache
+
+    Uses SQLite in WAL mode with a busy timeout so several Streamlit worker
+    processes can read and write the same file concurrently. Each thread
+    gets its own connection. Storage errors are logged and treated as misses,
+    never raised to the search path.
+    """
+
+    def __init__(self, path: str = SEARCH_CACHE_DB_PATH, max_bytes: int = SEARCH_CACHE_DB_MAX_BYTES,
+                 max_age: float = SEARCH_CACHE_DB_MAX_AGE):
+        """Open (and create if needed) the store
+
+        Args:
+            path: SQLite database file
+            max_bytes: Approximate size budget enforced by compaction
+            max_age: Rows older than this many seconds are removed by compaction
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._stats = {"reads": 0, "hits": 0, "writes": 0, "errors": 0, "compacted": 0}
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def get(self, key: Tuple[str, str, int, str]) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Load a stored response
+
+        Returns:
+            Tuple of (response dict, fetched_at timestamp), or None if absent
+        """
+        self._count("reads")
+        try:
+            row = self._connection().execute(
+                "SELECT response, fetched_at FROM search_responses "
+                "WHERE endpoint = ? AND query = ? AND num_results = ? AND location = ?",
+                key
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.warning(f"⚠️ Search cache read failed: {str(e)}")
+            return None
+        if row is None:
+            return None
+        try:
+            value = json.loads(row[0])
+        except ValueError:
+            return None
+        self._count("hits")
+        return value, row[1]
+
+    def put(self, key: Tuple[str, str, int, str], serialized: str, fetched_at: float):
+        """Store a JSON-serialized response with its fetch timestamp"""
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO search_responses "
+                "(endpoint, query, num_results, location, response, size, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, serialized, len(serialized), fetched_at)
+            )
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.warning(f"⚠️ Search cache write failed: {str(e)}")
+            return
+
+        with self._lock:
+            self._stats["writes"] += 1
+            self._writes += 1
+            compact = self._writes % COMPACT_EVERY_WRITES == 0
+        if compact:
+            self.compact()
+
+    def delete(self, key: Optional[Tuple[str, str, int, str]] = None):
+        """Delete one stored response, or all of them when no key is given"""
+        try:
+            if key is None:
+                self._connection().execute("DELETE FROM search_responses")
+            else:
+                self._connection().execute(
+                    "DELETE FROM search_responses "
+                    "WHERE endpoint = ? AND query = ? AND num_results = ? AND location = ?",
+                    key
+                )
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.warning(f"⚠️ Search cache delete failed: {str(e)}")
+
+    def compact(self) -> int:
+        """Drop rows past `max_age`, then the oldest rows until under `max_bytes`
+
+        Returns:
+            Number of rows removed
+        """
+        conn = self._connection()
+        removed = 0
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute("DELETE FROM search_responses WHERE fetched_at < ?",
+                                  (time.time() - self.max_age,))
+            removed += cursor.rowcount
+
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM search_responses").fetchone()[0]
+            excess = total - self.max_bytes
+            if excess > 0:
+                doomed = []
+                for rowid, size in conn.execute("SELECT rowid, size FROM search_responses ORDER BY fetched_at"):
+                    doomed.append((rowid,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                conn.executemany("DELETE FROM search_responses WHERE rowid = ?", doomed)
+                removed += len(doomed)
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            self._count("errors")
+            logger.warning(f"⚠️ Search cache compaction failed: {str(e)}")
+            return 0
+
+        if removed:
+            self._count("compacted", removed)
+            logger.info(f"🧹 Search cache compaction removed {removed} rows")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics, including on-disk row count and size"""
+        with self._lock:
+            stats = dict(self._stats)
+        try:
+            rows, size = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM search_responses"
+            ).fetchone()
+            stats["rows"] = rows
+            stats["bytes"] = size
+        except sqlite3.Error:
+            pass
+        stats["path"] = self.path
+        return stats
+
+
+_shared_store: Optional[SQLiteResponseStore] = None
+_shared_store_failed = False
+_shared_store_lock = threading.Lock()
+
+
+def get_response_store() -> Optional[SQLiteResponseStore]:
+    """Get the process-wide persistent store, or None when persistence is disabled or unavailable"""
+    global _shared_store, _shared_store_failed
+    if not SEARCH_CACHE_PERSIST or _shared_store_failed:
+        return None
+    if _shared_store is None:
+        with _shared_store_lock:
+            if _shared_store is None and not _shared_store_failed:
+                try:
+                    _shared_store = SQLiteResponseStore()
+                    logger.info(f"✅ Persistent search cache at {SEARCH_CACHE_DB_PATH}")
+                except (sqlite3.Error, OSError) as e:
+                    _shared_store_failed = True
+                    logger.warning(f"⚠️ Persistent search cache unavailable: {str(e)}")
+    return _shared_store
@@ -0,0 +1,284 @@
+"""
+Background Query Workers
+A bounded, process-wide worker pool that runs search + LLM queries outside the
+Streamlit script thread; the UI polls each job's shared output buffer, so reruns
+neither block on nor abort a query in flight
+"""
+
+import os
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Worker pool configuration (overridable via environment)
+QUERY_WORKERS = int(os.getenv('QUERY_WORKERS', 4))                      # queries running at once (all sessions)
+QUERY_QUEUE_SIZE = int(os.getenv('QUERY_QUEUE_SIZE', 16))               # queries waiting for a worker
+QUERY_JOB_TTL = float(os.getenv('QUERY_JOB_TTL', 900))                  # seconds a finished job is kept
+QUERY_POLL_INTERVAL = float(os.getenv('QUERY_POLL_INTERVAL', 0.1))      # UI refresh interval while waiting
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class QueryPoolFull(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's work function when the job has been cancelled"""
+
+
+class QueryJob:
+    """Handle to one background query: its state, streamed output and metadata
+
+    The work function writes chunks with `emit` and may store metadata (model,
+    token counts, ...) in `info`; readers call `read` with the offset they have
+    already consumed, so any number of reruns can re-attach to the same job.
+    """
+
+    def __init__(self, query: str, session_id: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.query = query
+        self.session_id = session_id
+        self.status = QUEUED
+        self.info: Dict[str, Any] = {}
+        self.result: Optional[str] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._chunks: List[str] = []
+        self._length = 0
+        self._cancelled = False
+        self._collected = False
+        self._changed = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    @property
+    def duration(self) -> float:
+        """Seconds from the start of work to its end (or now, while running)"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def emit(self, chunk: str):
+        """Append streamed output (called from the worker)
+
+        Raises:
+            JobCancelled: If the job was cancelled, so the work stops at the next chunk
+        """
+        if self._cancelled:
+            raise JobCancelled()
+        if not chunk:
+            return
+        with self._changed:
+            self._chunks.append(chunk)
+            self._length += len(chunk)
+            self._changed.notify_all()
+
+    def read(self, offset: int = 0) -> Tuple[str, int]:
+        """Output from character `offset` on, and the offset to pass next time"""
+        with self._changed:
+            if offset >= self._length:
+                return "", self._length
+            # Collapse to one string so repeated reads don't re-join every chunk
+            text = "".join(self._chunks)
+            self._chunks = [text]
+            return text[offset:], self._length
+
+    def text(self) -> str:
+        """All output so far"""
+        return self.read(0)[0]
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until new output arrives or the job finishes; True if it has finished"""
+        with self._changed:
+            if not self.finished:
+                self._changed.wait(timeout)
+            return self.finished
+
+    def cancel(self):
+        """Ask the job to stop: queued jobs never start, running ones stop at their next chunk
+
+        Only streaming work can be stopped mid-run; a job that emits nothing (e.g.
+        a non-streaming query) runs to completion and is then marked cancelled.
+        """
+        self._cancelled = True
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def claim(self) -> bool:
+        """Mark a finished job's result as taken; True only for the first caller
+
+        Lets exactly one rerun move the answer into the conversation.
+        """
+        with self._changed:
+            if not self.finished or self._collected:
+                return False
+            self._collected = True
+            return True
+
+    def discard(self):
+        """Cancel the job and drop its result, so no later run collects it"""
+        with self._changed:
+            self._cancelled = True
+            self._collected = True
+
+    @property
+    def collected(self) -> bool:
+        return self._collected
+
+    def _finish(self, status: str, result: Optional[str] = None, error: Optional[str] = None):
+        with self._changed:
+            self.status = status
+            self.result = self.text() if result is None else result
+            self.error = error
+            self.finished_at = time.time()
+            self._changed.notify_all()
+
+
+class QueryWorkerPool:
+    """Runs query jobs on at most `max_workers` threads, with at most `max_queued` waiting
+
+    Jobs live in the pool, not in a Streamlit session, so a job keeps running
+    through reruns and its result can be collected by a later run. Finished
+    jobs are dropped `job_ttl` seconds after they end.
+    """
+
+    def __init__(self, max_workers: int = QUERY_WORKERS, max_queued: int = QUERY_QUEUE_SIZE,
+                 job_ttl: float = QUERY_JOB_TTL):
+        self.max_workers = max(1, max_workers)
+        self.max_queued = max(0, max_queued)
+        self.job_ttl = job_ttl
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="query-worker")
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, QueryJob]" = OrderedDict()
+        self._queued: deque = deque()
+        self._running = 0
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "rejected": 0}
+
+    def submit(self, work: Callable[[QueryJob], Optional[str]], query: str,
+               session_id: Optional[str] = None) -> QueryJob:
+        """Queue `work(job)` and return its handle
+
+        `work` streams output through `job.emit` and may return the final text
+        (defaults to everything emitted).
+
+        Raises:
+            QueryPoolFull: If all workers are busy and the queue is full
+            RuntimeError: If the pool has been shut down
+        """
+        job = QueryJob(query, session_id)
+        with self._lock:
+            self._prune(time.time())
+            if self._running + len(self._queued) >= self.max_workers + self.max_queued:
+                self._stats["rejected"] += 1
+                raise QueryPoolFull(f"All {self.max_workers} query workers are busy "
+                                    f"and {len(self._queued)} queries are waiting")
+            self._jobs[job.id] = job
+            self._queued.append(job)
+            self._stats["submitted"] += 1
+        try:
+            self._executor.submit(self._run, job, work)
+        except BaseException:
+            # Never scheduled: forget the job so it doesn't hold a queue slot forever
+            with self._lock:
+                self._jobs.pop(job.id, None)
+                self._queued.remove(job)
+                self._stats["submitted"] -= 1
+            raise
+        return job
+
+    def _run(self, job: QueryJob, work: Callable[[QueryJob], Optional[str]]):
+        with self._lock:
+            self._queued.remove(job)
+            self._running += 1
+        status, result, error = CANCELLED, None, None
+        try:
+            if not job.cancelled:
+                job.status = RUNNING
+                job.started_at = time.time()
+                result = work(job)
+                status = CANCELLED if job.cancelled else DONE
+        except JobCancelled:
+            pass
+        except Exception as e:
+            logger.error(f"❌ Query job {job.id[:8]} failed: {e}")
+            status, error = FAILED, str(e)
+        finally:
+            # Count before waking readers, so stats are current once a job reads as finished
+            with self._lock:
+                self._running -= 1
+                self._stats[{DONE: "completed", FAILED: "failed", CANCELLED: "cancelled"}[status]] += 1
+            job._finish(status, result, error)
+
+    def _prune(self, now: float):
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and now - job.finished_at > self.job_ttl:
+                del self._jobs[job_id]
+
+    def get(self, job_id: Optional[str]) -> Optional[QueryJob]:
+        """The job with this id, if it is still kept"""
+        with self._lock:
+            return self._jobs.get(job_id) if job_id else None
+
+    def pending_job(self, session_id: str) -> Optional[QueryJob]:
+        """The session's oldest job whose result has not been collected yet"""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.session_id == session_id and not job.collected:
+                    return job
+        return None
+
+    def queue_position(self, job: QueryJob) -> int:
+        """Jobs ahead of `job` in the wait queue (0 once it is running)"""
+        with self._lock:
+            try:
+                return list(self._queued).index(job)
+            except ValueError:
+                return 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"workers": self.max_workers, "running": self._running, "queued": len(self._queued),
+                    "queue_size": self.max_queued, "jobs": len(self._jobs), **self._stats}
+
+    def shutdown(self, wait: bool = False):
+        """Cancel queued jobs and stop the workers"""
+        with self._lock:
+            for job in self._queued:
+                job.cancel()
+        self._executor.shutdown(wait=wait)
+
+
+_shared_pool: Optional[QueryWorkerPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_query_pool() -> QueryWorkerPool:
+    """Get the process-wide query worker pool, so concurrency is bounded across all sessions"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = QueryWorkerPool()
+        return _shared_pool
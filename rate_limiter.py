@@ -0,0 +1,255 @@
+"""
+Rate Limiting, Retry and Quota Tracking
+Adaptive token bucket, exponential backoff with jitter, and API credit accounting
+"""
+
+import os
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Serper limits (overridable via environment)
+SERPER_QPS = float(os.getenv('SERPER_QPS', 5))
+SERPER_BURST = int(os.getenv('SERPER_BURST', 10))
+SERPER_MAX_QUEUE_WAIT = float(os.getenv('SERPER_MAX_QUEUE_WAIT', 10))
+SERPER_MAX_RETRIES = int(os.getenv('SERPER_MAX_RETRIES', 3))
+SERPER_BACKOFF_BASE = float(os.getenv('SERPER_BACKOFF_BASE', 0.5))
+SERPER_BACKOFF_MAX = float(os.getenv('SERPER_BACKOFF_MAX', 8))
+SERPER_QUOTA_LIMIT = int(os.getenv('SERPER_QUOTA_LIMIT', 0))  # 0 = unlimited
+SERPER_QUOTA_SHED_RATIO = float(os.getenv('SERPER_QUOTA_SHED_RATIO', 0.95))
+
+
+class AdaptiveRateLimiter:
+    """Token bucket whose refill rate backs off on throttling and recovers on success
+
+    Callers reserve a token and are told how long to wait for it, so the same
+    limiter serves threaded callers (`acquire`) and asyncio callers (`reserve`
+    followed by `asyncio.sleep`).
+    """
+
+    def __init__(self, rate: float = SERPER_QPS, burst: int = SERPER_BURST, min_rate: Optional[float] = None):
+        """Initialize the limiter
+
+        Args:
+            rate: Maximum sustained requests per second (0 or less = unlimited)
+            burst: Bucket capacity (requests allowed back-to-back)
+            min_rate: Floor the adaptive rate never drops below (default: 5% of `rate`)
+
+        Raises:
+            ValueError: If `min_rate` is negative or above `rate`
+        """
+        if min_rate is not None and (min_rate < 0 or (rate > 0 and min_rate > rate)):
+            raise ValueError(f"min_rate must be between 0 and rate ({rate}), got {min_rate}")
+        self.unlimited = rate <= 0
+        self.max_rate = rate
+        self.min_rate = min_rate or max(rate * 0.05, 0.1)
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats = {
+            "acquired": 0,
+            "rejected": 0,
+            "throttled": 0,
+            "waited_seconds": 0.0,
+        }
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """Reserve one token
+
+        Args:
+            max_wait: Give up if the token would take longer than this many seconds
+
+        Returns:
+            Seconds the caller must wait before sending, or None if rejected
+        """
+        with self._lock:
+            if self.unlimited:
+                self._stats["acquired"] += 1
+                return 0.0
+            self._refill(time.monotonic())
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                self._stats["rejected"] += 1
+                return None
+            self._tokens -= 1
+            self._stats["acquired"] += 1
+            self._stats["waited_seconds"] += wait
+            return wait
+
+    def acquire(self, max_wait: Optional[float] = None) -> bool:
+        """Block until a token is available
+
+        Returns:
+            True once the caller may send, False if the wait would exceed `max_wait`
+        """
+        wait = self.reserve(max_wait)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def on_throttle(self):
+        """Halve the sending rate after the provider pushed back (429)"""
+        if self.unlimited:
+            return
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * 0.5)
+            self._stats["throttled"] += 1
+
+    def on_success(self):
+        """Creep the sending rate back towards the configured maximum"""
+        if self.unlimited or self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter statistics"""
+        with self._lock:
+            self._refill(time.monotonic())
+            stats = dict(self._stats)
+            stats["rate"] = self.rate
+            stats["max_rate"] = self.max_rate
+            stats["tokens"] = self._tokens
+        return stats
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for throttled and failed requests"""
+
+    RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, max_retries: int = SERPER_MAX_RETRIES, base_delay: float = SERPER_BACKOFF_BASE,
+                 max_delay: float = SERPER_BACKOFF_MAX):
+        """Initialize the policy
+
+        Args:
+            max_retries: Retries after the first attempt
+            base_delay: Backoff for the first retry in seconds (doubles each attempt)
+            max_delay: Upper bound on any single delay in seconds
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, status_code: Optional[int], attempt: int) -> bool:
+        """Decide whether to retry after `attempt` (0-based) ended with `status_code`
+
+        A `status_code` of None means the request failed to connect, so it never
+        reached the provider. Callers don't retry read timeouts: the provider may
+        be browning out, and the circuit breaker should hear about it promptly.
+        """
+        if attempt >= self.max_retries:
+            return False
+        return status_code is None or status_code in self.RETRY_STATUS_CODES
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before retry number `attempt + 1`
+
+        A `Retry-After` header (seconds or HTTP date) takes precedence over backoff.
+        """
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header into seconds, or None if absent or malformed"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class QuotaTracker:
+    """Running count of billable API credits against a plan limit
+
+    The count is per process and kept in memory: it starts at zero on every
+    restart (or `reset`), and each worker process counts only its own requests,
+    so set `limit` to this process's share of the plan.
+    """
+
+    def __init__(self, limit: int = SERPER_QUOTA_LIMIT, shed_ratio: float = SERPER_QUOTA_SHED_RATIO):
+        """Initialize the tracker
+
+        Args:
+            limit: Credits available in the plan (0 = unlimited)
+            shed_ratio: Fraction of the limit after which `should_shed` reports True
+        """
+        self.limit = limit
+        self.shed_ratio = shed_ratio
+        self.used = 0
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def try_consume(self, credits: int = 1) -> bool:
+        """Record `credits` about to be spent, refusing if it would exceed the limit"""
+        with self._lock:
+            if self.limit and self.used + credits > self.limit:
+                return False
+            self.used += credits
+            return True
+
+    def refund(self, credits: int = 1):
+        """Give back credits for a request that was never billed (e.g. connection failure)"""
+        with self._lock:
+            self.used = max(0, self.used - credits)
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """Credits left, or None when unlimited"""
+        return max(self.limit - self.used, 0) if self.limit else None
+
+    def should_shed(self) -> bool:
+        """True once usage crosses the shedding threshold, so callers can queue or degrade"""
+        return bool(self.limit) and self.used >= self.limit * self.shed_ratio
+
+    def reset(self):
+        """Start a new billing period"""
+        with self._lock:
+            self.used = 0
+            self.started_at = time.time()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get quota usage statistics"""
+        return {
+            "used": self.used,
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "should_shed": self.should_shed(),
+            "since": self.started_at,
+        }
+
+
+_serper_limiter = AdaptiveRateLimiter()
+_serper_quota = QuotaTracker()
+
+
+def get_serper_rate_limiter() -> AdaptiveRateLimiter:
+    """Get the process-wide Serper rate limiter"""
+    return _serper_limiter
+
+
+def get_serper_quota() -> QuotaTracker:
+    """Get the process-wide Serper quota tracker"""
+    return _serper_quota
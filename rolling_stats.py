@@ -0,0 +1,287 @@
+"""
+Rolling LLM Statistics
+Constant-time aggregates (count, sum, mean, p50/p95/p99) of response metrics
+per model, per session and process-wide, over all time and recent time windows
+"""
+
+import os
+import math
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Statistics configuration (overridable via environment)
+STATS_SKETCH_ACCURACY = float(os.getenv('STATS_SKETCH_ACCURACY', 0.01))    # relative error of percentiles
+STATS_WINDOW_SLICE = float(os.getenv('STATS_WINDOW_SLICE', 60))            # seconds per time slice
+STATS_WINDOW_SLICES = int(os.getenv('STATS_WINDOW_SLICES', 60))            # slices kept (default: last hour)
+STATS_MAX_SESSIONS = int(os.getenv('STATS_MAX_SESSIONS', 1000))            # per-session aggregates kept
+
+# Metrics
+DURATION = "duration"
+TTFT = "ttft"
+TOKENS_PER_SECOND = "tokens_per_second"
+SEARCH_LATENCY = "search_latency"
+TOKENS = "total_tokens"
+METRICS = (DURATION, TTFT, TOKENS_PER_SECOND, SEARCH_LATENCY, TOKENS)
+
+# Scopes
+GLOBAL = "global"
+MODEL = "model"
+SESSION = "session"
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    """Mergeable streaming quantile sketch with relative accuracy (DDSketch-style)
+
+    Positive values fall into logarithmic buckets, so any reported quantile is
+    within `relative_accuracy` of a true sample value. Adding a value is O(1);
+    memory grows with the log of the value range (a few hundred buckets cover
+    milliseconds to hours at 1%), not with the number of samples.
+    """
+
+    __slots__ = ("relative_accuracy", "_log_gamma", "_gamma", "_buckets", "_zeros", "count")
+
+    def __init__(self, relative_accuracy: float = STATS_SKETCH_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self._zeros = 0
+        self.count = 0
+
+    def add(self, value: float):
+        self.count += 1
+        if value <= 0:
+            self._zeros += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[key] = self._buckets.get(key, 0) + 1
+
+    def merge(self, other: "QuantileSketch"):
+        """Fold another sketch with the same accuracy into this one"""
+        self.count += other.count
+        self._zeros += other._zeros
+        for key, count in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + count
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        """Values at the given quantiles (0-1), in one pass over the buckets"""
+        qs = list(qs)
+        if not self.count:
+            return [None] * len(qs)
+        results: List[Optional[float]] = [None] * len(qs)
+        buckets = sorted(self._buckets.items())
+        position = 0
+        seen = self._zeros
+        for rank, i in sorted((min(1.0, max(0.0, q)) * (self.count - 1), i) for i, q in enumerate(qs)):
+            if rank < self._zeros:
+                results[i] = 0.0
+                continue
+            while position < len(buckets) - 1 and seen + buckets[position][1] <= rank:
+                seen += buckets[position][1]
+                position += 1
+            results[i] = 2 * self._gamma ** buckets[position][0] / (self._gamma + 1)
+        return results
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[0]
+
+
+class RunningSummary:
+    """Count, sum, min, max and a quantile sketch of one metric"""
+
+    __slots__ = ("count", "total", "minimum", "maximum", "sketch")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.sketch = QuantileSketch()
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self.sketch.add(value)
+
+    def merge(self, other: "RunningSummary"):
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.sketch.merge(other.sketch)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """count, sum, mean, min, max, p50, p95 and p99 (None when empty)"""
+        p50, p95, p99 = self.sketch.quantiles(PERCENTILES)
+        empty = self.count == 0
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": None if empty else self.total / self.count,
+            "min": None if empty else self.minimum,
+            "max": None if empty else self.maximum,
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+        }
+
+
+class WindowedSummary:
+    """Summaries of the last `slices` time slices, merged on demand for a recent window
+
+    Adding a value is O(1); a slice that has aged out is reset when its ring
+    position is reused.
+    """
+
+    def __init__(self, slice_seconds: float = STATS_WINDOW_SLICE, slices: int = STATS_WINDOW_SLICES):
+        self.slice_seconds = slice_seconds
+        self.slices = max(1, slices)
+        self._ring: List[Tuple[int, Optional[RunningSummary]]] = [(-1, None)] * self.slices
+
+    def add(self, value: float, now: float):
+        index = int(now // self.slice_seconds)
+        position = index % self.slices
+        slot_index, summary = self._ring[position]
+        if slot_index != index or summary is None:
+            summary = RunningSummary()
+            self._ring[position] = (index, summary)
+        summary.add(value)
+
+    def summary(self, window: float, now: float) -> RunningSummary:
+        """Merged summary of the slices overlapping the last `window` seconds"""
+        current = int(now // self.slice_seconds)
+        oldest = current - min(self.slices, max(1, math.ceil(window / self.slice_seconds))) + 1
+        merged = RunningSummary()
+        for slot_index, summary in self._ring:
+            if summary is not None and oldest <= slot_index <= current:
+                merged.merge(summary)
+        return merged
+
+
+class _Series:
+    """All-time and windowed aggregates of one metric in one scope"""
+
+    __slots__ = ("all_time", "recent")
+
+    def __init__(self):
+        self.all_time = RunningSummary()
+        self.recent = WindowedSummary()
+
+    def add(self, value: float, now: float):
+        self.all_time.add(value)
+        self.recent.add(value, now)
+
+
+class StatsEngine:
+    """Rolling aggregates of LLM response metrics, process-wide, per model and per session
+
+    `record` updates every scope in constant time; readers get snapshots
+    without scanning past responses. Per-session aggregates are kept for the
+    `max_sessions` most recently active sessions.
+    """
+
+    def __init__(self, max_sessions: int = STATS_MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._scopes: Dict[Tuple[str, str], Dict[str, _Series]] = {}
+        self._sessions: "OrderedDict[str, None]" = OrderedDict()
+
+    def record(self, session_id: Optional[str] = None, model: Optional[str] = None,
+               metrics: Optional[Dict[str, Optional[float]]] = None, now: Optional[float] = None,
+               session_only: bool = False):
+        """Add one response's metrics
+
+        Args:
+            session_id: Session that received the response
+            model: Model that produced it
+            metrics: Values keyed by metric name (DURATION, TTFT, ...); None values are skipped
+            now: Time of the response (defaults to now)
+            session_only: Only update the session scope (used to rebuild a restored session)
+        """
+        now = time.time() if now is None else now
+        values = [(name, float(value)) for name, value in (metrics or {}).items()
+                  if name in METRICS and value is not None]
+        scopes = []
+        if session_id is not None:
+            scopes.append((SESSION, session_id))
+        if not session_only:
+            scopes.append((GLOBAL, ""))
+            if model:
+                scopes.append((MODEL, model))
+        with self._lock:
+            if session_id is not None:
+                self._touch_session(session_id)
+            for scope in scopes:
+                series = self._scopes.get(scope)
+                if series is None:
+                    series = self._scopes[scope] = {}
+                for name, value in values:
+                    metric = series.get(name)
+                    if metric is None:
+                        metric = series[name] = _Series()
+                    metric.add(value, now)
+
+    def _touch_session(self, session_id: str):
+        self._sessions[session_id] = None
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            evicted, _ = self._sessions.popitem(last=False)
+            self._scopes.pop((SESSION, evicted), None)
+
+    def has_session(self, session_id: str) -> bool:
+        with self._lock:
+            return (SESSION, session_id) in self._scopes
+
+    def reset_session(self, session_id: str):
+        """Forget one session's aggregates (process-wide and model totals are kept)"""
+        with self._lock:
+            self._scopes.pop((SESSION, session_id), None)
+            self._sessions.pop(session_id, None)
+
+    def summary(self, scope: str = GLOBAL, key: str = "", window: Optional[float] = None,
+                now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Snapshot of every metric in one scope
+
+        Args:
+            scope: GLOBAL, MODEL or SESSION
+            key: Model name or session id (ignored for GLOBAL)
+            window: Only the last `window` seconds (up to the slice ring span); None means all time
+            now: Reference time for the window (defaults to now)
+
+        Returns:
+            Metric name -> {count, sum, mean, min, max, p50, p95, p99}
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            series = self._scopes.get((scope, "" if scope == GLOBAL else key), {})
+            summaries = {name: metric.all_time if window is None else metric.recent.summary(window, now)
+                         for name, metric in series.items()}
+            return {name: summary.snapshot() for name, summary in summaries.items()}
+
+    def models(self) -> List[str]:
+        """Models with recorded responses"""
+        with self._lock:
+            return sorted(key for scope, key in self._scopes if scope == MODEL)
+
+
+_shared_engine: Optional[StatsEngine] = None
+_shared_engine_lock = threading.Lock()
+
+
+def get_stats_engine() -> StatsEngine:
+    """Get the process-wide statistics engine, so totals cover every session"""
+    global _shared_engine
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            _shared_engine = StatsEngine()
+        return _shared_engine
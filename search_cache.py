@@ -0,0 +1,352 @@
+"""
+In-process Search Result Cache
+TTL + LRU cache with stale-while-revalidate refresh for Serper search and news queries
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Awaitable, Callable, Optional, Tuple
+from dotenv import load_dotenv
+from persistent_cache import SQLiteResponseStore, get_response_store
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration (overridable via environment)
+SEARCH_CACHE_ENABLED = os.getenv('SEARCH_CACHE_ENABLED', 'true').lower() == 'true'
+SEARCH_CACHE_TTLS = {
+    "search": float(os.getenv('SEARCH_CACHE_TTL_SEARCH', 600)),
+    "news": float(os.getenv('SEARCH_CACHE_TTL_NEWS', 180)),
+}
+SEARCH_CACHE_STALE_SECONDS = float(os.getenv('SEARCH_CACHE_STALE_SECONDS', 120))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', 1000))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv('SEARCH_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+SEARCH_CACHE_NEGATIVE_TTL = float(os.getenv('SEARCH_CACHE_NEGATIVE_TTL', 30))  # seconds a store miss isn't re-queried
+
+CacheKey = Tuple[str, str, int, str]
+
+
+def make_cache_key(endpoint: str, query: str, num_results: int, location: Optional[str] = None) -> CacheKey:
+    """Build a normalized cache key so trivially different queries share an entry
+
+    Args:
+        endpoint: Serper endpoint name ("search" or "news")
+        query: Raw query string
+        num_results: Number of results requested
+        location: Geographic location code (optional)
+
+    Returns:
+        Tuple of (endpoint, normalized query, num_results, normalized location)
+    """
+    normalized_query = " ".join(query.lower().split())
+    normalized_location = (location or "").strip().lower()
+    return (endpoint, normalized_query, int(num_results), normalized_location)
+
+
+class _CacheEntry:
+    __slots__ = ("value", "size", "fetched_at", "expires_at")
+
+    def __init__(self, value: Dict[str, Any], size: int, fetched_at: float, ttl: float):
+        self.value = value
+        self.size = size
+        self.fetched_at = fetched_at
+        self.expires_at = fetched_at + ttl
+
+
+class SearchCache:
+    """Thread-safe TTL + LRU cache bounded by entry count and approximate byte size
+
+    Entries past their TTL but still inside the stale window are served
+    immediately while a single background refresh fetches a fresh copy.
+    Cached values are shared between callers and must not be mutated.
+
+    With a persistent `store`, every stored response is also written to disk
+    and memory misses are filled from it, so results survive restarts.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None,
+                 stale_seconds: float = SEARCH_CACHE_STALE_SECONDS,
+                 max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+                 max_bytes: int = SEARCH_CACHE_MAX_BYTES,
+                 store: Optional[SQLiteResponseStore] = None,
+                 negative_ttl: float = SEARCH_CACHE_NEGATIVE_TTL):
+        """Initialize the cache
+
+        Args:
+            ttls: Seconds each endpoint's results stay fresh, keyed by endpoint name
+            stale_seconds: Extra seconds an expired entry may be served while refreshing
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum approximate size of all cached responses
+            store: Optional persistent second-tier store
+            negative_ttl: Seconds a key the store had no usable copy of is not looked up there again
+        """
+        self.ttls = dict(SEARCH_CACHE_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.store = store
+        self.negative_ttl = negative_ttl
+
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._refreshing = set()
+        self._refresh_tasks = set()
+        # Keys recently missing from the store, so repeated misses don't each query SQLite
+        self._store_misses: "OrderedDict[CacheKey, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "disk_loads": 0,
+            "disk_misses": 0,
+        }
+
+    def ttl_for(self, endpoint: str) -> float:
+        """Get the freshness TTL for an endpoint"""
+        return self.ttls.get(endpoint, self.ttls.get("search", 600))
+
+    def get(self, key: CacheKey, allow_stale: bool = False, record_stats: bool = False) -> Optional[Dict[str, Any]]:
+        """Look up a cached response without fetching
+
+        Args:
+            key: Cache key from `make_cache_key`
+            allow_stale: Also return entries inside the stale window
+            record_stats: Count the lookup in the hit/miss statistics
+
+        Returns:
+            Cached response dict, or None if absent or expired
+        """
+        self._load_from_store(key)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now < entry.expires_at:
+                    self._entries.move_to_end(key)
+                    if record_stats:
+                        self._stats["hits"] += 1
+                    return entry.value
+                if allow_stale and now < entry.expires_at + self.stale_seconds:
+                    self._entries.move_to_end(key)
+                    if record_stats:
+                        self._stats["stale_hits"] += 1
+                    return entry.value
+            if record_stats:
+                self._stats["misses"] += 1
+            return None
+
+    def put(self, key: CacheKey, value: Dict[str, Any], fetched_at: Optional[float] = None,
+            persist: bool = True):
+        """Store a response, evicting least recently used entries to stay in budget
+
+        Args:
+            key: Cache key from `make_cache_key`
+            value: Response dict
+            fetched_at: When the response was fetched (default: now)
+            persist: Also write the response to the persistent store, if any
+        """
+        try:
+            serialized = json.dumps(value, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return
+        fetched_at = fetched_at or time.time()
+        if persist and self.store is not None:
+            self.store.put(key, serialized, fetched_at)
+
+        size = len(serialized)
+        if size > self.max_bytes:
+            return
+
+        entry = _CacheEntry(value, size, fetched_at, self.ttl_for(key[0]))
+        with self._lock:
+            self._store_misses.pop(key, None)
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._stats["evictions"] += 1
+
+    def _load_from_store(self, key: CacheKey):
+        """Fill a memory miss from the persistent store, if it holds a usable copy"""
+        if self.store is None:
+            return
+        now = time.time()
+        with self._lock:
+            if key in self._entries:
+                return
+            checked_at = self._store_misses.get(key)
+            if checked_at is not None and now - checked_at < self.negative_ttl:
+                return
+        loaded = self.store.get(key)
+        if loaded is None or now >= loaded[1] + self.ttl_for(key[0]) + self.stale_seconds:
+            with self._lock:
+                self._store_misses[key] = now
+                self._store_misses.move_to_end(key)
+                while len(self._store_misses) > self.max_entries:
+                    self._store_misses.popitem(last=False)
+                self._stats["disk_misses"] += 1
+            return
+        value, fetched_at = loaded
+        self.put(key, value, fetched_at, persist=False)
+        with self._lock:
+            self._stats["disk_loads"] += 1
+
+    def _lookup(self, key: CacheKey) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Classify a lookup as hit, stale hit or miss and update the counters
+
+        Returns:
+            Tuple of (cached value or None on a miss, whether the caller should refresh it)
+        """
+        self._load_from_store(key)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.expires_at:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry.value, False
+
+            if entry is not None and now < entry.expires_at + self.stale_seconds:
+                self._entries.move_to_end(key)
+                self._stats["stale_hits"] += 1
+                start_refresh = key not in self._refreshing
+                if start_refresh:
+                    self._refreshing.add(key)
+                return entry.value, start_refresh
+
+            self._stats["misses"] += 1
+            return None, False
+
+    def get_or_fetch(self, key: CacheKey, fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return a cached response, fetching (and caching) it on a miss
+
+        Error responses (dicts containing "error") are returned but never cached.
+
+        Args:
+            key: Cache key from `make_cache_key`
+            fetch: Zero-argument callable performing the upstream request
+
+        Returns:
+            Response dict
+        """
+        cached, start_refresh = self._lookup(key)
+        if cached is not None:
+            if start_refresh:
+                threading.Thread(target=self._refresh, args=(key, fetch), daemon=True).start()
+            return cached
+
+        value = fetch()
+        if "error" not in value:
+            self.put(key, value)
+        return value
+
+    async def aget_or_fetch(self, key: CacheKey, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Async counterpart of `get_or_fetch` taking a coroutine function as `fetch`
+
+        Stale entries are refreshed by a task on the running event loop; the
+        cache holds a reference to it until it finishes, so it isn't collected mid-refresh.
+        """
+        cached, start_refresh = self._lookup(key)
+        if cached is not None:
+            if start_refresh:
+                task = asyncio.ensure_future(self._arefresh(key, fetch))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            return cached
+
+        value = await fetch()
+        if "error" not in value:
+            self.put(key, value)
+        return value
+
+    def _refresh(self, key: CacheKey, fetch: Callable[[], Dict[str, Any]]):
+        """Fetch a fresh copy of a stale entry in the background"""
+        try:
+            value = fetch()
+            if "error" in value:
+                raise RuntimeError(value["error"])
+            self.put(key, value)
+            with self._lock:
+                self._stats["refreshes"] += 1
+        except Exception as e:
+            logger.warning(f"⚠️ Background cache refresh failed for {key[1]!r}: {str(e)}")
+            with self._lock:
+                self._stats["refresh_failures"] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    async def _arefresh(self, key: CacheKey, fetch: Callable[[], Awaitable[Dict[str, Any]]]):
+        """Fetch a fresh copy of a stale entry on the event loop"""
+        try:
+            value = await fetch()
+            if "error" in value:
+                raise RuntimeError(value["error"])
+            self.put(key, value)
+            with self._lock:
+                self._stats["refreshes"] += 1
+        except Exception as e:
+            logger.warning(f"⚠️ Background cache refresh failed for {key[1]!r}: {str(e)}")
+            with self._lock:
+                self._stats["refresh_failures"] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def invalidate(self, key: Optional[CacheKey] = None):
+        """Drop one entry, or the whole cache when no key is given"""
+        if self.store is not None:
+            self.store.delete(key)
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction statistics"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["hits"] + stats["stale_hits"]) / lookups if lookups else 0.0
+        if self.store is not None:
+            stats["store"] = self.store.get_stats()
+        return stats
+
+
+_shared_cache: Optional[SearchCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Get the process-wide search cache, or None when caching is disabled"""
+    global _shared_cache
+    if not SEARCH_CACHE_ENABLED:
+        return None
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = SearchCache(store=get_response_store())
+    return _shared_cache
@@ -0,0 +1,231 @@
+"""
+Offline Semantic Query Cache
+Answers paraphrased queries from earlier analyses using CPU-only hashed query embeddings
+"""
+
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from dotenv import load_dotenv
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration (overridable via environment)
+SEMANTIC_CACHE_ENABLED = os.getenv('SEMANTIC_CACHE_ENABLED', 'true').lower() == 'true'
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', 0.85))
+SEMANTIC_CACHE_TTL = float(os.getenv('SEMANTIC_CACHE_TTL', 600))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv('SEMANTIC_CACHE_MAX_ENTRIES', 512))
+SEMANTIC_CACHE_DIM = int(os.getenv('SEMANTIC_CACHE_DIM', 2048))
+
+# Filler words that don't change which news a query is about
+QUERY_STOPWORDS = frozenset("""
+a an and any are about at be by can could do does for from give has have how i in is it latest me
+most new news newest of on or please recent recently show tell that the there this to today top update
+updates what whats what's which with you current currently happening headlines going
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-features query embedding (no model, no network, no GPU)
+
+    Content words and their character trigrams are hashed into a fixed number
+    of signed buckets and L2-normalized, so cosine similarity tracks word and
+    sub-word overlap between queries.
+    """
+
+    def __init__(self, dim: int = SEMANTIC_CACHE_DIM, trigram_weight: float = 0.5):
+        """Initialize the embedder
+
+        Args:
+            dim: Number of hash buckets (embedding width)
+            trigram_weight: Weight of character trigram features relative to words
+        """
+        self.dim = dim
+        self.trigram_weight = trigram_weight
+
+    def features(self, text: str) -> List[Tuple[str, float]]:
+        """Extract weighted features from a query"""
+        words = [word for word in _TOKEN.findall(text.lower()) if word not in QUERY_STOPWORDS]
+        features = [("w:" + word, 1.0) for word in words]
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(("c:" + padded[i:i + 3], self.trigram_weight) for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, text: str) -> "np.ndarray":
+        """Embed a query as a unit-length float32 vector (all zeros if it has no content words)"""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self.features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign * weight
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class SemanticCache:
+    """Fixed-capacity cache of answers looked up by query similarity
+
+    Embeddings live in one preallocated NumPy matrix, so a lookup is a single
+    matrix-vector product. Entries expire after `ttl`; when full, an expired
+    slot is reused first, otherwise the least recently used one is evicted.
+    Entries are partitioned by `namespace` (e.g. the model) and never match
+    across namespaces.
+    """
+
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, ttl: float = SEMANTIC_CACHE_TTL,
+                 max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES, embedder: Optional[HashingEmbedder] = None):
+        """Initialize the cache
+
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            ttl: Seconds an answer stays fresh
+            max_entries: Maximum number of cached answers
+            embedder: Query embedder (default: HashingEmbedder)
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for SemanticCache. Install with: pip install numpy")
+
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embedder = embedder or HashingEmbedder()
+
+        self._matrix = np.zeros((max_entries, self.embedder.dim), dtype=np.float32)
+        self._created_at = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._occupied = np.zeros(max_entries, dtype=bool)
+        self._namespaces: List[Optional[str]] = [None] * max_entries
+        self._queries: List[Optional[str]] = [None] * max_entries
+        self._values: List[Any] = [None] * max_entries
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def _candidates(self, namespace: str, now: float) -> "np.ndarray":
+        """Mask of live, fresh slots in a namespace"""
+        fresh = self._occupied & (now - self._created_at < self.ttl)
+        in_namespace = np.fromiter((ns == namespace for ns in self._namespaces), dtype=bool,
+                                   count=self.max_entries)
+        return fresh & in_namespace
+
+    def lookup(self, query: str, namespace: str = "") -> Optional[Dict[str, Any]]:
+        """Find a fresh cached answer for a similar query
+
+        Args:
+            query: User query
+            namespace: Partition to search (e.g. model name)
+
+        Returns:
+            Dict with "value", "query" (the cached query) and "similarity", or None
+        """
+        vector = self.embedder.embed(query)
+        if not vector.any():
+            return None
+        now = time.time()
+        with self._lock:
+            candidates = self._candidates(namespace, now)
+            if not candidates.any():
+                self._stats["misses"] += 1
+                return None
+            similarities = self._matrix @ vector
+            similarities[~candidates] = -1.0
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.threshold:
+                self._stats["misses"] += 1
+                return None
+            self._last_used[best] = now
+            self._stats["hits"] += 1
+            return {"value": self._values[best], "query": self._queries[best], "similarity": similarity}
+
+    def put(self, query: str, value: Any, namespace: str = ""):
+        """Cache an answer for a query
+
+        A near-identical query already cached in the namespace is overwritten.
+        """
+        vector = self.embedder.embed(query)
+        if not vector.any():
+            return
+        now = time.time()
+        with self._lock:
+            slot = self._find_slot(vector, namespace, now)
+            self._matrix[slot] = vector
+            self._created_at[slot] = now
+            self._last_used[slot] = now
+            self._occupied[slot] = True
+            self._namespaces[slot] = namespace
+            self._queries[slot] = query
+            self._values[slot] = value
+
+    def _find_slot(self, vector: "np.ndarray", namespace: str, now: float) -> int:
+        """Pick the slot for a new entry: same query, free, expired, then least recently used"""
+        same_namespace = self._occupied & np.fromiter((ns == namespace for ns in self._namespaces),
+                                                      dtype=bool, count=self.max_entries)
+        if same_namespace.any():
+            similarities = np.where(same_namespace, self._matrix @ vector, -1.0)
+            best = int(np.argmax(similarities))
+            if similarities[best] >= 0.999:
+                return best
+
+        free = np.flatnonzero(~self._occupied)
+        if free.size:
+            return int(free[0])
+
+        expired = np.flatnonzero(now - self._created_at >= self.ttl)
+        if expired.size:
+            self._stats["expired"] += 1
+            return int(expired[0])
+
+        self._stats["evictions"] += 1
+        return int(np.argmin(self._last_used))
+
+    def invalidate(self):
+        """Drop every cached answer"""
+        with self._lock:
+            self._occupied[:] = False
+            self._values = [None] * self.max_entries
+            self._queries = [None] * self.max_entries
+            self._namespaces = [None] * self.max_entries
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction statistics"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = int(self._occupied.sum())
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_shared_cache: Optional[SemanticCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """Get the process-wide semantic cache, or None when disabled or NumPy is missing"""
+    global _shared_cache
+    if not SEMANTIC_CACHE_ENABLED or not NUMPY_AVAILABLE:
+        return None
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = SemanticCache()
+    return _shared_cache
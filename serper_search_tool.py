@@ -6,26 +6,70 @@ Implements Google search functionality using Serper API
 import requests
 import json
 import os
+import time
+import logging
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
+from http_pool import PooledSession, get_shared_session
+from search_cache import SearchCache, CacheKey, make_cache_key, get_search_cache
+from single_flight import get_single_flight
+from rate_limiter import (
+    RetryPolicy, SERPER_MAX_QUEUE_WAIT, get_serper_rate_limiter, get_serper_quota
+)
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+SERPER_SEARCH_URL = "https://google.serper.dev/search"
+SERPER_NEWS_URL = "https://google.serper.dev/news"
+
+# Endpoint name -> (URL, request error prefix, parse error prefix)
+SERPER_ENDPOINTS = {
+    "search": (SERPER_SEARCH_URL, "Search request failed", "Failed to parse response"),
+    "news": (SERPER_NEWS_URL, "News search request failed", "Failed to parse news response"),
+}
+
+# Maximum number of query objects Serper accepts in one batched POST
+SERPER_BATCH_LIMIT = int(os.getenv('SERPER_BATCH_LIMIT', 100))
+
+_USE_SHARED_CACHE = object()
+
+# Transport errors raised before the request reached Serper: safe to retry and not billed.
+# Read timeouts are neither (ConnectTimeout is a ConnectionError, ReadTimeout is not)
+_CONNECT_ERRORS = (requests.exceptions.ConnectionError,)
+
+class SerperRateLimited(requests.exceptions.RequestException):
+    """Raised when a request would wait longer than SERPER_MAX_QUEUE_WAIT for a rate limit token"""
+
+class SerperQuotaExceeded(requests.exceptions.RequestException):
+    """Raised instead of sending a request once the plan quota is used up"""
+
 class SerperSearchTool:
     """Google Search tool using Serper API"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, session: Optional[PooledSession] = None,
+                 cache: Optional[SearchCache] = _USE_SHARED_CACHE):
         """Initialize the Serper search tool
         
         Args:
             api_key: Serper API key. If None, will try to get from environment
+            session: Pooled HTTP session. If None, the process-wide "serper" session is used
+            cache: Result cache. Defaults to the process-wide cache; pass None to disable caching
         """
         self.api_key = api_key or os.getenv('SERPER_API_KEY')
         if not self.api_key:
             raise ValueError("Serper API key is required. Set SERPER_API_KEY environment variable.")
         
-        self.base_url = "https://google.serper.dev/search"
+        self.base_url = SERPER_SEARCH_URL
+        self.news_url = SERPER_NEWS_URL
+        self.session = session or get_shared_session("serper")
+        self.cache = get_search_cache() if cache is _USE_SHARED_CACHE else cache
+        self.single_flight = get_single_flight()
+        self.rate_limiter = get_serper_rate_limiter()
+        self.quota = get_serper_quota()
+        self.retry_policy = RetryPolicy()
         self.headers = {
             'X-API-KEY': self.api_key,
             'Content-Type': 'application/json'
@@ -42,71 +86,225 @@ class SerperSearchTool:
         Returns:
             Dictionary containing search results
         """
-        try:
-            payload = {
-                "q": query,
-                "num": num_results
-            }
+        payload = {
+            "q": query,
+            "num": num_results
+        }
+        
+        if location:
+            payload["gl"] = location
+        
+        key = make_cache_key("search", query, num_results, location)
+        return self._cached_fetch(key, "search", payload)
+    
+    def search_news(self, query: str, num_results: int = 10) -> Dict[str, Any]:
+        """Search for news articles specifically
+        
+        Args:
+            query: News search query
+            num_results: Number of news results to return
+            
+        Returns:
+            Dictionary containing news search results
+        """
+        payload = {
+            "q": query,
+            "num": num_results,
+            "type": "news"
+        }
+        
+        key = make_cache_key("news", query, num_results)
+        return self._cached_fetch(key, "news", payload)
+    
+    def search_batch(self, queries: List[str], num_results: int = 10, location: str = None) -> List[Dict[str, Any]]:
+        """Perform many Google searches using batched Serper requests
+        
+        Args:
+            queries: Search query strings
+            num_results: Number of results to return per query
+            location: Geographic location for all searches (optional)
             
+        Returns:
+            One result dict per query, in the same order as `queries`
+        """
+        payloads = []
+        keys = []
+        for query in queries:
+            payload = {"q": query, "num": num_results}
             if location:
                 payload["gl"] = location
+            payloads.append(payload)
+            keys.append(make_cache_key("search", query, num_results, location))
+        return self._cached_fetch_batch(keys, "search", payloads)
+    
+    def search_news_batch(self, queries: List[str], num_results: int = 10) -> List[Dict[str, Any]]:
+        """Search for news articles for many queries using batched Serper requests
+        
+        Args:
+            queries: News search queries
+            num_results: Number of news results to return per query
             
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                data=json.dumps(payload),
-                timeout=30
-            )
+        Returns:
+            One news result dict per query, in the same order as `queries`
+        """
+        payloads = [{"q": query, "num": num_results, "type": "news"} for query in queries]
+        keys = [make_cache_key("news", query, num_results) for query in queries]
+        return self._cached_fetch_batch(keys, "news", payloads)
+    
+    def _cached_fetch_batch(self, keys: List[CacheKey], endpoint: str,
+                            payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Serve cached queries directly and send only the misses upstream, deduplicated"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(payloads)
+        pending: Dict[CacheKey, List[int]] = {}
+        for i, key in enumerate(keys):
+            cached = self.cache.get(key, record_stats=True) if self.cache else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(key, []).append(i)
+        
+        if pending:
+            pending_keys = list(pending)
+            fetched = self._fetch_batch(endpoint, [payloads[pending[key][0]] for key in pending_keys])
+            for key, value in zip(pending_keys, fetched):
+                if self.cache and "error" not in value:
+                    self.cache.put(key, value)
+                for i in pending[key]:
+                    results[i] = value
+        
+        return results
+    
+    def _fetch_batch(self, endpoint: str, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """POST query payloads to a Serper endpoint as JSON arrays
+        
+        Payloads are split into chunks of at most SERPER_BATCH_LIMIT queries;
+        each response array is demultiplexed back to one dict per payload.
+        
+        Args:
+            endpoint: Endpoint name ("search" or "news")
+            payloads: JSON request bodies, one per query
             
-            response.raise_for_status()
-            return response.json()
+        Returns:
+            One parsed response (or error dict) per payload, in order
+        """
+        url, request_error, parse_error = SERPER_ENDPOINTS[endpoint]
+        results = []
+        for start in range(0, len(payloads), SERPER_BATCH_LIMIT):
+            chunk = payloads[start:start + SERPER_BATCH_LIMIT]
+            try:
+                response = self._post_with_retry(url, chunk, credits=len(chunk))
+                
+                response.raise_for_status()
+                chunk_results = response.json()
+                if not isinstance(chunk_results, list) or len(chunk_results) != len(chunk):
+                    raise ValueError(f"expected {len(chunk)} results, got "
+                                     f"{len(chunk_results) if isinstance(chunk_results, list) else type(chunk_results).__name__}")
+                results.extend(chunk_results)
+                
+            except (SerperRateLimited, SerperQuotaExceeded) as e:
+                results.extend({"error": f"{request_error}: {str(e)}", "success": False, "refused": True}
+                               for _ in chunk)
+            except requests.exceptions.RequestException as e:
+                results.extend({"error": f"{request_error}: {str(e)}", "success": False} for _ in chunk)
+            except ValueError as e:
+                results.extend({"error": f"{parse_error}: {str(e)}", "success": False} for _ in chunk)
+        
+        return results
+    
+    def _cached_fetch(self, key: CacheKey, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Serve a request from the result cache, fetching from Serper on a miss
+        
+        Concurrent misses for the same key are coalesced into one upstream call.
+        """
+        def fetch():
+            return self.single_flight.do(key, lambda: self._fetch(endpoint, payload))
+        
+        if self.cache is None:
+            return fetch()
+        return self.cache.get_or_fetch(key, fetch)
+    
+    def _post_with_retry(self, url: str, body: Any, credits: int = 1) -> requests.Response:
+        """POST through the rate limiter and quota tracker, retrying throttled or failed attempts
+        
+        429 and 5xx responses and connection errors are retried with exponential
+        backoff and jitter, honoring `Retry-After`. Read timeouts are raised at
+        once, without a quota refund, since the request may have been billed.
+        The final response is returned as-is for the caller to check.
+        
+        Args:
+            url: Endpoint URL
+            body: JSON-serializable request body
+            credits: Billable queries contained in the body
             
-        except requests.exceptions.RequestException as e:
-            return {
-                "error": f"Search request failed: {str(e)}",
-                "success": False
-            }
-        except json.JSONDecodeError as e:
-            return {
-                "error": f"Failed to parse response: {str(e)}",
-                "success": False
-            }
+        Returns:
+            The last HTTP response received
+        """
+        if not self.quota.try_consume(credits):
+            raise SerperQuotaExceeded(f"Serper quota exhausted ({self.quota.used}/{self.quota.limit} credits used)")
+        
+        data = json.dumps(body)
+        attempt = 0
+        while True:
+            if not self.rate_limiter.acquire(max_wait=SERPER_MAX_QUEUE_WAIT):
+                self.quota.refund(credits)
+                raise SerperRateLimited(f"Rate limit queue wait exceeded {SERPER_MAX_QUEUE_WAIT:.0f}s")
+            
+            try:
+                response = self.session.post(url, headers=self.headers, data=data)
+            except _CONNECT_ERRORS:
+                if not self.retry_policy.should_retry(None, attempt):
+                    self.quota.refund(credits)
+                    raise
+                time.sleep(self.retry_policy.delay(attempt))
+                attempt += 1
+                continue
+            
+            if response.status_code == 429:
+                self.rate_limiter.on_throttle()
+            elif response.ok:
+                self.rate_limiter.on_success()
+            
+            if not self.retry_policy.should_retry(response.status_code, attempt):
+                return response
+            
+            delay = self.retry_policy.delay(attempt, response.headers.get("Retry-After"))
+            logger.warning(f"⚠️ Serper returned {response.status_code}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
     
-    def search_news(self, query: str, num_results: int = 10) -> Dict[str, Any]:
-        """Search for news articles specifically
+    def _fetch(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a query payload to a Serper endpoint
         
         Args:
-            query: News search query
-            num_results: Number of news results to return
+            endpoint: Endpoint name ("search" or "news")
+            payload: JSON request body
             
         Returns:
-            Dictionary containing news search results
+            Parsed response, or an error dict if the request failed. Requests refused
+            locally by the rate limiter or quota, without reaching Serper, are marked
+            with "refused": True
         """
+        url, request_error, parse_error = SERPER_ENDPOINTS[endpoint]
         try:
-            payload = {
-                "q": query,
-                "num": num_results,
-                "type": "news"
-            }
-            
-            response = requests.post(
-                "https://google.serper.dev/news",
-                headers=self.headers,
-                data=json.dumps(payload),
-                timeout=30
-            )
+            response = self._post_with_retry(url, payload)
             
             response.raise_for_status()
             return response.json()
             
+        except (SerperRateLimited, SerperQuotaExceeded) as e:
+            return {
+                "error": f"{request_error}: {str(e)}",
+                "success": False,
+                "refused": True
+            }
         except requests.exceptions.RequestException as e:
             return {
-                "error": f"News search request failed: {str(e)}",
+                "error": f"{request_error}: {str(e)}",
                 "success": False
             }
         except json.JSONDecodeError as e:
             return {
-                "error": f"Failed to parse news response: {str(e)}",
+                "error": f"{parse_error}: {str(e)}",
                 "success": False
             }
     
@@ -188,11 +386,40 @@ class SerperSearchTool:
             True if connection is successful, False otherwise
         """
         try:
-            test_result = self.search("test query", num_results=1)
+            # Bypass the cache so the probe really reaches the API
+            test_result = self._fetch("search", {"q": "test query", "num": 1})
             return "error" not in test_result
         except Exception:
             return False
 
+    def get_connection_stats(self) -> Dict[str, Any]:
+        """Get keep-alive connection reuse statistics for the underlying pool"""
+        return self.session.get_stats()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get result cache hit/miss/eviction statistics"""
+        return self.cache.get_stats() if self.cache else {}
+    
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """Get statistics on how many identical in-flight searches were collapsed"""
+        return self.single_flight.get_stats()
+    
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """Get rate limiter and quota usage statistics"""
+        return {
+            "rate_limiter": self.rate_limiter.get_stats(),
+            "quota": self.quota.get_stats()
+        }
+
+_default_tool: Optional[SerperSearchTool] = None
+
+def get_default_tool() -> SerperSearchTool:
+    """Get the shared SerperSearchTool used by the MCP tool functions"""
+    global _default_tool
+    if _default_tool is None:
+        _default_tool = SerperSearchTool()
+    return _default_tool
+
 # MCP Tool Functions for integration
 def google_search_tool(query: str, num_results: int = 10, location: str = None) -> str:
     """MCP tool function for Google search
@@ -206,7 +433,7 @@ def google_search_tool(query: str, num_results: int = 10, location: str = None)
         Formatted search results as string
     """
     try:
-        tool = SerperSearchTool()
+        tool = get_default_tool()
         results = tool.search(query, num_results, location)
         return tool.format_search_results(results)
     except Exception as e:
@@ -223,7 +450,7 @@ def google_news_search_tool(query: str, num_results: int = 10) -> str:
         Formatted news search results as string
     """
     try:
-        tool = SerperSearchTool()
+        tool = get_default_tool()
         results = tool.search_news(query, num_results)
         return tool.format_search_results(results)
     except Exception as e:
@@ -309,6 +536,9 @@ if __name__ == "__main__":
         news_formatted = tool.format_search_results(news_results)
         print(news_formatted[:500] + "..." if len(news_formatted) > 500 else news_formatted)
         
+        # Show connection reuse
+        print(f"\n🔌 Connection stats: {tool.get_connection_stats()}")
+        
         print("\n✅ All tests completed successfully!")
         
     except Exception as e:
@@ -0,0 +1,134 @@
+"""
+Single-flight Request Coalescing
+Concurrent identical requests share one upstream call and all waiters receive its result
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into a single execution
+
+    Works for threaded callers (`do`) and asyncio callers (`ado`). Only calls
+    that overlap in time are collapsed; nothing is cached once a call returns.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, "asyncio.Task"] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "executions": 0,
+            "collapsed": 0,
+        }
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run `fn` unless an identical call is already in flight, then share its outcome
+
+        Args:
+            key: Hashable identity of the request
+            fn: Zero-argument callable performing the request
+
+        Returns:
+            The leader call's return value (exceptions are re-raised to every waiter)
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._stats["executions"] += 1
+            else:
+                self._stats["collapsed"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async counterpart of `do` taking a coroutine function
+
+        The upstream call runs as its own task, so cancelling one waiter
+        (including the first) does not cancel the call for the others. Once
+        every waiter has been cancelled the upstream call is cancelled too.
+        """
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        with self._lock:
+            self._stats["calls"] += 1
+            task = self._tasks.get(task_key)
+            if task is None:
+                task = loop.create_task(fn())
+                self._tasks[task_key] = task
+                self._waiters[task_key] = 0
+                self._stats["executions"] += 1
+                task.add_done_callback(lambda done: self._task_done(task_key, done))
+            else:
+                self._stats["collapsed"] += 1
+            self._waiters[task_key] += 1
+
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            with self._lock:
+                abandoned = self._tasks.get(task_key) is task and self._waiters[task_key] == 1
+            if abandoned:
+                task.cancel()
+            raise
+        finally:
+            with self._lock:
+                if task_key in self._waiters and self._tasks.get(task_key) is task:
+                    self._waiters[task_key] -= 1
+
+    def _task_done(self, task_key: Hashable, task: "asyncio.Task"):
+        """Forget a finished async call and mark its exception as retrieved"""
+        with self._lock:
+            if self._tasks.get(task_key) is task:
+                del self._tasks[task_key]
+                del self._waiters[task_key]
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls) + len(self._tasks)
+        stats["collapse_ratio"] = stats["collapsed"] / stats["calls"] if stats["calls"] else 0.0
+        return stats
+
+
+_shared_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide single-flight group shared by all search tools"""
+    return _shared_single_flight
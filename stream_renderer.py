@@ -0,0 +1,153 @@
+"""
+Incremental Streaming Renderer
+Formats streamed answers a tail at a time and coalesces UI updates to a frame rate
+"""
+
+import os
+import re
+import time
+from typing import Any, Callable, Dict, List
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Rendering configuration (overridable via environment)
+STREAM_RENDER_FPS = float(os.getenv('STREAM_RENDER_FPS', 10))                  # UI updates per second while streaming
+STREAM_RENDER_FLUSH_CHARS = int(os.getenv('STREAM_RENDER_FLUSH_CHARS', 500))  # render early once this much is pending
+
+_EXCESS_BREAKS = re.compile(r'\n{3,}')
+_HEADER = re.compile(r'\n(#+\s)')
+_LIST_ITEM = re.compile(r'\n(\d+\.\s|\*\s|-\s)')
+# A trailing line of bare "#"s becomes a header (or not) depending on the next character
+_OPEN_HEADER = re.compile(r'\n#+\Z')
+
+
+def _normalize(content: str) -> str:
+    # Remove excessive line breaks (more than 2 consecutive newlines)
+    content = _EXCESS_BREAKS.sub('\n\n', content)
+
+    # Ensure proper spacing around headers
+    content = _HEADER.sub(r'\n\n\1', content)
+
+    # Ensure proper spacing around lists
+    return _LIST_ITEM.sub(r'\n\1', content)
+
+
+def process_assistant_content(content: str) -> str:
+    """Process assistant content to improve formatting for Markdown"""
+    return _normalize(content).strip()
+
+
+class IncrementalFormatter:
+    """`process_assistant_content` over a growing text, touching only the new tail
+
+    Text up to the last run of line breaks is formatted once and kept; only the
+    unfinished last line (and the breaks before it) is re-formatted per render.
+    Every rule matches within a line plus the breaks before it, so the result is
+    identical to formatting the whole text at once. The raw text is kept here
+    too, so callers need no buffer of their own.
+    """
+
+    def __init__(self):
+        self._formatted = ""
+        self._committed = ""          # raw text already formatted into `_formatted`
+        self._tail: List[str] = []    # raw chunks after it
+
+    def append(self, text: str):
+        """Add newly streamed text"""
+        self._tail.append(text)
+
+    @property
+    def text(self) -> str:
+        """Raw text appended so far"""
+        return self._committed + "".join(self._tail)
+
+    def render(self) -> str:
+        """Formatted Markdown for everything appended so far"""
+        tail = self._commit()
+        return (self._formatted + _normalize(tail)).strip()
+
+    def _commit(self) -> str:
+        """Format and keep the finished lines of the tail; returns the unfinished rest"""
+        tail = "".join(self._tail)
+        self._tail = [tail]
+        last_break = tail.rfind("\n")
+        if last_break <= 0:
+            return tail
+        # Cut before the run of breaks so it is formatted together with the line after it
+        cut = len(tail[:last_break].rstrip("\n"))
+        head = tail[:cut]
+        if not head or _OPEN_HEADER.search(head):
+            return tail
+        self._formatted += _normalize(head)
+        self._committed += head
+        tail = tail[cut:]
+        self._tail = [tail]
+        return tail
+
+
+class StreamRenderer:
+    """Buffers streamed chunks and re-renders a placeholder at most `fps` times a second
+
+    The first chunk is shown immediately; after that chunks are collected and the
+    placeholder is updated when the frame interval has passed or at least
+    `flush_chars` characters are waiting.
+    """
+
+    def __init__(self, placeholder: Any, fps: float = STREAM_RENDER_FPS,
+                 flush_chars: int = STREAM_RENDER_FLUSH_CHARS, clock: Callable[[], float] = time.monotonic):
+        """Initialize the renderer
+
+        Args:
+            placeholder: Object with a `markdown(text)` method, e.g. `st.empty()`
+            fps: Maximum UI updates per second (0 renders only on `flush`/`finish`)
+            flush_chars: Pending characters that trigger a render before the next frame
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.placeholder = placeholder
+        self.frame_interval = 1.0 / fps if fps > 0 else float("inf")
+        self.flush_chars = flush_chars
+        self._clock = clock
+        self._chunk_count = 0
+        self._formatter = IncrementalFormatter()
+        self._pending_chars = 0
+        self._last_frame = None
+        self.frames = 0
+
+    def feed(self, chunk: str):
+        """Add a streamed chunk, rendering if a frame is due"""
+        if not chunk:
+            return
+        self._chunk_count += 1
+        self._formatter.append(chunk)
+        self._pending_chars += len(chunk)
+        now = self._clock()
+        if self._last_frame is None or now - self._last_frame >= self.frame_interval or \
+                self._pending_chars >= self.flush_chars:
+            self._render(now)
+
+    def flush(self):
+        """Render any pending chunks now"""
+        if self._pending_chars:
+            self._render(self._clock())
+
+    def finish(self) -> str:
+        """Render the final frame and return the raw streamed text"""
+        self.flush()
+        return self.text
+
+    @property
+    def text(self) -> str:
+        """Raw text streamed so far"""
+        return self._formatter.text
+
+    def _render(self, now: float):
+        self.placeholder.markdown(self._formatter.render())
+        self._pending_chars = 0
+        self._last_frame = now
+        self.frames += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Chunks received versus frames rendered"""
+        return {"chunks": self._chunk_count, "frames": self.frames}
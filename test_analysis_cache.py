@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for the LLM analysis cache and paced replay
+"""
+
+import sys
+import os
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from article import Article
+from analysis_cache import fingerprint_articles, make_analysis_key, replay_stream
+
+
+def test_fingerprint():
+    """Any change to the article set changes the fingerprint"""
+    print("🔏 Testing article set fingerprints...")
+    articles = [Article("A", "https://x.com/a", "first"), Article("B", "https://x.com/b", "second")]
+    same = [Article("A", "https://x.com/a", "first"), Article("B", "https://x.com/b", "second")]
+    edited = [Article("A", "https://x.com/a", "first"), Article("B", "https://x.com/b", "updated")]
+    assert fingerprint_articles(articles) == fingerprint_articles(same)
+    assert fingerprint_articles(articles) != fingerprint_articles(edited)
+    assert fingerprint_articles(articles) != fingerprint_articles(list(reversed(articles)))
+    assert fingerprint_articles(articles) == fingerprint_articles([a.to_dict() for a in articles])
+    print("✅ Fingerprints track the article set")
+
+
+def test_key_components():
+    """Model, prompt version and query all separate cache entries"""
+    print("🔑 Testing analysis keys...")
+    articles = [Article("A", "https://x.com/a", "first")]
+    key = make_analysis_key("gpt-4o", "stream-v1", "Latest  AI", articles)
+    assert key == make_analysis_key("gpt-4o", "stream-v1", "latest ai", articles)
+    assert key != make_analysis_key("gpt-4o-mini", "stream-v1", "latest ai", articles)
+    assert key != make_analysis_key("gpt-4o", "stream-v2", "latest ai", articles)
+    assert key != make_analysis_key("gpt-4o", "stream-v1", "latest ml", articles)
+    print("✅ Keys separate model, prompt version and query")
+
+
+def test_paced_replay():
+    """Replay reproduces the cached text exactly, in chunks, at the configured pace"""
+    print("▶️ Testing paced replay...")
+    text = "Markets rallied today as  investors\nweighed new data on inflation."
+    start = time.time()
+    chunks = list(replay_stream(text, chars_per_second=1000, chunk_words=2))
+    elapsed = time.time() - start
+    assert "".join(chunks) == text
+    assert len(chunks) > 1
+    assert elapsed >= len(text) / 1000 * 0.8
+    assert list(replay_stream(text, chars_per_second=0)) == [text]
+    print("✅ Replay is exact and paced")
+
+
+if __name__ == "__main__":
+    print("🚀 Analysis Cache Test Suite")
+    print("=" * 50)
+
+    tests = [test_fingerprint, test_key_components, test_paced_replay]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
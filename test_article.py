@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the Article record and the columnar ArticleBatch
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from article import Article, ArticleBatch, canonicalize_url, parse_article_date
+
+
+def test_dict_compatibility():
+    """Articles still answer the mapping lookups the old result dicts supported"""
+    print("📄 Testing dict compatibility...")
+    article = Article.from_serper_news({"title": "Story", "link": "https://x.com/a", "source": "X"})
+    assert article["title"] == "Story" and article.get("url") == "https://x.com/a"
+    assert article.get("missing", "default") == "default"
+    assert "source" in article
+    assert Article.from_dict(article.to_dict()) == article
+    print("✅ Mapping access works")
+
+
+def test_hashing():
+    """Equal articles hash alike, so they work in sets and as dict keys"""
+    print("#️⃣ Testing hashing...")
+    item = {"title": "Story", "link": "https://x.com/a", "source": "X", "date": "3 hours ago"}
+    first, second = Article.from_serper_news(item), Article.from_serper_news(item)
+    assert first == second and hash(first) == hash(second)
+    assert len({first, second, Article.from_serper_news({**item, "title": "Other"})}) == 2
+    assert first.published == "3 hours ago"                    # kept as the provider's raw string
+    print("✅ Hashing is consistent with equality")
+
+
+def test_lazy_fields():
+    """Dates and canonical URLs are parsed on demand"""
+    print("🕒 Testing lazy fields...")
+    reference = datetime(2024, 3, 4, 12, 0).timestamp()
+    assert parse_article_date("3 hours ago", reference) == datetime(2024, 3, 4, 9, 0)
+    assert parse_article_date("Mar 4, 2024") == datetime(2024, 3, 4)
+    assert parse_article_date("sometime") is None
+
+    article = Article("Story", url="https://WWW.x.com/a/?utm_source=feed#top", date="Mar 4, 2024")
+    assert article.canonical_url == "https://x.com/a"
+    assert article.published_at == datetime(2024, 3, 4)
+    assert canonicalize_url("http://x.com/a?id=1&fbclid=z") == "http://x.com/a?id=1"
+    print("✅ Lazy fields work")
+
+
+def test_batch_from_responses():
+    """A batch built from raw responses materializes rows and deduplicates by URL"""
+    print("📦 Testing ArticleBatch...")
+    responses = [
+        {"news": [{"title": "A", "link": "https://x.com/a"}, {"title": "B", "link": "https://y.com/b"}]},
+        {"news": [{"title": "A again", "link": "https://www.x.com/a/"}]},
+        {"error": "boom"},
+    ]
+    batch = ArticleBatch.from_serper_responses(responses, fetched_at=0.0)
+    assert len(batch) == 3
+    assert batch[1].title == "B" and batch[1].fetched_at == 0.0
+
+    unique = batch.unique_by_url()
+    assert unique.titles == ["A", "B"]
+    assert [article.title for article in unique] == ["A", "B"]
+    assert unique.to_dicts()[0]["url"] == "https://x.com/a"
+    print("✅ Batch operations work")
+
+
+if __name__ == "__main__":
+    print("🚀 Article Test Suite")
+    print("=" * 50)
+
+    tests = [test_dict_compatibility, test_hashing, test_lazy_fields, test_batch_from_responses]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
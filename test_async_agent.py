@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script for the async NewsAgent API (search, analysis and streamed answers)
+"""
+
+import sys
+import os
+import asyncio
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from health_check import HealthChecker
+from circuit_breaker import CircuitBreaker
+from semantic_cache import SemanticCache
+
+STORIES = ["Central bank holds rates", "Chipmaker beats forecasts", "Oil slides on supply glut"]
+
+
+class _Quota:
+    def should_shed(self):
+        return False
+
+
+class _AsyncSerperTool:
+    """Async Serper stand-in; raises while `failing` is set"""
+
+    def __init__(self, failing=False):
+        self.failing = failing
+        self.calls = 0
+        self.quota = _Quota()
+
+    async def search_news(self, query, num_results=10):
+        self.calls += 1
+        if self.failing:
+            raise ConnectionError("Serper unreachable")
+        return {"news": [{"title": title, "link": f"https://example.com/{i}", "source": "Wire",
+                          "snippet": f"{title} ({query})"} for i, title in enumerate(STORIES)]}
+
+    async def search(self, query, num_results=10):
+        self.calls += 1
+        return {"organic": [{"title": "Markets wrap", "link": "https://example.com/wrap", "snippet": query}]}
+
+
+def _make_agent():
+    from news_agent_clarifai import NewsAgent
+
+    agent = NewsAgent(model_name="gpt-4o")
+    agent.clarifai_pat = "test-pat"
+    agent.async_serper_tool = _AsyncSerperTool()
+    agent.serper_breaker = CircuitBreaker("Serper API", failure_threshold=3, cooldown=60)
+    agent._genai_client_failed = True
+    agent.health = HealthChecker(interval=60, ttl=60)
+    agent.analysis_cache = None
+    agent.semantic_cache = SemanticCache(ttl=60, max_entries=8)
+    agent.llm_calls = 0
+
+    async def fake_complete(prompt, original_query):
+        agent.llm_calls += 1
+        return "Markets are mixed."
+
+    async def fake_complete_stream(prompt, original_query):
+        agent.llm_calls += 1
+        for chunk in ("Markets ", "are ", "mixed."):
+            yield chunk
+
+    agent._acomplete = fake_complete
+    agent._acomplete_stream = fake_complete_stream
+    return agent
+
+
+async def _collect(stream):
+    return "".join([chunk async for chunk in stream])
+
+
+def test_asearch_news():
+    """Serper results come back as articles; a failing provider falls back"""
+    print("🔎 Testing async search...")
+    agent = _make_agent()
+    results = asyncio.run(agent.asearch_news("markets", 3))
+    assert [a.title for a in results] == STORIES and results[0].search_engine == "Serper API"
+
+    agent.async_serper_tool.failing = True
+    results = asyncio.run(agent.asearch_news("markets", 3))
+    assert results and results[0].search_engine != "Serper API"
+    assert agent.serper_breaker.get_status()["failures"] == 1
+    print("✅ Async search works")
+
+
+def test_async_analysis():
+    """Both async analysis paths report a complete analysis through `outcome`"""
+    print("🧠 Testing async analysis...")
+    agent = _make_agent()
+    articles = asyncio.run(agent.asearch_news("markets", 3))
+
+    outcome = {}
+    answer = asyncio.run(agent.aanalyze_with_ai(articles, "markets", outcome))
+    assert answer.startswith("Markets are mixed.") and outcome == {"complete": True}
+
+    outcome = {}
+    streamed = asyncio.run(_collect(agent.aanalyze_with_ai_stream(articles, "markets", outcome)))
+    assert streamed == "Markets are mixed." and outcome == {"complete": True}
+
+    async def broken_stream(prompt, original_query):
+        yield "Mark"
+        raise ConnectionError("stream dropped")
+
+    agent._acomplete_stream = broken_stream
+    outcome = {}
+    streamed = asyncio.run(_collect(agent.aanalyze_with_ai_stream(articles, "markets", outcome)))
+    assert streamed.startswith("Mark") and len(streamed) > len("Mark") and outcome == {}
+    print("✅ Async analysis reports completion")
+
+
+def test_async_streams_use_semantic_cache():
+    """A paraphrase is replayed from the semantic cache on the async stream and pipelined paths"""
+    print("♻️ Testing async semantic cache...")
+    for name in ("asearch_and_analyze_stream", "asearch_and_analyze_pipelined"):
+        agent = _make_agent()
+        first = asyncio.run(_collect(getattr(agent, name)("latest news on Tesla stock")))
+        assert "Markets are mixed." in first and agent.llm_calls == 1
+        searches = agent.async_serper_tool.calls
+        assert searches == 1, name                   # no secondary search unless opted in
+
+        second = asyncio.run(_collect(getattr(agent, name)("Tesla stock news")))
+        assert second == first, name
+        assert agent.llm_calls == 1 and agent.async_serper_tool.calls == searches, name
+        assert agent.get_semantic_cache_stats()["hits"] == 1, name
+    print("✅ Async streams replay cached answers")
+
+
+if __name__ == "__main__":
+    print("🚀 Async Agent Test Suite")
+    print("=" * 50)
+
+    tests = [test_asearch_news, test_async_analysis, test_async_streams_use_semantic_cache]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
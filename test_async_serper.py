@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for the asyncio Serper search tool
+"""
+
+import sys
+import os
+import json
+import asyncio
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+from async_serper_search_tool import AsyncSerperSearchTool
+from rate_limiter import AdaptiveRateLimiter, RetryPolicy, QuotaTracker
+
+
+def _make_tool(handler):
+    """Tool whose requests are answered by `handler(request)` instead of the network"""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    tool = AsyncSerperSearchTool(api_key="test-key", client=client, cache=None)
+    tool.rate_limiter = AdaptiveRateLimiter(rate=1000, burst=100)
+    tool.retry_policy = RetryPolicy(max_retries=2, base_delay=0.01, max_delay=0.01)
+    tool.quota = QuotaTracker(limit=0)
+    return tool, client
+
+
+def test_search_requests():
+    """Searches POST the query to the right endpoint with the API key"""
+    print("📨 Testing async requests...")
+    seen = []
+
+    def handler(request):
+        seen.append((request.url.path, request.headers["X-API-KEY"], json.loads(request.content)))
+        return httpx.Response(200, json={"news": [{"title": "Story"}]})
+
+    async def main():
+        tool, client = _make_tool(handler)
+        try:
+            news = await tool.search_news("markets", 3)
+            web = await tool.search("markets", 2, location="us")
+        finally:
+            await client.aclose()
+        return news, web
+
+    news, web = asyncio.run(main())
+    assert news == {"news": [{"title": "Story"}]} and web == news
+    assert seen[0] == ("/news", "test-key", {"q": "markets", "num": 3, "type": "news"})
+    assert seen[1] == ("/search", "test-key", {"q": "markets", "num": 2, "gl": "us"})
+    print("✅ Requests are well formed")
+
+
+def test_gather_order_and_concurrency():
+    """gather_searches keeps query order and never exceeds max_concurrency"""
+    print("🔀 Testing fan-out...")
+    in_flight = {"now": 0, "peak": 0}
+
+    async def handler(request):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        query = json.loads(request.content)["q"]
+        await asyncio.sleep(0.05 if query == "q0" else 0.01)    # the first query finishes last
+        in_flight["now"] -= 1
+        return httpx.Response(200, json={"news": [{"title": query}]})
+
+    async def main():
+        tool, client = _make_tool(handler)
+        try:
+            return await tool.gather_searches([f"q{i}" for i in range(6)], max_concurrency=2)
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(main())
+    assert [result["news"][0]["title"] for result in results] == [f"q{i}" for i in range(6)]
+    assert in_flight["peak"] == 2
+    print("✅ Order kept and concurrency capped")
+
+
+def test_retries_and_errors():
+    """429s and connection errors are retried, read timeouts are not; persistent failures become error dicts"""
+    print("🔁 Testing retries and errors...")
+    statuses = [429, 200]
+
+    def flaky(request):
+        status = statuses.pop(0)
+        return httpx.Response(status, json={"news": []} if status == 200 else {"message": "slow down"})
+
+    attempts = {"connect": 0, "read": 0}
+
+    def broken(request):
+        attempts["connect"] += 1
+        raise httpx.ConnectError("refused", request=request)
+
+    def stalled(request):
+        attempts["read"] += 1
+        raise httpx.ReadTimeout("read timed out", request=request)
+
+    async def main():
+        tool, client = _make_tool(flaky)
+        try:
+            recovered = await tool.search_news("markets")
+        finally:
+            await client.aclose()
+        failing, failing_client = _make_tool(broken)
+        try:
+            failed = await failing.search_news("markets")
+        finally:
+            await failing_client.aclose()
+        slow, slow_client = _make_tool(stalled)
+        slow.quota = QuotaTracker(limit=10)
+        try:
+            timed_out = await slow.search_news("markets")
+        finally:
+            await slow_client.aclose()
+        return tool, recovered, failed, slow, timed_out
+
+    tool, recovered, failed, slow, timed_out = asyncio.run(main())
+    assert recovered == {"news": []} and statuses == []
+    assert tool.rate_limiter.get_stats()["throttled"] == 1
+    assert failed["success"] is False and "refused" in failed["error"] and attempts["connect"] == 3
+    # A read timeout may have been billed: no retry and no refund
+    assert timed_out["success"] is False and attempts["read"] == 1 and slow.quota.used == 1
+    print("✅ Retries and errors handled")
+
+
+if __name__ == "__main__":
+    print("🚀 Async Serper Test Suite")
+    print("=" * 50)
+
+    tests = [test_search_requests, test_gather_order_and_concurrency, test_retries_and_errors]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test script for batched Serper news searches
+"""
+
+import sys
+import os
+import json
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+import serper_search_tool
+from serper_search_tool import SerperSearchTool
+from search_cache import SearchCache
+from rate_limiter import AdaptiveRateLimiter, RetryPolicy, QuotaTracker
+from circuit_breaker import CircuitBreaker
+from health_check import HealthChecker
+
+
+def _response(status, body):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(body).encode()
+    return response
+
+
+class _Session:
+    """Answers each batched payload with one result per query; `fail` queries make the whole request 500"""
+
+    def __init__(self, fail=(), truncate=()):
+        self.fail = set(fail)
+        self.truncate = set(truncate)
+        self.batches = []
+
+    def post(self, url, headers=None, data=None):
+        payloads = json.loads(data)
+        queries = [payload["q"] for payload in payloads]
+        self.batches.append(queries)
+        if self.fail & set(queries):
+            return _response(500, {"message": "upstream error"})
+        results = [{"news": [{"title": f"{query} story", "link": f"https://example.com/{query}"}]}
+                   for query in queries]
+        if self.truncate & set(queries):
+            results = results[:-1]
+        return _response(200, results)
+
+
+def _make_tool(session, cache=None):
+    tool = SerperSearchTool(api_key="test-key", session=session, cache=cache)
+    tool.rate_limiter = AdaptiveRateLimiter(rate=1000, burst=100)
+    tool.retry_policy = RetryPolicy(max_retries=1, base_delay=0.01, max_delay=0.01)
+    tool.quota = QuotaTracker(limit=0)
+    return tool
+
+
+def test_batching_and_order():
+    """Misses are deduplicated and split into SERPER_BATCH_LIMIT chunks; results keep query order"""
+    print("📦 Testing batching...")
+    original = serper_search_tool.SERPER_BATCH_LIMIT
+    serper_search_tool.SERPER_BATCH_LIMIT = 2
+    try:
+        session = _Session()
+        tool = _make_tool(session, cache=SearchCache())
+        queries = ["ai", "oil", "ai", "rates", "chips"]
+        results = tool.search_news_batch(queries, 3)
+
+        assert session.batches == [["ai", "oil"], ["rates", "chips"]]
+        assert [result["news"][0]["title"] for result in results] == [f"{query} story" for query in queries]
+
+        # Cached queries are served without a request; only the new one goes upstream
+        results = tool.search_news_batch(["chips", "bonds", "ai"], 3)
+        assert session.batches[2:] == [["bonds"]]
+        assert [result["news"][0]["title"] for result in results] == ["chips story", "bonds story", "ai story"]
+    finally:
+        serper_search_tool.SERPER_BATCH_LIMIT = original
+    print("✅ Batches are chunked, deduplicated and ordered")
+
+
+def test_per_query_errors():
+    """A failed or malformed chunk only errors its own queries, and errors aren't cached"""
+    print("⚠️ Testing per-query errors...")
+    original = serper_search_tool.SERPER_BATCH_LIMIT
+    serper_search_tool.SERPER_BATCH_LIMIT = 2
+    try:
+        session = _Session(fail={"oil"}, truncate={"chips"})
+        cache = SearchCache()
+        tool = _make_tool(session, cache=cache)
+        results = tool.search_news_batch(["ai", "oil", "rates", "chips", "bonds"], 3)
+
+        assert "error" in results[0] and "error" in results[1]            # 500 for the first chunk
+        assert "error" in results[2] and "expected 2 results" in results[3]["error"]
+        assert results[4]["news"][0]["title"] == "bonds story"
+        assert cache.get_stats()["entries"] == 1
+
+        session.fail.clear()
+        session.truncate.clear()
+        results = tool.search_news_batch(["ai", "bonds"], 3)
+        assert results[0]["news"][0]["title"] == "ai story" and session.batches[-1] == ["ai"]
+    finally:
+        serper_search_tool.SERPER_BATCH_LIMIT = original
+    print("✅ Errors stay per query")
+
+
+def test_agent_batch_search():
+    """The agent converts each query's results in order and gives failed queries no articles"""
+    print("🤖 Testing agent batch search...")
+    from news_agent_clarifai import NewsAgent
+
+    agent = NewsAgent(model_name="gpt-4o")
+    agent.serper_tool = _make_tool(_Session(fail={"oil"}))
+    agent.serper_breaker = CircuitBreaker("Serper API", failure_threshold=1, cooldown=60)
+    agent.health = HealthChecker(interval=60, ttl=60)
+
+    original = serper_search_tool.SERPER_BATCH_LIMIT
+    serper_search_tool.SERPER_BATCH_LIMIT = 1
+    try:
+        articles = agent.search_news_batch(["ai", "oil", "rates"], 3)
+        assert [a.title for a in articles[0]] == ["ai story"] and articles[1] == []
+        assert [a.title for a in articles[2]] == ["rates story"]
+        assert agent.serper_breaker.get_status()["successes"] == 1
+
+        articles = agent.search_news_batch(["oil"], 3)
+        assert articles == [[]] and agent.serper_breaker.get_status()["failures"] == 1
+    finally:
+        serper_search_tool.SERPER_BATCH_LIMIT = original
+    print("✅ Agent batch search works")
+
+
+def test_local_refusals_spare_the_breaker():
+    """Searches our own rate limiter refuses fail over without counting as Serper failures"""
+    print("🚦 Testing local refusals...")
+    from news_agent_clarifai import NewsAgent
+
+    session = _Session()
+    agent = NewsAgent(model_name="gpt-4o")
+    agent.serper_tool = _make_tool(session)
+    agent.serper_tool.rate_limiter = AdaptiveRateLimiter(rate=0.001, burst=1)
+    agent.serper_tool.rate_limiter.reserve()              # the bucket is now empty for ~1000s
+    agent.serper_breaker = CircuitBreaker("Serper API", failure_threshold=1, cooldown=60)
+    agent.health = HealthChecker(interval=60, ttl=60)
+    agent._genai_client_failed = True
+
+    results = agent.serper_tool.search_news("ai", 3)
+    assert results["refused"] is True and "error" in results
+
+    articles = agent.search_news("ai", 3)
+    assert all(a.search_engine != "Serper API" for a in articles)
+    assert agent.search_news_batch(["ai", "oil"], 3) == [[], []]
+    status = agent.serper_breaker.get_status()
+    assert status["failures"] == 0 and status["state"] == "closed" and session.batches == []
+    print("✅ Local refusals don't open the circuit")
+
+
+if __name__ == "__main__":
+    print("🚀 Batch Search Test Suite")
+    print("=" * 50)
+
+    tests = [test_batching_and_order, test_per_query_errors, test_agent_batch_search,
+             test_local_refusals_spare_the_breaker]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
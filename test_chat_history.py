@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the cached, paged chat history view
+"""
+
+import sys
+import os
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from chat_history import MessageRenderCache, history_start
+
+STATS = {"model": "gpt-4o", "prompt_tokens": 900, "response_tokens": 300, "total_tokens": 1200,
+         "duration": 6.0, "tokens_per_second": 50.0}
+
+
+def test_render_cache():
+    """Unchanged messages are served from the cache; edits re-render"""
+    print("🗂️ Testing render cache...")
+    cache = MessageRenderCache()
+    user = {"role": "user", "content": "<b>AI</b> news?", "timestamp": "10:00:00"}
+    answer = {"role": "assistant", "content": "Intro\n\n\n\n## Trends\n", "timestamp": "10:00:05"}
+
+    rendered = cache.get(user)
+    assert "&lt;b&gt;AI&lt;/b&gt;" in rendered.header and rendered.body == ""
+    rendered = cache.get(answer, STATS)
+    assert rendered.body == "Intro\n\n\n## Trends"
+    assert "900" in rendered.stats_html and "50.0" in rendered.stats_html
+
+    for _ in range(3):
+        assert cache.get(answer, dict(STATS)) is rendered
+    assert cache.get(answer).stats_html is None
+
+    edited = dict(answer, content=answer["content"] + "More")
+    assert cache.get(edited, STATS).body.endswith("More")
+    assert cache.get_stats() == {"entries": 4, "hits": 3, "misses": 4}
+    print("✅ Render cache works")
+
+
+def test_cache_is_bounded():
+    """The least recently shown messages are evicted first"""
+    print("📦 Testing cache bound...")
+    cache = MessageRenderCache(max_entries=3)
+    messages = [{"role": "assistant", "content": f"answer {i}", "timestamp": ""} for i in range(4)]
+    for message in messages[:3]:
+        cache.get(message)
+    cache.get(messages[0])
+    cache.get(messages[3])
+    assert cache.get_stats()["entries"] == 3
+    cache.get(messages[0])
+    assert cache.hits == 2
+    cache.get(messages[1])
+    assert cache.misses == 5
+    print("✅ Cache bounded")
+
+
+def test_history_start():
+    """Only the newest windows are rendered, one more per 'load older' page"""
+    print("📜 Testing history paging...")
+    assert history_start(5, pages=1, window=20) == 0
+    assert history_start(100, pages=1, window=20) == 80
+    assert history_start(100, pages=2, window=20) == 60
+    assert history_start(100, pages=9, window=20) == 0
+    assert history_start(100, pages=0, window=20) == 80
+    assert history_start(100, pages=1, window=0) == 0
+    print("✅ Paging works")
+
+
+if __name__ == "__main__":
+    print("🚀 Chat History Test Suite")
+    print("=" * 50)
+
+    tests = [test_render_cache, test_cache_is_bounded, test_history_start]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for the search provider circuit breaker
+"""
+
+import sys
+import os
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+def test_opens_on_consecutive_failures():
+    """The circuit opens after the failure threshold and short-circuits calls"""
+    print("🔴 Testing consecutive failure threshold...")
+    breaker = CircuitBreaker("test", failure_threshold=3, cooldown=60)
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    status = breaker.get_status()
+    assert status["short_circuited"] == 1 and status["retry_in"] > 0
+    print("✅ Circuit opens and short-circuits")
+
+
+def test_opens_on_error_rate():
+    """The circuit opens when the windowed error rate crosses the threshold"""
+    print("📈 Testing error rate threshold...")
+    breaker = CircuitBreaker("test", failure_threshold=100, error_rate=0.5, window=10, min_calls=4)
+    for outcome in [True, False, True, False]:
+        breaker.record_success() if outcome else breaker.record_failure()
+    assert breaker.state == OPEN
+    print("✅ Error rate opens the circuit")
+
+
+def test_half_open_probe():
+    """After the cool-down one probe is allowed; its outcome closes or re-opens the circuit"""
+    print("🟡 Testing half-open probing...")
+    breaker = CircuitBreaker("test", failure_threshold=1, cooldown=0.05, half_open_probes=1)
+    breaker.record_failure()
+    time.sleep(0.1)
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    time.sleep(0.1)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    print("✅ Half-open probes recover the circuit")
+
+
+if __name__ == "__main__":
+    print("🚀 Circuit Breaker Test Suite")
+    print("=" * 50)
+
+    tests = [test_opens_on_consecutive_failures, test_opens_on_error_rate, test_half_open_probe]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for the token-budgeted context builder
+"""
+
+import sys
+import os
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import context_builder
+from context_builder import (ContextBuilder, TokenCounter, compress_snippet, get_token_counter, _water_fill,
+                             DEFAULT_TOKENIZER_MODEL)
+
+MODEL = "gpt-4o"
+
+
+def _article(i, words):
+    return {
+        "title": f"Story {i}",
+        "url": f"https://example.com/{i}",
+        "source": "Example",
+        "snippet": " ".join(f"word{n}." if n % 12 == 11 else f"word{n}" for n in range(words)),
+    }
+
+
+def _format(i, article, snippet):
+    return f"{i}. {article['title']} ({article['source']})\n{article['url']}\n{snippet}\n\n"
+
+
+def _wrap(context):
+    return f"Summarize these articles:\n\n{context}Answer briefly."
+
+
+def test_water_fill():
+    """Small demands are met in full; large ones share what is left equally"""
+    print("💧 Testing water-fill allocation...")
+    assert _water_fill([10, 200, 30], 120) == [10, 80, 30]
+    assert _water_fill([10, 200, 300], 120) == [10, 55, 55]
+    assert _water_fill([5, 5], 100) == [5, 5]
+    assert _water_fill([50, 50, 50], 30) == [10, 10, 10]
+    assert _water_fill([], 10) == []
+    print("✅ Allocation is fair")
+
+
+def test_fits_budget():
+    """Built prompts never exceed the budget and keep short snippets whole"""
+    print("📏 Testing budget fit...")
+    articles = [_article(1, 20), _article(2, 600), _article(3, 600), _article(4, 15)]
+    builder = ContextBuilder(MODEL, max_prompt_tokens=500)
+    context = builder.build(articles, _format, _wrap)
+
+    assert context.prompt_tokens <= 500, context.get_stats()
+    assert context.dropped == 0
+    assert context.trimmed == 2
+    assert articles[0]["snippet"] in context.prompt
+    assert articles[3]["snippet"] in context.prompt
+    print(f"✅ Stats: {context.get_stats()}")
+
+
+def test_drops_lowest_ranked():
+    """When every article can't get the minimum snippet, the last ones are dropped"""
+    print("🪓 Testing article dropping...")
+    articles = [_article(i, 200) for i in range(1, 21)]
+    builder = ContextBuilder(MODEL, max_prompt_tokens=400, min_snippet_tokens=24)
+    context = builder.build(articles, _format, _wrap)
+
+    assert context.prompt_tokens <= 400, context.get_stats()
+    assert context.dropped > 0
+    assert context.articles == articles[:len(context.articles)]
+    assert "Story 1 " in context.prompt
+    assert f"Story {len(context.articles) + 1} " not in context.prompt
+    print(f"✅ Stats: {context.get_stats()}")
+
+
+def test_truncate_and_compress():
+    """Truncation respects the token limit and snippet boilerplate is stripped"""
+    print("✂️ Testing truncation...")
+    counter = get_token_counter(MODEL)
+    text = "The first sentence is here. The second sentence is a little longer than that. " * 10
+    cut = counter.truncate(text, 30)
+    assert counter.count(cut) <= 30
+    assert cut.endswith(".") or cut.endswith("…")
+    assert counter.truncate("short", 30) == "short"
+    assert counter.truncate(text, 0) == ""
+
+    assert compress_snippet("Mar 3, 2025 ... Markets  rallied\n today") == "Markets rallied today"
+    assert compress_snippet("2 hours ago - Rates held") == "Rates held"
+    print("✅ Truncation works")
+
+
+def test_tokenizer_resolution():
+    """Tokenizers load lazily, fall back without downloads or waiting, and only own tokenizers are exact"""
+    print("🔤 Testing tokenizer resolution...")
+    builder = ContextBuilder("meta-llama/Meta-Llama-3.1-8B-Instruct")
+    assert builder.counter._resolved is None                   # nothing loaded at construction
+
+    started = time.time()
+    assert builder.counter.exact is False
+    assert builder.counter.tokenizer_model == DEFAULT_TOKENIZER_MODEL
+    for _ in range(20):
+        builder.counter.count("Llama counts use the fallback tokenizer")
+    assert time.time() - started < 5
+    assert get_token_counter("auto").exact is False
+    assert get_token_counter(MODEL).exact is True
+
+    original_probe, original_timeout = context_builder._load_tokenizer, context_builder.CONTEXT_TOKENIZER_TIMEOUT
+    context_builder._load_tokenizer = lambda model: time.sleep(2) or False if model == "slow-model" \
+        else original_probe(model)
+    context_builder.CONTEXT_TOKENIZER_TIMEOUT = 0.2
+    try:
+        started = time.time()
+        counter = TokenCounter("slow-model")
+        assert counter.tokenizer_model == DEFAULT_TOKENIZER_MODEL and not counter.exact
+        assert counter.count("cached after the first timeout") > 0
+        assert time.time() - started < 1.5
+    finally:
+        context_builder._load_tokenizer = original_probe
+        context_builder.CONTEXT_TOKENIZER_TIMEOUT = original_timeout
+    print("✅ Tokenizers resolve without hanging")
+
+
+if __name__ == "__main__":
+    print("🚀 Context Builder Test Suite")
+    print("=" * 50)
+
+    tests = [test_water_fill, test_fits_budget, test_drops_lowest_ranked, test_truncate_and_compress,
+             test_tokenizer_resolution]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test script for the durable, memory-bounded conversation store
+"""
+
+import sys
+import os
+import gc
+import json
+import tempfile
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from conversation_store import (ConversationStore, MESSAGES, LLM_STATS, export_to_file,
+                                new_session_id, is_session_id)
+
+
+def _message(i, padding=0):
+    return {"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i}" + "x" * padding,
+            "timestamp": "10:00:00"}
+
+
+def test_window_and_paging():
+    """Only the newest turns stay in memory; older ones are paged from disk"""
+    print("📜 Testing window and paging...")
+    with tempfile.TemporaryDirectory() as directory:
+        store = ConversationStore(os.path.join(directory, "chat.sqlite3"), memory_turns=5, page_size=4)
+        session_id = new_session_id()
+        assert is_session_id(session_id) and not is_session_id("../etc")
+        log = store.open(session_id, MESSAGES)
+        assert store.open(session_id, MESSAGES) is log
+        for i in range(23):
+            log.append(_message(i))
+
+        assert len(log) == 23 and len(log._window) == 5
+        assert log[-1] == _message(22) and log[22] == _message(22)
+        reads = store.get_stats()["page_reads"]
+        assert log[1] == _message(1) and log[2] == _message(2)     # one page read covers both
+        assert store.get_stats()["page_reads"] == reads + 1
+        assert log[16:19] == [_message(i) for i in range(16, 19)]
+        assert list(log) == [_message(i) for i in range(23)]
+        try:
+            log[23]
+            assert False, "expected IndexError"
+        except IndexError:
+            pass
+
+        stats_log = store.open(session_id, LLM_STATS)
+        stats_log.append({"total_tokens": 10})
+        assert len(stats_log) == 1 and len(log) == 23
+    print("✅ Window and paging work")
+
+
+def test_survives_restart_and_clear():
+    """A new store on the same file reopens the conversation; clear deletes it"""
+    print("💾 Testing durability...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "chat.sqlite3")
+        session_id = new_session_id()
+        log = ConversationStore(path, memory_turns=3).open(session_id)
+        for i in range(7):
+            log.append(_message(i))
+
+        reopened = ConversationStore(path, memory_turns=3).open(session_id)
+        assert len(reopened) == 7 and reopened[-1] == _message(6) and reopened[0] == _message(0)
+        reopened.append(_message(7))
+        assert len(reopened) == 8 and list(reopened)[-2:] == [_message(6), _message(7)]
+
+        export = export_to_file(reopened)
+        lines = export.read().decode("utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == [_message(i) for i in range(8)]
+
+        reopened.clear()
+        assert len(reopened) == 0 and list(reopened) == []
+        assert len(ConversationStore(path).open(session_id)) == 0
+    print("✅ Durable across restarts")
+
+
+def test_memory_caps():
+    """Per-session and global caps bound memory; released windows reload on access"""
+    print("📦 Testing memory caps...")
+    with tempfile.TemporaryDirectory() as directory:
+        store = ConversationStore(os.path.join(directory, "chat.sqlite3"), memory_turns=100,
+                                  session_max_bytes=2000, global_max_bytes=3000)
+        first = store.open(new_session_id())
+        for i in range(10):
+            first.append(_message(i, padding=400))
+        assert first._window_bytes <= 2000 and len(first._window) < 10
+
+        second = store.open(new_session_id())
+        for i in range(4):
+            second.append(_message(i, padding=400))
+        stats = store.get_stats()
+        assert stats["memory_bytes"] <= 3000 and stats["released"] >= 1
+        assert len(first._window) == 0                             # least recently used is released
+
+        assert first[9] == _message(9, padding=400)                # reloaded from disk on access
+        assert store.get_stats()["memory_bytes"] <= 3000
+        assert len(second._window) == 0
+
+        del first, second
+        gc.collect()
+        assert store.get_stats()["memory_bytes"] == 0
+    print("✅ Memory caps enforced")
+
+
+def test_failed_writes_are_kept():
+    """Records whose write failed stay readable after leaving the window and are written later"""
+    print("🧯 Testing failed writes...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "chat.sqlite3")
+        store = ConversationStore(path, memory_turns=2, page_size=2)
+        write = store._write
+        failing = [False]
+        store._write = lambda *args: False if failing[0] else write(*args)
+
+        session_id = new_session_id()
+        log = store.open(session_id)
+        log.append(_message(0))
+        failing[0] = True
+        for i in range(1, 4):
+            log.append(_message(i))
+        assert len(log._window) == 2 and len(log._unpersisted) == 3
+        assert log[1] == _message(1) and log[0] == _message(0)
+        assert list(log) == [_message(i) for i in range(4)]
+
+        failing[0] = False
+        for i in range(4, 6):
+            log.append(_message(i))
+        assert not log._unpersisted
+        assert list(ConversationStore(path).open(session_id)) == [_message(i) for i in range(6)]
+    print("✅ Failed writes kept and retried")
+
+
+if __name__ == "__main__":
+    print("🚀 Conversation Store Test Suite")
+    print("=" * 50)
+
+    tests = [test_window_and_paging, test_survives_restart_and_clear, test_memory_caps,
+             test_failed_writes_are_kept]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test script for the background backend health checker
+"""
+
+import sys
+import os
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import health_check
+from health_check import HealthChecker, HEALTHY, UNHEALTHY, UNKNOWN, probe_serper
+from circuit_breaker import CircuitBreaker, OPEN, CLOSED
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_background_probes():
+    """Probes run off the caller's thread and their results are cached"""
+    print("🩺 Testing background probes...")
+    calls = []
+    checker = HealthChecker(interval=60, ttl=60)
+    checker.register("ok", lambda: calls.append(1) or (True, "HTTP 200"))
+    checker.register("down", lambda: (_ for _ in ()).throw(ConnectionError("refused")))
+    assert checker.get_status("ok")["status"] == UNKNOWN
+
+    checker.start()
+    assert wait_for(lambda: checker.get_status("down")["status"] == UNHEALTHY)
+    assert wait_for(lambda: checker.is_healthy("ok"))
+    assert "refused" in checker.get_status("down")["detail"]
+
+    # Reads come from the cache, not from new probes
+    for _ in range(10):
+        checker.get_status("ok")
+    assert len(calls) == 1
+    print("✅ Probes run in the background and are cached")
+
+
+def test_ttl_and_refresh():
+    """Results expire to UNKNOWN after the TTL, and refresh re-probes on demand"""
+    print("⏳ Testing TTL expiry and refresh...")
+    outcomes = [True, False]
+    checker = HealthChecker(interval=60, ttl=0.2)
+    checker.register("flaky", lambda: (outcomes.pop(0), "probe"))
+    checker.start()
+    assert wait_for(lambda: checker.get_status("flaky")["status"] == HEALTHY)
+
+    checker.refresh("flaky")
+    assert wait_for(lambda: checker.is_unhealthy("flaky"))
+    assert wait_for(lambda: checker.get_status("flaky")["status"] == UNKNOWN)
+    assert not checker.is_unhealthy("flaky")
+    print("✅ TTL expiry and refresh work")
+
+
+class _Response:
+    status_code = 200
+
+
+class _Session:
+    def request(self, method, url, **kwargs):
+        return _Response()
+
+
+class _Quota:
+    def should_shed(self):
+        return False
+
+
+class _SerperTool:
+    """Serper stand-in that fails until `healthy` is set"""
+
+    def __init__(self):
+        self.healthy = False
+        self.calls = 0
+        self.quota = _Quota()
+
+    def search_news(self, query, num_results=10):
+        self.calls += 1
+        if not self.healthy:
+            raise ConnectionError("Serper unreachable")
+        return {"news": [{"title": f"{query} story", "link": "https://example.com/story", "source": "Wire"}]}
+
+
+def test_open_circuit_recovers():
+    """An open Serper circuit doesn't fail the probe, so Serper is used again after the cooldown"""
+    print("🔁 Testing circuit recovery...")
+    from news_agent_clarifai import NewsAgent
+
+    original_session, original_key = health_check.get_shared_session, os.environ.get('SERPER_API_KEY')
+    health_check.get_shared_session = lambda name: _Session()
+    os.environ['SERPER_API_KEY'] = "test-key"
+    try:
+        agent = NewsAgent(model_name="gpt-4o")
+        agent.serper_tool = _SerperTool()
+        agent.serper_breaker = CircuitBreaker("Serper API", failure_threshold=1, cooldown=1.5)
+        agent.health = HealthChecker(interval=60, ttl=60)
+        agent.health.register("Serper API", probe_serper)
+
+        results = agent.search_news("markets", 1)
+        assert agent.serper_breaker.state == OPEN and results[0].search_engine != "Serper API"
+
+        agent.health.check_now("Serper API")
+        assert agent.health.is_healthy("Serper API")
+
+        agent.serper_tool.healthy = True
+        agent.search_news("markets", 1)
+        assert agent.serper_tool.calls == 1, agent.serper_tool.calls      # skipped while the circuit is open
+
+        time.sleep(1.6)
+        results = agent.search_news("markets", 1)
+        assert agent.serper_tool.calls == 2 and results[0].search_engine == "Serper API", (agent.serper_tool.calls, results)
+        assert agent.serper_breaker.state == CLOSED
+    finally:
+        health_check.get_shared_session = original_session
+        if original_key is None:
+            os.environ.pop('SERPER_API_KEY', None)
+        else:
+            os.environ['SERPER_API_KEY'] = original_key
+    print("✅ Serper used again after the cooldown")
+
+
+if __name__ == "__main__":
+    print("🚀 Health Check Test Suite")
+    print("=" * 50)
+
+    tests = [test_background_probes, test_ttl_and_refresh, test_open_circuit_recovers]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
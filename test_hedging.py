@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test script for hedged LLM requests
+"""
+
+import sys
+import os
+import time
+import asyncio
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from hedging import Hedger, HedgeFailed, PRIMARY, HEDGE, percentile
+
+
+class _Stream:
+    """Fake one-chunk token stream whose chunk arrives after `delay` seconds"""
+
+    def __init__(self, name, delay, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.closed = False
+        self.sent = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.sent:
+            raise StopIteration
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        self.sent = True
+        return self.name
+
+    def close(self):
+        self.closed = True
+
+
+class _AsyncStream(_Stream):
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.sent:
+            raise StopAsyncIteration
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        self.sent = True
+        return self.name
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_delay_from_percentile():
+    """The hedge delay tracks the TTFT percentile within its bounds"""
+    print("📐 Testing hedge delay...")
+    hedger = Hedger(percentile=90, min_delay=0.5, max_delay=5, default_delay=2, min_samples=10)
+    assert hedger.delay([0.3] * 5) == 2
+    assert hedger.delay([0.1] * 10) == 0.5
+    assert hedger.delay([1.0] * 9 + [20.0] * 1) == 1.0
+    assert hedger.delay([1.0] * 8 + [20.0] * 2) == 5
+    assert percentile([3, 1, 2, 4], 50) == 2
+    print("✅ Delay works")
+
+
+def test_fast_primary_not_hedged():
+    """A primary that starts before the delay never triggers a hedge"""
+    print("🏃 Testing fast primary...")
+    hedger = Hedger()
+    started = []
+    result = hedger.race(lambda: _Stream("primary", 0.01), lambda: started.append(1) or _Stream("hedge", 0),
+                         delay=0.3, timeout=2)
+    assert result.index == PRIMARY and result.first == "primary" and not result.hedged
+    assert not started
+    print("✅ No hedge sent")
+
+
+def test_slow_primary_hedged():
+    """A slow primary is hedged, the hedge wins and the primary is closed when it returns"""
+    print("🎯 Testing hedge win...")
+    hedger = Hedger()
+    primary = _Stream("primary", 0.5)
+    start = time.time()
+    result = hedger.race(lambda: primary, lambda: _Stream("hedge", 0.01), delay=0.1, timeout=2)
+    assert result.index == HEDGE and result.first == "hedge" and result.hedged
+    assert time.time() - start < 0.4
+    time.sleep(0.6)
+    assert primary.closed
+    stats = hedger.get_stats()
+    assert stats["hedge_rate"] == 1.0 and stats["hedge_win_rate"] == 1.0
+    print(f"✅ Stats: {stats}")
+
+
+def test_failures():
+    """A fast failure is not hedged; a hedge covers a primary that fails after the delay"""
+    print("💥 Testing failures...")
+    hedger = Hedger()
+    try:
+        hedger.race(lambda: _Stream("primary", 0, fail=True), lambda: _Stream("hedge", 0), delay=0.2, timeout=1)
+        assert False, "expected HedgeFailed"
+    except HedgeFailed as e:
+        assert not e.hedged and PRIMARY in e.errors
+
+    result = hedger.race(lambda: _Stream("primary", 0.3, fail=True), lambda: _Stream("hedge", 0.4),
+                         delay=0.1, timeout=2)
+    assert result.index == HEDGE and PRIMARY in result.errors
+    print("✅ Failures handled")
+
+
+def test_async_race():
+    """Async races cancel and close the losing request"""
+    print("⚡ Testing async race...")
+    hedger = Hedger()
+    primary = _AsyncStream("primary", 1.0)
+
+    async def start_primary():
+        return primary
+
+    async def start_hedge():
+        return _AsyncStream("hedge", 0.01)
+
+    async def main():
+        result = await hedger.arace(start_primary, start_hedge, delay=0.1, timeout=2)
+        assert result.index == HEDGE and result.first == "hedge"
+        assert primary.closed
+        assert [chunk async for chunk in result.chunks] == []
+
+    start = time.time()
+    asyncio.run(main())
+    assert time.time() - start < 0.5
+    print("✅ Async race works")
+
+
+def test_unhedged_failure_closes_stream():
+    """Without hedging, a stream that fails before its first chunk is closed before failing over"""
+    print("🔒 Testing unhedged stream cleanup...")
+    import news_agent_clarifai
+    from news_agent_clarifai import NewsAgent
+    from model_router import ModelRoutingError
+
+    streams = []
+
+    def open_stream(response):
+        streams.append(_Stream(f"model-{len(streams)}", 0, fail=True))
+        return streams[-1]
+
+    class _LiteLLM:
+        @staticmethod
+        def completion(**kwargs):
+            return None
+
+    original = news_agent_clarifai._content_chunks, news_agent_clarifai.litellm
+    news_agent_clarifai._content_chunks, news_agent_clarifai.litellm = open_stream, _LiteLLM()
+    try:
+        agent = NewsAgent(model_name="gpt-4o")
+        agent.hedging = False
+        agent._completion_kwargs = lambda *args, **kwargs: {}
+        try:
+            list(agent._complete_stream("prompt", "markets"))
+            assert False, "expected ModelRoutingError"
+        except ModelRoutingError:
+            pass
+    finally:
+        news_agent_clarifai._content_chunks, news_agent_clarifai.litellm = original
+    assert streams and all(stream.closed for stream in streams), [stream.closed for stream in streams]
+    print(f"✅ {len(streams)} failed stream(s) closed")
+
+
+if __name__ == "__main__":
+    print("🚀 Hedging Test Suite")
+    print("=" * 50)
+
+    tests = [test_delay_from_percentile, test_fast_primary_not_hedged, test_slow_primary_hedged,
+             test_failures, test_async_race, test_unhedged_failure_closes_stream]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
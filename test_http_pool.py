@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared httpx client pools
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from http_pool import (PooledSession, get_shared_session, get_pool_stats, get_shared_http_client,
+                       get_shared_async_client, get_http_client_stats, close_shared_sessions,
+                       aclose_shared_async_clients)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Keep-alive HTTP/1.1 handler answering every request with a small JSON body"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/"
+
+
+def test_pooled_session_reuses_connections():
+    """A pooled requests session keeps one keep-alive connection and counts reuse"""
+    print("♻️ Testing pooled session reuse...")
+    server, url = _start_server()
+    session = PooledSession(pool_maxsize=2)
+    try:
+        for _ in range(4):
+            assert session.get(url).json() == {"ok": True}
+        stats = session.get_stats()
+        assert stats["requests"] == 4 and stats["errors"] == 0 and stats["hosts"] == 1
+        assert stats["connections_opened"] == 1 and stats["connections_reused"] == 3
+        assert stats["reuse_ratio"] == 0.75
+    finally:
+        session.close()
+        server.shutdown()
+        server.server_close()
+
+    try:
+        session.get(url, timeout=(0.5, 0.5))
+        assert False, "expected a connection error"
+    except requests.exceptions.RequestException:
+        pass
+    assert session.get_stats()["errors"] == 1
+    print(f"✅ Stats: {stats}")
+
+
+def test_shared_sessions_by_name():
+    """Serper tools share the process-wide "serper" session unless given their own"""
+    print("🤝 Testing shared sessions...")
+    from serper_search_tool import SerperSearchTool
+
+    try:
+        first = SerperSearchTool(api_key="test-key", cache=None)
+        second = SerperSearchTool(api_key="test-key", cache=None)
+        assert first.session is second.session is get_shared_session("serper")
+        assert get_shared_session("other") is not first.session
+        assert set(get_pool_stats()) >= {"serper", "other"} and get_pool_stats("serper")["requests"] == 0
+
+        own = PooledSession()
+        assert SerperSearchTool(api_key="test-key", session=own, cache=None).session is own
+    finally:
+        close_shared_sessions()
+    assert get_pool_stats() == {} and get_shared_session("serper") is not first.session
+    close_shared_sessions()
+    print("✅ Sessions shared by name")
+
+
+def test_shared_client_reuses_connections():
+    """Callers of the same name share one client and its keep-alive connection"""
+    print("🔌 Testing connection reuse...")
+    server, url = _start_server()
+    try:
+        client = get_shared_http_client("test-sync", max_connections=2)
+        assert get_shared_http_client("test-sync") is client
+        for _ in range(5):
+            assert get_shared_http_client("test-sync").get(url).json() == {"ok": True}
+
+        stats = get_http_client_stats("test-sync")
+        assert stats["requests"] == 5
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 4 and stats["reuse_ratio"] == 0.8
+        assert stats["errors"] == 0
+        print(f"✅ Stats: {stats}")
+    finally:
+        close_shared_sessions()
+        server.shutdown()
+
+    assert get_shared_http_client("test-sync") is not client
+    close_shared_sessions()
+
+
+def test_async_client_shares_counters():
+    """Async clients count into the same statistics as the sync client of that name"""
+    print("⚡ Testing async client stats...")
+    server, url = _start_server()
+
+    async def main():
+        client = get_shared_async_client("test-async")
+        assert get_shared_async_client("test-async") is client
+        responses = await asyncio.gather(*(client.get(url) for _ in range(3)))
+        assert all(response.status_code == 200 for response in responses)
+        await client.get(url)
+        await aclose_shared_async_clients()
+
+    try:
+        asyncio.run(main())
+        stats = get_http_client_stats("test-async")
+        assert stats["requests"] == 4
+        # Three concurrent requests may each open a connection; the fourth reuses one
+        assert 1 <= stats["connections_opened"] <= 3
+        assert stats["connections_reused"] >= 1
+        assert "test-async" in get_http_client_stats()
+        print(f"✅ Stats: {stats}")
+    finally:
+        server.shutdown()
+
+
+def test_async_clients_closed_with_loop():
+    """A loop's clients are closed when asyncio.run shuts it down, and the next loop gets new ones"""
+    print("🧹 Testing async client teardown...")
+    server, url = _start_server()
+
+    async def main():
+        client = get_shared_async_client("test-teardown")
+        assert (await client.get(url)).status_code == 200
+        return client
+
+    try:
+        first = asyncio.run(main())
+        assert first.is_closed
+        second = asyncio.run(main())
+        assert second is not first and second.is_closed
+
+        async def close_early():
+            client = get_shared_async_client("test-teardown")
+            await aclose_shared_async_clients()
+            assert client.is_closed
+            assert get_shared_async_client("test-teardown") is not client
+
+        asyncio.run(close_early())
+    finally:
+        server.shutdown()
+    print("✅ Async clients close with their loop")
+
+
+if __name__ == "__main__":
+    print("🚀 HTTP Pool Test Suite")
+    print("=" * 50)
+
+    tests = [test_pooled_session_reuses_connections, test_shared_sessions_by_name,
+             test_shared_client_reuses_connections, test_async_client_shares_counters,
+             test_async_clients_closed_with_loop]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for deferred imports of heavy dependencies
+"""
+
+import sys
+import os
+import json
+import subprocess
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ("litellm", "streamlit", "openai", "google.genai", "google.adk")
+
+
+def _modules_after(code):
+    """Heavy modules present in sys.modules after running `code` in a fresh interpreter"""
+    probe = (f"{code}\nimport sys, json\n"
+             f"heavy = {HEAVY_MODULES!r}\n"
+             "print(json.dumps(sorted(m for m in sys.modules if any(m == h or m.startswith(h + '.') for h in heavy))))")
+    proc = subprocess.run([sys.executable, "-c", probe], cwd=HERE, capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_agent_import_stays_light():
+    """Importing the agent module doesn't import LiteLLM, Streamlit or Google ADK"""
+    print("🪶 Testing agent import...")
+    loaded = _modules_after("import news_agent_clarifai")
+    assert loaded == [], loaded
+    print("✅ No heavy modules imported")
+
+
+def test_lazy_module_loads_on_access():
+    """A LazyModule imports on first attribute access and runs its hook once"""
+    print("💤 Testing LazyModule...")
+    from lazy_imports import LazyModule, is_installed
+
+    calls = []
+    module = LazyModule("colorsys", on_load=calls.append)
+    assert not module.loaded
+    assert module.rgb_to_hsv(1, 0, 0) == (0.0, 1.0, 1.0)
+    assert module.loaded and module.load() is calls[0] and len(calls) == 1
+
+    assert is_installed("requests") and not is_installed("no-such-package", "no_such_module")
+    print("✅ LazyModule loads on demand")
+
+
+if __name__ == "__main__":
+    print("🚀 Lazy Import Test Suite")
+    print("=" * 50)
+
+    tests = [test_agent_import_stays_light, test_lazy_module_loads_on_access]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
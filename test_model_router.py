@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for the latency-aware model router
+"""
+
+import sys
+import os
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from model_router import ModelRouter, ModelProfile, classify_query, SIMPLE, COMPLEX
+
+
+def _router(prefix, **kwargs):
+    """Router over fresh model names, so breakers from other tests don't interfere"""
+    return ModelRouter([
+        ModelProfile(f"{prefix}-small", cost=0.1, tier=0),
+        ModelProfile(f"{prefix}-small-pricey", cost=0.3, tier=0),
+        ModelProfile(f"{prefix}-large", cost=2.0, tier=1),
+        ModelProfile(f"{prefix}-large-pricey", cost=3.0, tier=1),
+    ], **kwargs)
+
+
+def _names(plan, prefix):
+    return [profile.name[len(prefix) + 1:] for profile in plan.models]
+
+
+def test_classification():
+    """Digest queries are simple; reasoning queries and huge prompts are complex"""
+    print("🔎 Testing query classification...")
+    assert classify_query("latest AI news") == SIMPLE
+    assert classify_query("why did Tesla stock fall today") == COMPLEX
+    assert classify_query("compare EU and US AI regulation") == COMPLEX
+    assert classify_query("AI news", prompt_tokens=100000) == COMPLEX
+    print("✅ Classification works")
+
+
+def test_cheapest_adequate_first():
+    """Simple queries start on the cheapest small model; complex ones on a large model"""
+    print("💸 Testing route order...")
+    router = _router("order")
+    assert _names(router.plan("latest AI news"), "order") == ["small", "small-pricey", "large", "large-pricey"]
+    assert _names(router.plan("why are markets down"), "order") == ["large", "large-pricey", "small", "small-pricey"]
+    # A pinned model goes first and falls back to models at least as capable
+    assert _names(router.plan("AI news", pinned="order-large"), "order") == \
+        ["large", "large-pricey", "small", "small-pricey"]
+    print("✅ Route order works")
+
+
+def test_slow_or_failing_models_demoted():
+    """Models over the TTFT SLO or with elevated error rates lose their place"""
+    print("🐢 Testing latency and error demotion...")
+    router = _router("demote", ttft_slo=1.0)
+    router.record_success("demote-small", latency=3.0, ttft=2.5, tokens=50)
+    assert _names(router.plan("AI news"), "demote")[:2] == ["small-pricey", "small"]
+
+    router.record_success("demote-small", latency=0.5, ttft=0.1, tokens=50)
+    router.record_success("demote-small", latency=0.5, ttft=0.1, tokens=50)
+    router.record_success("demote-small", latency=0.5, ttft=0.1, tokens=50)
+    router.record_failure("demote-small-pricey", RuntimeError("boom"))
+    assert _names(router.plan("AI news"), "demote")[:2] == ["small", "small-pricey"]
+    print(f"✅ Stats: {router.get_stats()['models']['demote-small']}")
+
+
+def test_cascade_and_slo():
+    """Failures escalate to the next model and the SLO stops the cascade"""
+    print("⏱️ Testing cascade and SLO...")
+    router = _router("cascade", slo=0.2, ttft_slo=0.1)
+    plan = router.plan("AI news")
+    tried = []
+    for profile, timeout in plan.attempts(stream=True):
+        assert timeout <= 0.1
+        tried.append(profile.name)
+        if len(tried) == 1:
+            plan.failed(profile, RuntimeError("boom"))
+            continue
+        time.sleep(0.25)  # burn the whole budget
+        plan.failed(profile, TimeoutError("slow"))
+    assert tried == ["cascade-small", "cascade-small-pricey"]
+    stats = router.get_stats()
+    assert stats["escalations"] == 1 and stats["slo_exhausted"] == 1
+    print(f"✅ Counters: {dict((k, v) for k, v in stats.items() if k != 'models')}")
+
+
+if __name__ == "__main__":
+    print("🚀 Model Router Test Suite")
+    print("=" * 50)
+
+    tests = [test_classification, test_cheapest_adequate_first, test_slow_or_failing_models_demoted,
+             test_cascade_and_slo]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for near-duplicate article clustering
+"""
+
+import sys
+import os
+import time
+import random
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from article import Article, ArticleBatch
+from near_duplicates import MinHasher, collapse_near_duplicates, dedupe_batch, find_duplicate_clusters
+
+WIRE_STORY = ("Fed raises interest rates by a quarter point",
+              "The Federal Reserve raised its benchmark rate by 25 basis points on Wednesday, "
+              "citing cooling inflation and a resilient labor market.")
+
+
+def _articles():
+    title, snippet = WIRE_STORY
+    return [
+        Article(title, "https://reuters.com/fed-rates", snippet, "Reuters"),
+        Article("Apple unveils iPhone with larger battery", "https://verge.com/iphone",
+                "Apple announced its new iPhone lineup at its September event.", "The Verge"),
+        Article(title + " - Yahoo Finance", "https://finance.yahoo.com/fed", snippet, "Yahoo Finance"),
+        Article(title, "https://www.reuters.com/fed-rates/?utm_source=x", "Updated copy.", "Reuters"),
+        Article("Fed raises interest rates by quarter point", "https://cnbc.com/fed",
+                snippet.replace("Wednesday", "Wednesday afternoon"), "CNBC"),
+        Article("Fed holds rates steady in June", "https://wsj.com/fed-june",
+                "The central bank left rates unchanged as policymakers waited for more data.", "WSJ"),
+    ]
+
+
+def test_syndicated_copies_cluster():
+    """Syndicated copies and tracked URLs cluster; distinct stories stay apart"""
+    print("🧬 Testing clustering...")
+    articles = _articles()
+    clusters = find_duplicate_clusters([f"{a.title} {a.snippet}" for a in articles],
+                                       [a.canonical_url for a in articles])
+    assert clusters == [[0, 2, 3, 4], [1], [5]], clusters
+    print(f"✅ Clusters: {clusters}")
+
+
+def test_collapse_keeps_best_ranked():
+    """The best-ranked copy represents its story and lists the others as alternates"""
+    print("📰 Testing collapse...")
+    stories = collapse_near_duplicates(_articles())
+    assert [story.source for story in stories] == ["Reuters", "The Verge", "WSJ"]
+    assert [alternate.source for alternate in stories[0].alternates] == ["Yahoo Finance", "Reuters", "CNBC"]
+    assert stories[1].alternates == []
+
+    assert len(collapse_near_duplicates(_articles(), limit=2)) == 2
+    print("✅ Collapse works")
+
+
+def test_batch_and_signatures():
+    """Columnar batches dedupe without materializing rows; empty texts never match"""
+    print("📦 Testing batch dedupe...")
+    batch = ArticleBatch.from_articles(_articles())
+    stories, clusters = dedupe_batch(batch)
+    assert stories.sources == ["Reuters", "The Verge", "WSJ"]
+    assert len(clusters) == 3
+
+    signatures = MinHasher(num_perm=32).signatures(["a b c", "", "a b c"])
+    assert (signatures[0] == signatures[2]).all()
+    assert find_duplicate_clusters(["", "", "unrelated words here"]) == [[0], [1], [2]]
+    print("✅ Batch dedupe works")
+
+
+def test_band_validation():
+    """Bands must divide the signature length; valid custom bands still cluster"""
+    print("📏 Testing band validation...")
+    texts = [f"{a.title} {a.snippet}" for a in _articles()]
+    hasher = MinHasher(num_perm=64)
+    for bands in (0, 5, 128):
+        try:
+            find_duplicate_clusters(texts, hasher=hasher, bands=bands)
+            assert False, f"expected ValueError for {bands} bands"
+        except ValueError as e:
+            assert "NEAR_DUPLICATE_BANDS" in str(e)
+    assert find_duplicate_clusters(texts, hasher=hasher, bands=16)[0][:2] == [0, 2]
+    print("✅ Bad band counts rejected")
+
+
+def test_throughput():
+    """Thousands of articles per second in batch mode"""
+    print("⚡ Testing throughput...")
+    rng = random.Random(0)
+    vocabulary = [f"word{i}" for i in range(5000)]
+    texts = [" ".join(rng.choices(vocabulary, k=40)) for _ in range(2000)]
+    texts += [text + " reuters" for text in texts]
+    find_duplicate_clusters(texts[:4])
+
+    start = time.perf_counter()
+    clusters = find_duplicate_clusters(texts)
+    rate = len(texts) / (time.perf_counter() - start)
+    assert len(clusters) == 2000
+    assert rate > 2000, f"only {rate:.0f} articles/s"
+    print(f"✅ {rate:.0f} articles/s")
+
+
+if __name__ == "__main__":
+    print("🚀 Near-duplicate Clustering Test Suite")
+    print("=" * 50)
+
+    tests = [test_syndicated_copies_cluster, test_collapse_keeps_best_ranked, test_batch_and_signatures,
+             test_band_validation, test_throughput]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Test script for the pipelined search + analysis stream
+"""
+
+import sys
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import news_agent_clarifai
+from health_check import HealthChecker
+from circuit_breaker import CircuitBreaker
+
+STORIES = ["Central bank holds rates", "Chipmaker beats forecasts", "Oil slides on supply glut"]
+
+
+class _Quota:
+    def should_shed(self):
+        return False
+
+
+class _SerperTool:
+    """Serper stand-in: `search_news` feeds the primary search, `search` the secondary one"""
+
+    def __init__(self, news_error=None, web_error=None, web_delay=0.0):
+        self.news_error = news_error
+        self.web_error = web_error
+        self.web_delay = web_delay
+        self.news_calls = 0
+        self.web_calls = 0
+        self.quota = _Quota()
+
+    def search_news(self, query, num_results=10):
+        self.news_calls += 1
+        if self.news_error:
+            raise self.news_error
+        return {"news": [{"title": title, "link": f"https://example.com/{i}", "source": "Wire",
+                          "snippet": f"{title} ({query})"} for i, title in enumerate(STORIES)]}
+
+    def search(self, query, num_results=10):
+        self.web_calls += 1
+        time.sleep(self.web_delay)
+        if self.web_error:
+            raise self.web_error
+        return {"organic": [{"title": "Markets wrap", "link": "https://example.com/wrap", "snippet": query}]}
+
+
+def _make_agent(tool):
+    from news_agent_clarifai import NewsAgent
+
+    agent = NewsAgent(model_name="gpt-4o")
+    agent.clarifai_pat = "test-pat"
+    agent.serper_tool = tool
+    agent.serper_breaker = CircuitBreaker("Serper API", failure_threshold=3, cooldown=60)
+    agent._genai_client_failed = True
+    agent.health = HealthChecker(interval=60, ttl=60)
+    agent.analysis_cache = None
+    agent.semantic_cache = None
+
+    def fake_complete_stream(prompt, original_query):
+        for chunk in ("Markets ", "are ", "mixed."):
+            yield chunk
+
+    agent._complete_stream = fake_complete_stream
+    return agent
+
+
+def _with_secondary(test):
+    """Run `test` with the opt-in secondary coverage search switched on"""
+    def wrapper():
+        original = news_agent_clarifai.PIPELINE_SECONDARY_SEARCH
+        news_agent_clarifai.PIPELINE_SECONDARY_SEARCH = True
+        try:
+            test()
+        finally:
+            news_agent_clarifai.PIPELINE_SECONDARY_SEARCH = original
+    wrapper.__name__ = test.__name__
+    wrapper.__doc__ = test.__doc__
+    return wrapper
+
+
+def test_default_makes_one_serper_call():
+    """Without PIPELINE_SECONDARY_SEARCH the pipelined path spends a single Serper request"""
+    print("1️⃣ Testing default Serper usage...")
+    tool = _SerperTool()
+    agent = _make_agent(tool)
+    chunks = list(agent.search_and_analyze_pipelined("markets", num_results=3))
+
+    assert chunks[0].startswith("🔎 Found 3 articles") and "".join(chunks[1:]) == "Markets are mixed."
+    assert tool.news_calls == 1 and tool.web_calls == 0
+    print("✅ One Serper request per query")
+
+
+@_with_secondary
+def test_ordering():
+    """Header and sources come first, then the analysis, then the secondary coverage"""
+    print("📋 Testing pipelined ordering...")
+    agent = _make_agent(_SerperTool())
+    chunks = list(agent.search_and_analyze_pipelined("markets", num_results=3))
+
+    assert chunks[0].startswith("🔎 Found 3 articles") and STORIES[0] in chunks[0]
+    assert "".join(chunks[1:4]) == "Markets are mixed."
+    assert "➕ More coverage" in chunks[4] and "Markets wrap" in chunks[4] and len(chunks) == 5
+    timings = agent.last_pipeline_timings
+    assert timings["first_byte"] <= timings["first_token"] <= timings["total"]
+    assert agent.serper_breaker.get_status()["successes"] == 2
+    print("✅ Chunks arrive in order")
+
+
+@_with_secondary
+def test_abandoned_secondary_is_skipped():
+    """Closing the stream stops a secondary search that hasn't started"""
+    print("⏹️ Testing cancellation...")
+    tool = _SerperTool()
+    agent = _make_agent(tool)
+    original = news_agent_clarifai._pipeline_executor
+    busy = ThreadPoolExecutor(max_workers=1)
+    gate = threading.Event()
+    busy.submit(gate.wait, 5)                        # the secondary search queues behind this
+    news_agent_clarifai._pipeline_executor = busy
+    try:
+        stream = agent.search_and_analyze_pipelined("markets", num_results=3)
+        assert next(stream).startswith("🔎 Found")
+        stream.close()
+        gate.set()
+        busy.shutdown(wait=True)
+        assert tool.web_calls == 0
+
+        abandoned = threading.Event()
+        abandoned.set()
+        assert agent._search_web_coverage("markets", 3, abandoned) == [] and tool.web_calls == 0
+    finally:
+        news_agent_clarifai._pipeline_executor = original
+    print("✅ Abandoned secondary searches are skipped")
+
+
+@_with_secondary
+def test_fallbacks():
+    """A failed or slow secondary search is skipped; a failed primary falls back"""
+    print("🛟 Testing fallbacks...")
+    agent = _make_agent(_SerperTool(web_error=ConnectionError("down")))
+    chunks = list(agent.search_and_analyze_pipelined("markets", 3))
+    assert "".join(chunks).endswith("Markets are mixed.") and chunks[-1] == ""
+    assert agent.serper_breaker.get_status()["failures"] == 1
+
+    # An open circuit skips the secondary search without a request
+    tool = _SerperTool()
+    agent = _make_agent(tool)
+    agent.serper_breaker = CircuitBreaker("Serper API", failure_threshold=1, cooldown=60)
+    agent.serper_breaker.record_failure()
+    assert agent._search_web_coverage("markets", 3) == [] and tool.web_calls == 0
+
+    original = news_agent_clarifai.PIPELINE_SECONDARY_TIMEOUT
+    news_agent_clarifai.PIPELINE_SECONDARY_TIMEOUT = 0.1
+    try:
+        started = time.time()
+        chunks = list(_make_agent(_SerperTool(web_delay=1.0)).search_and_analyze_pipelined("markets", 3))
+        assert chunks[-1] == "" and time.time() - started < 0.9
+    finally:
+        news_agent_clarifai.PIPELINE_SECONDARY_TIMEOUT = original
+
+    chunks = list(_make_agent(_SerperTool(news_error=ConnectionError("down"))).search_and_analyze_pipelined("markets", 3))
+    assert chunks[0].startswith("🔎 Found") and "Markets are mixed." in "".join(chunks)
+    print("✅ Fallbacks work")
+
+
+if __name__ == "__main__":
+    print("🚀 Pipeline Test Suite")
+    print("=" * 50)
+
+    tests = [test_default_makes_one_serper_call, test_ordering, test_abandoned_secondary_is_skipped, test_fallbacks]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
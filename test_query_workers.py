@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test script for the background query worker pool
+"""
+
+import sys
+import os
+import threading
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from query_workers import QueryWorkerPool, QueryPoolFull, QUEUED, DONE, FAILED, CANCELLED
+
+
+def _streaming_work(chunks, gate=None):
+    def work(job):
+        if gate is not None:
+            gate.wait(5)
+        for chunk in chunks:
+            job.emit(chunk)
+        job.info["model"] = "fake-model"
+    return work
+
+
+def _wait(job):
+    while not job.wait(1):
+        pass
+
+
+def test_streams_into_shared_buffer():
+    """Readers pick up output from any offset; the result is collected once"""
+    print("🧵 Testing streamed jobs...")
+    pool = QueryWorkerPool(max_workers=2, max_queued=2)
+    gate = threading.Event()
+    job = pool.submit(_streaming_work(["Hello", ", ", "world"], gate), "greet", session_id="s1")
+    assert pool.pending_job("s1") is job and pool.pending_job("s2") is None
+    assert job.read(0) == ("", 0)
+
+    gate.set()
+    _wait(job)
+    assert job.status == DONE and job.result == "Hello, world" and job.info == {"model": "fake-model"}
+    assert job.read(5) == (", world", 12) and job.read(12) == ("", 12)
+    assert job.claim() and not job.claim()
+    assert pool.pending_job("s1") is None
+
+    plain = pool.submit(lambda job: "computed", "plain")
+    _wait(plain)
+    assert plain.result == "computed" and plain.text() == ""
+    assert pool.get(plain.id) is plain
+    pool.shutdown()
+    print("✅ Streamed jobs work")
+
+
+def test_bounded_concurrency():
+    """At most max_workers run; max_queued wait in order; the rest are turned away"""
+    print("🚦 Testing bounds...")
+    pool = QueryWorkerPool(max_workers=1, max_queued=2)
+    gate = threading.Event()
+    running = pool.submit(_streaming_work(["a"], gate), "first")
+    queued = [pool.submit(_streaming_work(["b"]), f"q{i}") for i in range(2)]
+    try:
+        pool.submit(_streaming_work(["c"]), "overflow")
+        assert False, "expected QueryPoolFull"
+    except QueryPoolFull:
+        pass
+    assert queued[0].status == QUEUED and pool.queue_position(queued[1]) == 1
+
+    gate.set()
+    for job in [running] + queued:
+        _wait(job)
+    stats = pool.get_stats()
+    assert stats["completed"] == 3 and stats["rejected"] == 1 and stats["running"] == 0
+    pool.shutdown()
+    print("✅ Bounds enforced")
+
+
+def test_cancel_and_failure():
+    """Cancelled jobs stop at the next chunk; errors are kept on the job"""
+    print("⏹️ Testing cancel and failure...")
+    pool = QueryWorkerPool(max_workers=1, max_queued=1)
+    gate = threading.Event()
+
+    def slow(job):
+        job.emit("partial")
+        gate.wait(5)
+        job.emit("never shown")
+
+    job = pool.submit(slow, "slow")
+    while not job.read(0)[0]:
+        job.wait(1)
+    job.cancel()
+    gate.set()
+    _wait(job)
+    assert job.status == CANCELLED and job.result == "partial"
+
+    def broken(job):
+        raise RuntimeError("search failed")
+
+    failed = pool.submit(broken, "broken")
+    _wait(failed)
+    assert failed.status == FAILED and failed.error == "search failed"
+
+    release = threading.Event()
+    discarded = pool.submit(_streaming_work(["x"], release), "discarded", session_id="s1")
+    discarded.discard()
+    release.set()
+    _wait(discarded)
+    assert pool.pending_job("s1") is None and not discarded.claim()
+    stats = pool.get_stats()
+    assert stats["cancelled"] == 2 and stats["failed"] == 1
+    pool.shutdown()
+    print("✅ Cancel and failure handled")
+
+
+def test_submit_after_shutdown():
+    """A job the executor refuses is rolled back instead of holding a queue slot"""
+    print("🛑 Testing submit after shutdown...")
+    pool = QueryWorkerPool(max_workers=1, max_queued=0)
+    pool.shutdown(wait=True)
+    for _ in range(2):
+        try:
+            pool.submit(_streaming_work(["x"]), "late", session_id="s1")
+            assert False, "expected RuntimeError"
+        except RuntimeError:
+            pass
+    stats = pool.get_stats()
+    assert stats["queued"] == 0 and stats["jobs"] == 0 and stats["submitted"] == 0 and stats["rejected"] == 0
+    assert pool.pending_job("s1") is None
+    print("✅ Refused jobs rolled back")
+
+
+if __name__ == "__main__":
+    print("🚀 Query Workers Test Suite")
+    print("=" * 50)
+
+    tests = [test_streams_into_shared_buffer, test_bounded_concurrency, test_cancel_and_failure,
+             test_submit_after_shutdown]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script for the adaptive rate limiter, retry policy and quota tracker
+"""
+
+import sys
+import os
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+from rate_limiter import AdaptiveRateLimiter, RetryPolicy, QuotaTracker, parse_retry_after
+
+
+def test_token_bucket():
+    """Burst is served immediately, then requests are paced at the configured rate"""
+    print("🪣 Testing token bucket pacing...")
+    limiter = AdaptiveRateLimiter(rate=20, burst=2)
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == 0.0
+    wait = limiter.reserve()
+    assert 0 < wait <= 0.05 + 1e-6
+    assert limiter.reserve(max_wait=0.01) is None
+    assert limiter.get_stats()["rejected"] == 1
+    print("✅ Token bucket paces requests")
+
+
+def test_adaptive_rate():
+    """Throttling halves the rate and successes recover it gradually"""
+    print("📉 Testing adaptive backoff...")
+    limiter = AdaptiveRateLimiter(rate=10, burst=5)
+    limiter.on_throttle()
+    assert limiter.rate == 5
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rate == 10
+    print("✅ Rate adapts to throttling")
+
+
+def test_zero_rate_is_unlimited():
+    """A rate of 0 disables limiting instead of dividing by zero; a bad min_rate is rejected"""
+    print("♾️ Testing unlimited rate...")
+    limiter = AdaptiveRateLimiter(rate=0, burst=1)
+    for _ in range(5):
+        assert limiter.reserve(max_wait=0) == 0.0
+    limiter.on_throttle()
+    limiter.on_success()
+    assert limiter.acquire() and limiter.get_stats()["acquired"] == 6
+
+    assert AdaptiveRateLimiter(rate=10, min_rate=0).min_rate == 0.5
+    for bad in (-1, 20):
+        try:
+            AdaptiveRateLimiter(rate=10, min_rate=bad)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+    print("✅ Zero rate means unlimited")
+
+
+def test_retry_policy():
+    """Only 429/5xx and connection errors are retried, honoring Retry-After"""
+    print("🔁 Testing retry policy...")
+    policy = RetryPolicy(max_retries=2, base_delay=0.5, max_delay=8)
+    assert policy.should_retry(429, 0)
+    assert policy.should_retry(None, 1)
+    assert not policy.should_retry(503, 2)
+    assert not policy.should_retry(400, 0)
+    assert not policy.should_retry(200, 0)
+    assert policy.delay(0, "3") == 3.0
+    assert policy.delay(0, "120") == 8
+    assert 0 <= policy.delay(3) <= 4
+    assert parse_retry_after("garbage") is None
+    print("✅ Retry policy decisions are correct")
+
+
+def test_quota_tracker():
+    """Quota refuses spending past the limit and signals shedding near it"""
+    print("💳 Testing quota tracking...")
+    quota = QuotaTracker(limit=10, shed_ratio=0.8)
+    assert quota.try_consume(7)
+    assert not quota.should_shed()
+    assert quota.try_consume(1)
+    assert quota.should_shed()
+    assert not quota.try_consume(5)
+    quota.refund(2)
+    assert quota.remaining == 4
+    assert QuotaTracker(limit=0).remaining is None
+    print("✅ Quota tracking works")
+
+
+class _FailingSession:
+    """Raises `error` for every POST and counts the attempts"""
+
+    def __init__(self, error):
+        self.error = error
+        self.posts = 0
+
+    def post(self, url, headers=None, data=None):
+        self.posts += 1
+        raise self.error
+
+
+def test_transport_errors():
+    """Connection errors are retried and refunded; read timeouts fail at once and stay billed"""
+    print("🔌 Testing transport errors...")
+    from serper_search_tool import SerperSearchTool
+
+    for error, posts, used in ((requests.exceptions.ConnectionError("refused"), 3, 0),
+                               (requests.exceptions.ConnectTimeout("connect timed out"), 3, 0),
+                               (requests.exceptions.ReadTimeout("read timed out"), 1, 1)):
+        session = _FailingSession(error)
+        tool = SerperSearchTool(api_key="test-key", session=session, cache=None)
+        tool.rate_limiter = AdaptiveRateLimiter(rate=1000, burst=100)
+        tool.retry_policy = RetryPolicy(max_retries=2, base_delay=0.01, max_delay=0.01)
+        tool.quota = QuotaTracker(limit=10)
+        result = tool.search_news("markets")
+        assert result["success"] is False, error
+        assert session.posts == posts and tool.quota.used == used, error
+    print("✅ Only connection errors are retried")
+
+
+if __name__ == "__main__":
+    print("🚀 Rate Limiter Test Suite")
+    print("=" * 50)
+
+    tests = [test_token_bucket, test_adaptive_rate, test_zero_rate_is_unlimited, test_retry_policy, test_quota_tracker,
+             test_transport_errors]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
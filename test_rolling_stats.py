@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script for the rolling LLM statistics engine
+"""
+
+import sys
+import os
+import random
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rolling_stats import (QuantileSketch, WindowedSummary, StatsEngine, GLOBAL, MODEL, SESSION,
+                           DURATION, TTFT, TOKENS, TOKENS_PER_SECOND)
+
+
+def _exact(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def test_sketch_accuracy_and_merge():
+    """Percentiles are within the relative accuracy; merged sketches match one big sketch"""
+    print("🎯 Testing quantile sketch...")
+    rng = random.Random(7)
+    values = [rng.lognormvariate(0, 1.5) for _ in range(20000)]
+    sketch, left, right = QuantileSketch(0.01), QuantileSketch(0.01), QuantileSketch(0.01)
+    for i, value in enumerate(values):
+        sketch.add(value)
+        (left if i % 2 else right).add(value)
+    left.merge(right)
+
+    for q in (0.5, 0.95, 0.99):
+        exact = _exact(values, q)
+        assert abs(sketch.quantile(q) - exact) <= 0.011 * exact, (q, sketch.quantile(q), exact)
+        assert left.quantile(q) == sketch.quantile(q)
+    assert len(sketch._buckets) < 2000
+
+    empty = QuantileSketch()
+    assert empty.quantile(0.5) is None
+    empty.add(0)
+    assert empty.quantile(0.99) == 0.0
+    print("✅ Sketch accurate and mergeable")
+
+
+def test_windowed_expiry():
+    """Only slices inside the window are merged; old slices are reused"""
+    print("⏱️ Testing time windows...")
+    window = WindowedSummary(slice_seconds=10, slices=6)
+    window.add(1.0, now=5)
+    window.add(2.0, now=25)
+    window.add(3.0, now=55)
+    assert window.summary(60, now=55).count == 3
+    assert window.summary(20, now=55).count == 1
+    assert window.summary(60, now=65).count == 2               # the first slice has aged out
+    window.add(4.0, now=65)                                    # reuses the first slice's position
+    snapshot = window.summary(3600, now=65).snapshot()
+    assert snapshot["count"] == 3 and snapshot["min"] == 2.0 and snapshot["max"] == 4.0
+    print("✅ Windows expire")
+
+
+def test_engine_scopes():
+    """One record updates the global, model and session scopes"""
+    print("📊 Testing engine scopes...")
+    engine = StatsEngine()
+    engine.record("a", "gpt-4o", {DURATION: 2.0, TOKENS: 100, TTFT: None, "prompt_tokens": 5}, now=1000)
+    engine.record("b", "gpt-4o", {DURATION: 4.0, TOKENS: 300}, now=1000)
+    engine.record("b", "llama", {DURATION: 6.0, TOKENS: 50, TOKENS_PER_SECOND: 25.0}, now=5000)
+
+    totals = engine.summary(GLOBAL, now=5000)
+    assert totals[DURATION]["count"] == 3 and totals[TOKENS]["sum"] == 450
+    assert TTFT not in totals and "prompt_tokens" not in totals
+    assert engine.summary(MODEL, "gpt-4o")[DURATION]["mean"] == 3.0
+    assert engine.summary(SESSION, "b")[TOKENS]["sum"] == 350
+    assert engine.summary(GLOBAL, window=3600, now=5000)[DURATION]["count"] == 1
+    assert engine.models() == ["gpt-4o", "llama"]
+    assert engine.summary(SESSION, "missing") == {}
+    print("✅ Scopes aggregate")
+
+
+def test_session_restore_reset_and_cap():
+    """Restored sessions only rebuild their own scope; sessions are reset and capped"""
+    print("🧹 Testing sessions...")
+    engine = StatsEngine(max_sessions=2)
+    engine.record("a", "gpt-4o", {DURATION: 1.0}, session_only=True)
+    assert engine.has_session("a") and engine.summary(GLOBAL) == {} and engine.models() == []
+
+    engine.record("b", "gpt-4o", {DURATION: 2.0})
+    engine.reset_session("b")
+    assert not engine.has_session("b") and engine.summary(GLOBAL)[DURATION]["count"] == 1
+
+    engine.record("c", "gpt-4o", {DURATION: 3.0})
+    engine.record("a", "gpt-4o", {DURATION: 4.0})
+    engine.record("d", "gpt-4o", {DURATION: 5.0})              # evicts "c", the least recently active
+    assert engine.has_session("a") and engine.has_session("d") and not engine.has_session("c")
+    assert engine.summary(SESSION, "a")[DURATION]["count"] == 2
+    print("✅ Sessions reset and capped")
+
+
+if __name__ == "__main__":
+    print("🚀 Rolling Statistics Test Suite")
+    print("=" * 50)
+
+    tests = [test_sketch_accuracy_and_merge, test_windowed_expiry, test_engine_scopes,
+             test_session_restore_reset_and_cap]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
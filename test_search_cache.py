@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Test script for the search result cache and its persistent store
+"""
+
+import sys
+import os
+import gc
+import json
+import time
+import asyncio
+import tempfile
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from search_cache import SearchCache, make_cache_key
+from persistent_cache import SQLiteResponseStore
+
+
+def test_key_normalization():
+    """Queries differing only in case and whitespace share a key"""
+    print("🔑 Testing cache key normalization...")
+    assert make_cache_key("news", "  Latest AI   News ", 5) == make_cache_key("news", "latest ai news", 5)
+    assert make_cache_key("news", "latest ai news", 5) != make_cache_key("search", "latest ai news", 5)
+    assert make_cache_key("search", "ai", 5, "US") == make_cache_key("search", "ai", 5, "us")
+    print("✅ Key normalization works")
+
+
+def test_hit_miss_and_errors():
+    """Second lookup is a hit; error responses are never cached"""
+    print("🎯 Testing hits, misses and error handling...")
+    cache = SearchCache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"news": [{"title": "Story"}]}
+
+    key = make_cache_key("news", "ai", 5)
+    cache.get_or_fetch(key, fetch)
+    cache.get_or_fetch(key, fetch)
+    assert len(calls) == 1
+
+    error_key = make_cache_key("news", "broken", 5)
+    cache.get_or_fetch(error_key, lambda: {"error": "boom", "success": False})
+    assert cache.get(error_key) is None
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    print(f"✅ Stats: {stats}")
+
+
+def test_lru_eviction():
+    """Least recently used entries are evicted once the entry budget is exceeded"""
+    print("🧹 Testing LRU eviction...")
+    cache = SearchCache(max_entries=2)
+    keys = [make_cache_key("news", f"q{i}", 5) for i in range(3)]
+    cache.put(keys[0], {"n": 0})
+    cache.put(keys[1], {"n": 1})
+    cache.get(keys[0])  # touch so keys[1] becomes least recently used
+    cache.put(keys[2], {"n": 2})
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == {"n": 0}
+    assert cache.get_stats()["evictions"] == 1
+    print("✅ LRU eviction works")
+
+
+def test_stale_while_revalidate():
+    """Expired entries inside the stale window are served while refreshing in the background"""
+    print("♻️ Testing stale-while-revalidate...")
+    cache = SearchCache(ttls={"news": 0.05}, stale_seconds=5)
+    key = make_cache_key("news", "ai", 5)
+    cache.put(key, {"version": 1})
+    time.sleep(0.1)
+
+    result = cache.get_or_fetch(key, lambda: {"version": 2})
+    assert result == {"version": 1}
+
+    deadline = time.time() + 2
+    while cache.get(key) != {"version": 2} and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.get(key) == {"version": 2}
+    assert cache.get_stats()["refreshes"] == 1
+    print("✅ Stale entry served and refreshed")
+
+
+def test_persistent_store():
+    """Responses written by one cache are served by a fresh cache on the same file"""
+    print("💾 Testing persistent store...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite3")
+        key = make_cache_key("news", "ai", 5)
+        SearchCache(store=SQLiteResponseStore(path)).put(key, {"news": ["story"]})
+
+        restarted = SearchCache(store=SQLiteResponseStore(path))
+        calls = []
+        result = restarted.get_or_fetch(key, lambda: calls.append(1) or {"news": []})
+        assert result == {"news": ["story"]} and not calls
+        assert restarted.get_stats()["disk_loads"] == 1
+    print("✅ Cached responses survive restarts")
+
+
+class _CountingStore:
+    """Store stand-in that counts lookups"""
+
+    def __init__(self):
+        self.rows = {}
+        self.gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        return self.rows.get(key)
+
+    def put(self, key, serialized, fetched_at):
+        self.rows[key] = (json.loads(serialized), fetched_at)
+
+    def delete(self, key=None):
+        self.rows.clear() if key is None else self.rows.pop(key, None)
+
+    def get_stats(self):
+        return {"rows": len(self.rows)}
+
+
+def test_store_misses_are_remembered():
+    """Keys the store doesn't hold aren't looked up again until the negative TTL passes"""
+    print("🚫 Testing store miss guard...")
+    store = _CountingStore()
+    cache = SearchCache(store=store, negative_ttl=0.1)
+    key = make_cache_key("news", "ai", 5)
+    for _ in range(5):
+        assert cache.get(key) is None
+    assert store.gets == 1 and cache.get_stats()["disk_misses"] == 1
+
+    time.sleep(0.15)
+    assert cache.get(key) is None and store.gets == 2
+
+    cache.put(key, {"news": ["story"]})
+    cache.invalidate()                                          # memory and store both emptied
+    store.rows[key] = ({"news": ["other process"]}, time.time())
+    assert cache.get(key) == {"news": ["other process"]} and store.gets == 3
+    print("✅ Store misses are remembered")
+
+
+def test_async_refresh_tasks_are_kept():
+    """Background refresh tasks stay referenced until they finish"""
+    print("🔗 Testing async refresh tasks...")
+    cache = SearchCache(ttls={"news": 0.05}, stale_seconds=5)
+    key = make_cache_key("news", "ai", 5)
+    cache.put(key, {"version": 1})
+    time.sleep(0.1)
+    release = None
+
+    async def fetch():
+        await release.wait()
+        return {"version": 2}
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        assert await cache.aget_or_fetch(key, fetch) == {"version": 1}
+        assert len(cache._refresh_tasks) == 1
+        gc.collect()
+        release.set()
+        await asyncio.gather(*cache._refresh_tasks)
+        await asyncio.sleep(0)
+        assert not cache._refresh_tasks
+
+    asyncio.run(main())
+    assert cache.get(key) == {"version": 2} and cache.get_stats()["refreshes"] == 1
+    print("✅ Refresh tasks kept until done")
+
+
+def test_store_compaction():
+    """Compaction drops expired rows and then the oldest rows over budget"""
+    print("🧹 Testing store compaction...")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteResponseStore(os.path.join(tmp, "cache.sqlite3"), max_bytes=25, max_age=60)
+        now = time.time()
+        store.put(("news", "expired", 5, ""), "x" * 10, now - 120)
+        store.put(("news", "old", 5, ""), "x" * 10, now - 30)
+        store.put(("news", "mid", 5, ""), "x" * 10, now - 20)
+        store.put(("news", "new", 5, ""), "x" * 10, now - 10)
+        assert store.compact() == 2
+        assert store.get(("news", "old", 5, "")) is None
+        assert store.get_stats()["rows"] == 2
+    print("✅ Compaction enforces age and size limits")
+
+
+if __name__ == "__main__":
+    print("🚀 Search Cache Test Suite")
+    print("=" * 50)
+
+    tests = [test_key_normalization, test_hit_miss_and_errors, test_lru_eviction, test_stale_while_revalidate,
+             test_persistent_store, test_store_misses_are_remembered, test_async_refresh_tasks_are_kept,
+             test_store_compaction]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline semantic query cache
+"""
+
+import sys
+import os
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from semantic_cache import SemanticCache
+
+
+def test_paraphrase_hits():
+    """Paraphrases hit; queries about different subjects miss"""
+    print("🧭 Testing paraphrase matching...")
+    cache = SemanticCache(threshold=0.85, ttl=60, max_entries=8)
+    cache.put("what's new in AI", "AI answer")
+    cache.put("Tesla stock news", "Tesla answer")
+
+    assert cache.lookup("latest AI news today")["value"] == "AI answer"
+    assert cache.lookup("latest news on Tesla stock")["value"] == "Tesla answer"
+    assert cache.lookup("Apple news") is None
+    assert cache.lookup("AI news in Europe") is None
+    assert cache.lookup("news today") is None  # nothing but filler words
+    print(f"✅ Stats: {cache.get_stats()}")
+
+
+def test_namespaces_and_ttl():
+    """Entries never match across namespaces and expire after the TTL"""
+    print("⏳ Testing namespaces and TTL...")
+    cache = SemanticCache(ttl=0.1, max_entries=8)
+    cache.put("AI news", "gpt answer", namespace="gpt-4o")
+    assert cache.lookup("AI news", namespace="claude") is None
+    assert cache.lookup("AI news", namespace="gpt-4o")["value"] == "gpt answer"
+    time.sleep(0.15)
+    assert cache.lookup("AI news", namespace="gpt-4o") is None
+    print("✅ Namespaces and TTL work")
+
+
+def test_bounded_capacity():
+    """A full cache evicts its least recently used entry; re-putting a query overwrites it"""
+    print("🧹 Testing bounded capacity...")
+    cache = SemanticCache(ttl=60, max_entries=2)
+    cache.put("bitcoin price", "btc")
+    cache.put("climate policy", "climate")
+    cache.lookup("bitcoin price")  # touch so "climate policy" becomes least recently used
+    cache.put("football results", "football")
+
+    assert cache.lookup("climate policy") is None
+    assert cache.lookup("bitcoin price")["value"] == "btc"
+    assert cache.get_stats()["evictions"] == 1
+
+    cache.put("bitcoin price", "btc v2")
+    assert cache.lookup("football results")["value"] == "football"
+    assert cache.lookup("bitcoin price")["value"] == "btc v2"
+    assert cache.get_stats()["entries"] == 2
+    print("✅ Capacity is bounded")
+
+
+if __name__ == "__main__":
+    print("🚀 Semantic Cache Test Suite")
+    print("=" * 50)
+
+    tests = [test_paraphrase_hits, test_namespaces_and_ttl, test_bounded_capacity]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for single-flight coalescing of identical in-flight requests
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from single_flight import SingleFlight
+
+
+def test_threaded_coalescing():
+    """Concurrent threads with the same key share one execution"""
+    print("🧵 Testing threaded coalescing...")
+    group = SingleFlight()
+    executions = []
+    results = []
+    release = threading.Event()
+
+    def fetch():
+        executions.append(1)
+        release.wait(2)
+        return {"news": ["story"]}
+
+    threads = [threading.Thread(target=lambda: results.append(group.do("ai", fetch))) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    while group.get_stats()["calls"] < 10:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(executions) == 1
+    assert all(result is results[0] for result in results)
+    stats = group.get_stats()
+    assert stats["collapsed"] == 9 and stats["in_flight"] == 0
+    print(f"✅ Stats: {stats}")
+
+
+def test_threaded_error_propagation():
+    """Every waiter sees the leader's exception"""
+    print("💥 Testing error propagation...")
+    group = SingleFlight()
+    try:
+        group.do("bad", lambda: 1 / 0)
+        assert False, "expected ZeroDivisionError"
+    except ZeroDivisionError:
+        pass
+    assert group.do("bad", lambda: "recovered") == "recovered"
+    print("✅ Errors propagate and keys are released")
+
+
+def test_async_coalescing():
+    """Concurrent coroutines with the same key share one execution"""
+    print("⚡ Testing async coalescing...")
+    group = SingleFlight()
+    executions = []
+
+    async def fetch():
+        executions.append(1)
+        await asyncio.sleep(0.05)
+        return {"news": ["story"]}
+
+    async def main():
+        return await asyncio.gather(*(group.ado("ai", fetch) for _ in range(20)))
+
+    results = asyncio.run(main())
+    assert len(executions) == 1
+    assert len(results) == 20 and all(result == {"news": ["story"]} for result in results)
+    assert group.get_stats()["collapsed"] == 19
+    print("✅ Async calls coalesced")
+
+
+def test_async_cancellation():
+    """The upstream call survives while any waiter remains and is cancelled with the last one"""
+    print("🛑 Testing async cancellation...")
+    group = SingleFlight()
+    upstream_cancelled = []
+
+    async def fetch():
+        try:
+            await asyncio.sleep(0.2)
+            return "done"
+        except asyncio.CancelledError:
+            upstream_cancelled.append(1)
+            raise
+
+    async def main():
+        first = asyncio.ensure_future(group.ado("ai", fetch))
+        second = asyncio.ensure_future(group.ado("ai", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert not upstream_cancelled
+        second.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert upstream_cancelled == [1]
+    assert group.get_stats()["in_flight"] == 0
+    print("✅ Cancellation reaches the upstream call")
+
+
+if __name__ == "__main__":
+    print("🚀 Single-flight Test Suite")
+    print("=" * 50)
+
+    tests = [test_threaded_coalescing, test_threaded_error_propagation, test_async_coalescing,
+             test_async_cancellation]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for the incremental, frame-throttled streaming renderer
+"""
+
+import sys
+import os
+import random
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stream_renderer import IncrementalFormatter, StreamRenderer, process_assistant_content
+
+
+class _Placeholder:
+    """Records what would have been rendered"""
+
+    def __init__(self):
+        self.renders = []
+
+    def markdown(self, text):
+        self.renders.append(text)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_incremental_matches_full_formatting():
+    """Formatting the tail incrementally gives exactly the whole-text result"""
+    print("🧩 Testing incremental formatting...")
+    rng = random.Random(7)
+    alphabet = ["\n", "\n", "\n", "#", "#", " ", "a", "1", ".", "-", "*"]
+    for _ in range(2000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        formatter = IncrementalFormatter()
+        position = 0
+        while position < len(text):
+            end = position + rng.randint(1, 5)
+            formatter.append(text[position:end])
+            position = end
+            assert formatter.render() == process_assistant_content(text[:end]), repr(text[:end])
+            assert formatter.text == text[:end]
+
+    formatter = IncrementalFormatter()
+    for chunk in ["Intro\n\n\n\n", "## Trends\n", "1. One\n", "##", "\n", "Tail  \n\n"]:
+        formatter.append(chunk)
+    assert formatter.render() == "Intro\n\n\n## Trends\n1. One\n\n##\nTail"
+    print("✅ Incremental output matches")
+
+
+def test_frames_are_coalesced():
+    """Chunks within one frame interval share a render; large bursts render early"""
+    print("🎞️ Testing frame throttling...")
+    placeholder = _Placeholder()
+    clock = _Clock()
+    renderer = StreamRenderer(placeholder, fps=10, flush_chars=50, clock=clock)
+
+    renderer.feed("Hello")
+    assert placeholder.renders == ["Hello"]          # first chunk shows immediately
+    for _ in range(5):
+        clock.now += 0.01
+        renderer.feed(" word")
+    assert len(placeholder.renders) == 1
+
+    clock.now += 0.1
+    renderer.feed(" late")
+    assert placeholder.renders[-1] == "Hello word word word word word late"
+
+    clock.now += 0.01
+    renderer.feed("x" * 60)                          # over flush_chars: render before the frame is due
+    assert len(placeholder.renders) == 3
+
+    clock.now += 0.01
+    renderer.feed("\n\n\nend")
+    assert renderer.finish() == "Hello word word word word word late" + "x" * 60 + "\n\n\nend"
+    assert placeholder.renders[-1] == process_assistant_content(renderer.text)
+    assert renderer.get_stats() == {"chunks": 9, "frames": 4}
+    print("✅ Frames coalesced")
+
+
+if __name__ == "__main__":
+    print("🚀 Stream Renderer Test Suite")
+    print("=" * 50)
+
+    tests = [test_incremental_matches_full_formatting, test_frames_are_coalesced]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)